@@ -0,0 +1,4 @@
+"""Initialize folder."""
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,103 @@
+"""Benchmark concurrent ISBN lookups on the sync and async database layers.
+
+The sync path runs the lookups on a thread pool through SQLConnection, the
+async path gathers them on one event loop through AsyncSQLConnection. Both
+use the same SQLite file, with aiosqlite as the async driver.
+
+Run with ``python -m benchmarks.bench_async_lookups [--lookups N]``.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.data.async_database import AsyncSQLConnection
+from src.data.database import SQLConnection
+from src.entities.books import Book
+
+NUM_BOOKS = 10_000
+
+
+def run_sync(connection: SQLConnection, isbns: list[int], threads: int) -> float:
+    """Look up books concurrently on threads.
+
+    Args:
+        connection (SQLConnection): Sync connection.
+        isbns (list[int]): ISBNs to look up.
+        threads (int): Worker threads.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(connection.get_book, isbns))
+    return time.perf_counter() - start
+
+
+async def run_async(url: str, isbns: list[int], pool_size: int) -> float:
+    """Look up books concurrently on the event loop.
+
+    Args:
+        url (str): Async database URL.
+        isbns (list[int]): ISBNs to look up.
+        pool_size (int): Pooled connections.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    connection = AsyncSQLConnection("", "", url=url, pool_size=pool_size)
+    start = time.perf_counter()
+    await asyncio.gather(*[connection.get_book(isbn) for isbn in isbns])
+    elapsed = time.perf_counter() - start
+    await connection.close()
+    return elapsed
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lookups", type=int, default=1_000)
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        connection = SQLConnection(
+            "", "", url=f"sqlite:///{path}", pool_size=args.pool_size, echo=False
+        )
+        with connection.session_scope() as session:
+            session.add_all(
+                Book(  # type: ignore
+                    title=f"Title {i}",
+                    author=f"Author {i % 100}",
+                    release_year=1950 + i % 70,
+                    unique_ISBN=i + 1,
+                )
+                for i in range(NUM_BOOKS)
+            )
+
+        isbns = [random.randint(1, NUM_BOOKS) for _ in range(args.lookups)]
+
+        elapsed = run_sync(connection, isbns, args.pool_size)
+        print(
+            f"sync  ({args.pool_size} threads): {elapsed:6.3f} s"
+            f" | {args.lookups / elapsed:8.0f} lookups/s"
+        )
+        connection.engine.dispose()
+
+        elapsed = asyncio.run(
+            run_async(f"sqlite+aiosqlite:///{path}", isbns, args.pool_size)
+        )
+        print(
+            f"async (1 event loop): {elapsed:6.3f} s"
+            f" | {args.lookups / elapsed:8.0f} lookups/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark the prefix autocomplete.
+
+Builds title and author completions for a CompactCatalog of N books and
+times lookups of prefixes typed one letter at a time.
+
+Run with ``python -m benchmarks.bench_autocomplete [--books N]``.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.bench_fuzzy_search import rows
+from src.data.catalog import CompactCatalog
+from src.entities.users import User  # noqa: F401 Needed to configure mappers
+from src.search.autocomplete import Autocomplete
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--results", type=int, default=10)
+    args = parser.parse_args()
+
+    catalog = CompactCatalog.from_rows(rows(args.books))
+    generator = random.Random(1)
+    loans = {
+        generator.randrange(1, args.books + 1): generator.randint(1, 20)
+        for _ in range(args.books // 10)
+    }
+
+    for attribute in ["title", "author"]:
+        start = time.perf_counter()
+        completer = Autocomplete.from_books(catalog, attribute, loans, args.results)
+        build_seconds = time.perf_counter() - start
+
+        # Every prefix of sampled texts, as typed letter by letter
+        prefixes = []
+        while len(prefixes) < args.queries:
+            text = getattr(
+                catalog.get(generator.randrange(1, args.books + 1)), attribute
+            )
+            prefixes.extend(text[:length] for length in range(1, min(len(text), 12)))
+
+        timings = []
+        for prefix in prefixes[: args.queries]:
+            start = time.perf_counter()
+            completer.complete(prefix)
+            timings.append((time.perf_counter() - start) * 1_000_000)
+
+        timings.sort()
+        print(
+            f"{attribute:<6} | {len(completer):>9} texts"
+            f" | built in {build_seconds:5.1f} s"
+            f" | median {statistics.median(timings):6.1f} us"
+            f" | p99 {timings[int(len(timings) * 0.99) - 1]:6.1f} us"
+            f" | max {timings[-1]:7.1f} us",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Benchmark the batch search against looping over the search strategies.
+
+A mix of title, author, ISBN and year queries, like patron wishlists, is run
+once by looping over the existing strategies, one query at a time, and once
+through LibrarySystem.search_batch on a CompactCatalog.
+
+Run with ``python -m benchmarks.bench_batch_search [--books N] [--queries Q]``.
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Callable
+
+from benchmarks.bench_catalog_memory import WORDS, rows
+from src.data.catalog import CompactCatalog
+from src.entities.books import Book
+from src.entities.users import User  # noqa: F401 Needed to configure mappers
+from src.lib_system import (
+    AuthorSearchStrategy,
+    ISBNSearchStrategy,
+    LibrarySystem,
+    TitleSearchStrategy,
+)
+from src.search.text_index import (
+    IndexedAuthorSearchStrategy,
+    IndexedTitleSearchStrategy,
+)
+from src.search.year_index import YearRangeSearchStrategy
+
+
+def make_queries(count: int, books: int, seed: int = 1) -> list[tuple[str, str]]:
+    """Draw a mix of queries.
+
+    Args:
+        count (int): Number of queries.
+        books (int): Books in the catalog.
+        seed (int, optional): Seed. Defaults to 1.
+
+    Returns:
+        list[tuple[str, str]]: Field and query pairs.
+    """
+    generator = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        field = generator.choice(["title", "title", "author", "isbn", "year"])
+        if field == "title":
+            query = " ".join(generator.choices(WORDS, k=3))
+        elif field == "author":
+            query = f"Author {generator.randrange(20_000)}"
+        elif field == "isbn":
+            query = str(generator.randrange(1, books + 1))
+        else:
+            start = generator.randrange(1950, 2020)
+            query = f"{start}-{start + generator.randrange(5)}"
+        queries.append((field, query))
+    return queries
+
+
+def loop(
+    library: LibrarySystem, strategies: dict[str, Any], queries: list[Any]
+) -> dict[tuple[str, str], list[int]]:
+    """Run the queries one at a time through the strategies.
+
+    Args:
+        library (LibrarySystem): Library to search.
+        strategies (dict[str, Any]): Strategy per field.
+        queries (list[Any]): Field and query pairs.
+
+    Returns:
+        dict[tuple[str, str], list[int]]: ISBNs per query.
+    """
+    results = {}
+    for field, query in queries:
+        library.search_strategy = strategies[field]
+        results[(field, query)] = [
+            book.unique_ISBN for book in library.search_books(query)
+        ]
+    return results
+
+
+def timed(func: Callable[[], Any]) -> tuple[Any, float]:
+    """Time a function.
+
+    Args:
+        func (Callable[[], Any]): Function to time.
+
+    Returns:
+        tuple[Any, float]: Result and seconds taken.
+    """
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument(
+        "--loop-queries",
+        type=int,
+        default=200,
+        help="Queries run through the scanning strategies, which are slow.",
+    )
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries, args.books)
+    books = [
+        Book(title, author, year, isbn)  # type: ignore
+        for isbn, title, author, year, _, _ in rows(args.books)
+    ]
+    catalog = CompactCatalog.from_books(books)
+
+    scan = {
+        "title": TitleSearchStrategy(),
+        "author": AuthorSearchStrategy(),
+        "isbn": ISBNSearchStrategy(),
+        "year": YearRangeSearchStrategy(),
+    }
+    indexed = {
+        "title": IndexedTitleSearchStrategy(),
+        "author": IndexedAuthorSearchStrategy(),
+        "isbn": ISBNSearchStrategy(),
+        "year": YearRangeSearchStrategy(),
+    }
+    library = LibrarySystem(books)  # type: ignore
+    compact = LibrarySystem(catalog)  # type: ignore
+
+    # Build the indexes and the batch columns before timing
+    loop(library, indexed, queries[:5])
+    compact.search_batch(queries[:5])
+
+    sample = queries[: args.loop_queries]
+    expected, scan_seconds = timed(lambda: loop(library, scan, sample))
+    _, indexed_seconds = timed(lambda: loop(library, indexed, queries))
+    batch, batch_seconds = timed(lambda: compact.search_batch(queries))
+
+    assert all(sorted(batch[query]) == sorted(expected[query]) for query in sample)
+    for name, count, seconds in [
+        ("loop, scanning strategies", len(sample), scan_seconds),
+        ("loop, indexed strategies", len(queries), indexed_seconds),
+        ("search_batch", len(queries), batch_seconds),
+    ]:
+        print(
+            f"{name:<26} | {count:>6} queries | {seconds:7.2f} s"
+            f" | {count / seconds:9.1f} queries/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark the ways of loading book records into the database.
+
+Compares the ORM path of upload_data_in_chunks with the Core bulk_insert
+path in single-transaction, periodic-commit and multi-row VALUES modes.
+Records are generated up front so only the loading is timed.
+
+Run with ``python -m benchmarks.bench_bulk_insert [--rows N] [--url URL]``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Callable
+
+from sqlalchemy import delete
+
+from src.data.database import SQLConnection
+from src.entities.books import Book
+
+
+def make_records(rows: int) -> list[dict[str, Any]]:
+    """Build book records like the fake data generator does.
+
+    Args:
+        rows (int): Number of records.
+
+    Returns:
+        list[dict[str, Any]]: Book records.
+    """
+    return [
+        {
+            "title": f"Title number {i}",
+            "author": f"Author {i % 1000}",
+            "release_year": 1950 + i % 70,
+            "unique_ISBN": i + 1,
+        }
+        for i in range(rows)
+    ]
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--url", help="Database URL, defaults to a SQLite file.")
+    args = parser.parse_args()
+
+    records = make_records(args.rows)
+    # SQLite allows 32766 parameters per statement, 4 per book
+    multi_row_batch = min(args.batch_size, 8_000)
+
+    modes: dict[str, Callable[[SQLConnection], Any]] = {
+        "orm upload_data_in_chunks": lambda connection: (
+            connection.upload_data_in_chunks(records, args.batch_size, Book)
+        ),
+        "core single transaction": lambda connection: connection.bulk_insert(
+            records, Book, batch_size=args.batch_size
+        ),
+        "core commit every batch": lambda connection: connection.bulk_insert(
+            records, Book, batch_size=args.batch_size, commit_every=1
+        ),
+        "core multi-row VALUES": lambda connection: connection.bulk_insert(
+            records, Book, batch_size=multi_row_batch, multi_row=True
+        ),
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        connection = SQLConnection("", "", url=url, echo=False)
+
+        for name, load in modes.items():
+            with connection.session_scope() as session:
+                session.execute(delete(Book))
+
+            start = time.perf_counter()
+            load(connection)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:<26} | {args.rows:>9,} rows in {elapsed:6.2f} s"
+                f" | {args.rows / elapsed:>10,.0f} rows/s",
+                flush=True,
+            )
+        connection.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark the memory of the in-memory catalog.
+
+Holds N books once as Book objects and once as a CompactCatalog and
+reports the memory allocated for each, measured with tracemalloc.
+
+Run with ``python -m benchmarks.bench_catalog_memory [--books N]``.
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator
+
+from src.data.catalog import CompactCatalog
+from src.entities.books import Book
+from src.entities.users import User  # Book needs the User mapper
+
+WORDS = "the of a night river house garden war light stone city winter".split()
+
+
+def rows(count: int, seed: int = 0) -> Iterator[tuple[Any, ...]]:
+    """Generate book rows resembling the fake dataset.
+
+    Args:
+        count (int): Number of rows.
+        seed (int, optional): Seed of the titles. Defaults to 0.
+
+    Yields:
+        Iterator[tuple[Any, ...]]: ISBN, title, author, year, availability
+            and reserving user.
+    """
+    generator = random.Random(seed)
+    for i in range(count):
+        title = " ".join(generator.choices(WORDS, k=6)).capitalize() + "."
+        author = f"Author {generator.randrange(20_000)}"
+        yield i + 1, title, author, 1950 + i % 75, True, None
+
+
+def build_books(count: int) -> list[Book]:
+    """Build Book objects.
+
+    Args:
+        count (int): Number of books.
+
+    Returns:
+        list[Book]: Books.
+    """
+    return [
+        Book(title, author, year, isbn)  # type: ignore
+        for isbn, title, author, year, _, _ in rows(count)
+    ]
+
+
+def measure(build: Callable[[], Any]) -> tuple[Any, int, float]:
+    """Measure the memory held by what a function builds.
+
+    Args:
+        build (Callable[[], Any]): Builds the catalog.
+
+    Returns:
+        tuple[Any, int, float]: Catalog, bytes held after building and
+            seconds taken.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    catalog = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return catalog, current, elapsed
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    results = []
+    for name, build in [
+        ("Book objects", lambda: build_books(args.books)),
+        ("CompactCatalog", lambda: CompactCatalog.from_rows(rows(args.books))),
+    ]:
+        catalog, held, elapsed = measure(build)
+        results.append(held)
+        print(
+            f"{name:<15} | {held / 2**20:8.1f} MiB | {held / args.books:7.1f} B/book"
+            f" | built in {elapsed:5.1f} s",
+            flush=True,
+        )
+        del catalog
+
+    print(f"Compact catalog uses {results[0] / results[1]:.1f}x less memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark concurrent database access through the connection pool.
+
+N worker threads run a mix of reads (ISBN lookups and title searches) and
+writes (adding books), each operation in its own pooled session.
+
+Run with ``python -m benchmarks.bench_connection_pool [--url URL]``. Without
+a URL a temporary SQLite file is used, which serializes writers; point it at
+MySQL to measure the pool under real concurrency.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+
+from src.data.database import SQLConnection
+from src.entities.books import Book
+from src.search.sql_strategies import SQLTitleSearchStrategy
+from src.utils import set_worker_id
+
+NUM_BOOKS = 2_000
+
+
+def worker(
+    connection: SQLConnection,
+    isbns: list[int],
+    operations: int,
+    write_ratio: float,
+    errors: list[BaseException],
+) -> None:
+    """Run a mix of reads and writes.
+
+    Args:
+        connection (SQLConnection): Shared connection.
+        isbns (list[int]): Existing ISBNs to look up.
+        operations (int): Operations to run.
+        write_ratio (float): Fraction of operations that write.
+        errors (list[BaseException]): Collects failed operations.
+    """
+    search = SQLTitleSearchStrategy(connection.Session, page_size=20)
+    for _ in range(operations):
+        try:
+            roll = random.random()
+            if roll < write_ratio:
+                connection.add_book("Benchmark book", "Benchmark author", 2024)
+            elif roll < (1 + write_ratio) / 2:
+                connection.get_book(random.choice(isbns))
+            else:
+                next(search.search([], f"Title {random.randrange(100)}"), None)
+        except Exception as error:
+            errors.append(error)
+
+
+def run(connection: SQLConnection, threads: int, operations: int, ratio: float) -> str:
+    """Time the workers for one thread count.
+
+    Args:
+        connection (SQLConnection): Shared connection.
+        threads (int): Number of worker threads.
+        operations (int): Operations per thread.
+        ratio (float): Fraction of operations that write.
+
+    Returns:
+        str: Result line.
+    """
+    with connection.session_scope() as session:
+        isbns = [isbn for (isbn,) in session.query(Book.unique_ISBN).limit(1000)]
+
+    errors: list[BaseException] = []
+    workers = [
+        threading.Thread(
+            target=worker, args=(connection, isbns, operations, ratio, errors)
+        )
+        for _ in range(threads)
+    ]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = threads * operations
+    return (
+        f"{threads:>3} threads | {total:>6} ops in {elapsed:6.2f} s"
+        f" | {total / elapsed:8.0f} ops/s | {len(errors)} errors"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Database URL, defaults to a SQLite file.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--pool-size", type=int, default=8)
+    args = parser.parse_args()
+    # Benchmarks write to throwaway databases, so one worker id is enough
+    set_worker_id(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        connection = SQLConnection(
+            "", "", url=url, pool_size=args.pool_size, echo=False
+        )
+        if connection.is_table_empty(Book):  # type: ignore
+            with connection.session_scope() as session:
+                session.add_all(
+                    Book(  # type: ignore
+                        title=f"Title {i % 100} number {i}",
+                        author=f"Author {i % 50}",
+                        release_year=1950 + i % 70,
+                        unique_ISBN=i + 1,
+                    )
+                    for i in range(NUM_BOOKS)
+                )
+
+        for threads in args.threads:
+            # add_book reports every insert on stdout
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = run(connection, threads, args.operations, args.write_ratio)
+            print(result, flush=True)
+        connection.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
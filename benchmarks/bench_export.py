@@ -0,0 +1,107 @@
+"""Benchmark the streaming export of the loan history.
+
+The loan_events table is filled with N events and exported to CSV and
+Parquet, once timed and once with tracemalloc running. The peak memory
+should stay the same whatever the number of rows, and only grow with the
+batch size.
+
+Run with ``python -m benchmarks.bench_export [--url URL] [--rows N ...]``.
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete
+
+from src.data import export
+from src.data.database import SQLConnection
+from src.data.export import export_table
+from src.entities.loan_events import LOAN, LoanEvent
+from src.entities.users import User  # noqa: F401 Needed to configure mappers
+
+
+def fill(connection: SQLConnection, rows: int) -> None:
+    """Replace the loan history with generated events.
+
+    Args:
+        connection (SQLConnection): Connection to the database.
+        rows (int): Events to insert.
+    """
+    with connection.session_scope() as session:
+        session.execute(delete(LoanEvent))
+    first = datetime(2020, 1, 1)
+    connection.bulk_insert(
+        (
+            {
+                "event_id": number,
+                "book_id": number % 50_000,
+                "user_id": number % 5_000,
+                "action": LOAN,
+                "created_at": first + timedelta(seconds=number * 7),
+            }
+            for number in range(1, rows + 1)
+        ),
+        LoanEvent,  # type: ignore
+    )
+
+
+def peak_memory(
+    connection: SQLConnection, path: str, file_format: str, batch_size: int
+) -> int:
+    """Export with tracemalloc running.
+
+    Args:
+        connection (SQLConnection): Connection to the database.
+        path (str): File to write.
+        file_format (str): "csv" or "parquet".
+        batch_size (int): Rows per chunk.
+
+    Returns:
+        int: Peak bytes allocated by Python and by pyarrow.
+    """
+    gc.collect()
+    tracemalloc.start()
+    export_table(connection, "loan_history", path, file_format, batch_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if file_format == "parquet":
+        peak += export.pa.default_memory_pool().max_memory()
+    return peak
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Database URL, defaults to a SQLite file.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    formats = ["csv"] + (["parquet"] if export.pa is not None else [])
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        connection = SQLConnection("", "", url=url)
+        for rows in args.rows:
+            fill(connection, rows)
+            for file_format in formats:
+                path = os.path.join(directory, f"history.{file_format}")
+                stats = export_table(
+                    connection, "loan_history", path, file_format, args.batch_size
+                )
+                peak = peak_memory(connection, path, file_format, args.batch_size)
+                print(
+                    f"{rows:>10,} rows | {file_format:<7}"
+                    f" | {stats.rows_per_second:>9,.0f} rows/s"
+                    f" | {stats.bytes / 1e6:7.1f} MB file"
+                    f" | peak memory {peak / 1e6:6.1f} MB",
+                    flush=True,
+                )
+        connection.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark the fuzzy, ranked title and author search.
+
+Builds the trigram indexes over a CompactCatalog of N books and times
+misspelled title and author queries.
+
+Run with ``python -m benchmarks.bench_fuzzy_search [--books N]``.
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import time
+from typing import Any, Iterator
+
+from src.data.catalog import CompactCatalog
+from src.entities.users import User  # noqa: F401 Needed to configure mappers
+from src.search.fuzzy import FuzzyAuthorSearchStrategy, FuzzyTitleSearchStrategy
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def rows(count: int, seed: int = 0) -> Iterator[tuple[Any, ...]]:
+    """Generate book rows with natural looking word frequencies.
+
+    Titles are 2 to 7 words drawn from a vocabulary of made-up words with
+    Zipf frequencies, so common words have long postings as in real titles.
+
+    Args:
+        count (int): Number of rows.
+        seed (int, optional): Seed. Defaults to 0.
+
+    Yields:
+        Iterator[tuple[Any, ...]]: ISBN, title, author, year, availability
+            and reserving user.
+    """
+    generator = random.Random(seed)
+    vocabulary = [
+        "".join(generator.choices(LETTERS, k=generator.randint(2, 10)))
+        for _ in range(30_000)
+    ]
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, 30_001)))
+    first_names = vocabulary[:2_000]
+    last_names = vocabulary[-20_000:]
+    for i in range(count):
+        words = generator.choices(
+            vocabulary, cum_weights=weights, k=generator.randint(2, 7)
+        )
+        author = f"{generator.choice(first_names)} {generator.choice(last_names)}"
+        yield i + 1, " ".join(words).capitalize(), author.title(), 2000, True, None
+
+
+def misspell(text: str, generator: random.Random) -> str:
+    """Swap two neighbouring letters and drop another one.
+
+    Args:
+        text (str): Correct text.
+        generator (random.Random): Random generator.
+
+    Returns:
+        str: Misspelled text.
+    """
+    letters = list(text)
+    i = generator.randrange(len(letters) - 1)
+    letters[i], letters[i + 1] = letters[i + 1], letters[i]
+    del letters[generator.randrange(len(letters))]
+    return "".join(letters)
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    catalog = CompactCatalog.from_rows(rows(args.books))
+    generator = random.Random(2)
+    samples = [
+        catalog.get(generator.randrange(1, args.books + 1)) for _ in range(args.queries)
+    ]
+
+    for name, strategy in [
+        ("title", FuzzyTitleSearchStrategy(top_k=args.top_k)),
+        ("author", FuzzyAuthorSearchStrategy(top_k=args.top_k)),
+    ]:
+        start = time.perf_counter()
+        strategy.ensure_index(catalog)  # type: ignore
+        build_seconds = time.perf_counter() - start
+
+        timings = []
+        hits = 0
+        for book in samples:
+            query = misspell(getattr(book, name), generator)
+            start = time.perf_counter()
+            results = strategy.ranked(catalog, query)  # type: ignore
+            timings.append((time.perf_counter() - start) * 1000)
+            # Books with the same text tie, so look for the text rather than the book
+            hits += any(
+                getattr(found, name) == getattr(book, name) for _, found in results
+            )
+
+        timings.sort()
+        print(
+            f"{name:<6} | index built in {build_seconds:5.1f} s"
+            f" | median {statistics.median(timings):5.1f} ms"
+            f" | p95 {timings[int(len(timings) * 0.95) - 1]:5.1f} ms"
+            f" | max {timings[-1]:5.1f} ms"
+            f" | misspelled text in top {args.top_k}: {hits / len(samples):.0%}",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
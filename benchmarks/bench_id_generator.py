@@ -0,0 +1,100 @@
+"""Benchmark the Snowflake id generator against the old id scheme.
+
+The old scheme glued a random 4-digit number in front of perf_counter_ns().
+Reports ids per second and the insert throughput of books keyed by each
+scheme on a SQLite file.
+
+Run with ``python -m benchmarks.bench_id_generator [--ids N] [--rows N]``.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from typing import Callable
+
+from src.data.database import SQLConnection
+from src.entities.books import Book
+from src.utils import generate_id, generate_ids, set_worker_id
+
+
+def old_generate_id() -> int:
+    """Generate an id the way generate_id used to.
+
+    Returns:
+        int: Id.
+    """
+    return int(str(random.randint(1000, 9999)) + str(time.perf_counter_ns()))
+
+
+def time_ids(name: str, make_ids: Callable[[int], list[int]], count: int) -> None:
+    """Time generating ids.
+
+    Args:
+        name (str): Name of the scheme.
+        make_ids (Callable[[int], list[int]]): Generates count ids.
+        count (int): Number of ids.
+    """
+    start = time.perf_counter()
+    ids = make_ids(count)
+    elapsed = time.perf_counter() - start
+
+    overflow = sum(1 for new_id in ids if new_id >= 2**63)
+    print(
+        f"{name:<28} | {count / elapsed:>12,.0f} ids/s"
+        f" | {count - len(set(ids)):>6} duplicates | {overflow:>6} over BIGINT"
+    )
+
+
+def time_inserts(name: str, ids: list[int], url: str) -> None:
+    """Time inserting books keyed by the given ids.
+
+    Args:
+        name (str): Name of the scheme.
+        ids (list[int]): Primary keys.
+        url (str): Database URL.
+    """
+    connection = SQLConnection("", "", url=url, echo=False)
+    records = (
+        {"title": "Title", "author": "Author", "release_year": 2000, "unique_ISBN": i}
+        for i in ids
+    )
+    start = time.perf_counter()
+    connection.bulk_insert(records, Book, batch_size=10_000)
+    elapsed = time.perf_counter() - start
+    connection.engine.dispose()
+    print(f"{name:<28} | {len(ids) / elapsed:>12,.0f} rows/s inserted")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ids", type=int, default=1_000_000)
+    parser.add_argument("--rows", type=int, default=300_000)
+    args = parser.parse_args()
+    # Benchmarks write to throwaway databases, so one worker id is enough
+    set_worker_id(0)
+
+    time_ids(
+        "old random+perf_counter",
+        lambda n: [old_generate_id() for _ in range(n)],
+        args.ids,
+    )
+    time_ids(
+        "snowflake generate_id", lambda n: [generate_id() for _ in range(n)], args.ids
+    )
+    time_ids("snowflake generate_ids(n)", generate_ids, args.ids)
+
+    # Old ids above the BIGINT range cannot be stored at all
+    old_ids = list({old_generate_id() % 2**63 for _ in range(args.rows)})
+    with tempfile.TemporaryDirectory() as directory:
+        time_inserts(
+            "old random+perf_counter", old_ids, f"sqlite:///{directory}/old.db"
+        )
+        time_inserts(
+            "snowflake", generate_ids(args.rows), f"sqlite:///{directory}/new.db"
+        )
+
+
+if __name__ == "__main__":
+    main()
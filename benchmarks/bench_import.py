@@ -0,0 +1,79 @@
+"""Benchmark importing a large catalog file.
+
+Writes a CSV catalog of N rows with valid ISBN-13s, about 1% repeated
+ISBNs and 1% invalid ones, and imports it into an empty database with
+CatalogImporter for each number of worker processes. Prints the rows per
+second and the time a 5M row file would take at that rate.
+
+Run with ``python -m benchmarks.bench_import [--url URL] [--rows N]``.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+
+from sqlalchemy import delete
+
+from src.data.database import SQLConnection
+from src.data.importer import CatalogImporter, isbn13_check_digit
+from src.entities.book_changes import BookChange
+from src.entities.books import Book
+from src.entities.users import User  # noqa: F401 Needed to configure mappers
+
+
+def write_catalog(path: str, rows: int) -> None:
+    """Write a CSV catalog.
+
+    Args:
+        path (str): File to write.
+        rows (int): Number of rows.
+    """
+    generator = random.Random(1)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("isbn,title,author,date\n")
+        for number in range(rows):
+            if generator.random() < 0.01:
+                number = generator.randrange(max(number, 1))
+            digits = f"978{number:09d}"
+            check = isbn13_check_digit(digits)
+            if generator.random() < 0.01:
+                check = (check + 1) % 10
+            file.write(
+                f"{digits}{check},Title number {number},"
+                f'"Author {number % 5_000}, A.",c{1900 + number % 120}.\n'
+            )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Database URL, defaults to a SQLite file.")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1})
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        connection = SQLConnection("", "", url=url)
+        path = os.path.join(directory, "catalog.csv")
+        write_catalog(path, args.rows)
+        print(f"Catalog of {os.path.getsize(path) / 1e6:.0f} MB", flush=True)
+
+        for workers in args.workers:
+            with connection.session_scope() as session:
+                session.execute(delete(BookChange))
+                session.execute(delete(Book))
+            stats = CatalogImporter(connection, workers=workers).run(path)
+            print(
+                f"{workers} workers | {stats}"
+                f" | 5M rows in {5_000_000 / stats.rows_per_second / 60:.1f} min",
+                flush=True,
+            )
+        connection.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark ISBN lookups in the library system.
+
+Compares the old linear scan (one pass in the operation and one in the
+transcript lookup) with the ISBN index kept by LibrarySystem.
+
+Run with ``python -m benchmarks.bench_isbn_index [sizes ...]``.
+"""
+
+import random
+import sys
+import time
+from typing import Any, Optional
+
+from src.entities.books import Book
+from src.entities.users import User  # noqa: F401 Needed to configure mappers
+from src.lib_system import LibrarySystem
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+NUM_LOOKUPS = 200
+
+
+def linear_lookup(books: list[Any], book_id: int) -> Optional[Any]:
+    """Find a book the way loan/return/reserve used to.
+
+    Args:
+        books (list[Any]): Books.
+        book_id (int): Id of book.
+
+    Returns:
+        Optional[Any]: Found book.
+    """
+    for book in books:
+        if book.unique_ISBN == book_id:
+            break
+    # The transcript lookup in log_activity scanned the list a second time.
+    return next((b for b in books if b.unique_ISBN == book_id), None)
+
+
+def run(size: int) -> None:
+    """Time lookups on a catalog of the given size.
+
+    Args:
+        size (int): Number of books.
+    """
+    books = [
+        Book(title=f"Book {i}", author="Author", release_year=2000, unique_ISBN=i)
+        for i in range(size)
+    ]
+    library = LibrarySystem(books)  # type: ignore
+    isbns = [random.randrange(size) for _ in range(NUM_LOOKUPS)]
+
+    start = time.perf_counter()
+    for isbn in isbns:
+        linear_lookup(books, isbn)
+    linear = (time.perf_counter() - start) / NUM_LOOKUPS
+
+    start = time.perf_counter()
+    for isbn in isbns:
+        library.get_book(isbn)
+        library.get_book(isbn)
+    indexed = (time.perf_counter() - start) / NUM_LOOKUPS
+
+    print(
+        f"{size:>10,} books | linear {linear * 1e6:12.1f} us/op"
+        f" | indexed {indexed * 1e6:8.3f} us/op | speedup {linear / indexed:,.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    for size in sizes:
+        run(size)
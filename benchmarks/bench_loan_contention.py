@@ -0,0 +1,183 @@
+"""Benchmark loans racing for the same popular books.
+
+Many threads, one user each, loan random books from a small popular set
+and return them straight away. The transactional SQLConnection.loan_book
+is compared with the read-then-write pattern it replaces, which checks
+availability in one transaction and lends the book in another. A loan
+after which the book has more than one borrower counts as a double loan.
+
+Run with ``python -m benchmarks.bench_loan_contention [--url URL]``.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import func, insert, select, update
+
+from src.data.database import CONFLICT, DONE, Outcome, SQLConnection
+from src.entities.books import Book
+from src.entities.users import BorrowedBooks, User
+
+
+def naive_loan(connection: SQLConnection, user_id: int, unique_ISBN: int) -> Outcome:
+    """Loan a book the way the in-memory LibrarySystem did.
+
+    Args:
+        connection (SQLConnection): Connection to the database.
+        user_id (int): Id of the borrowing user.
+        unique_ISBN (int): The unique ISBN of the book.
+
+    Returns:
+        Outcome: DONE or CONFLICT, and the book as read.
+    """
+    book = connection.get_book(unique_ISBN)
+    if book is None or not book.available:
+        return CONFLICT, book
+    with connection.session_scope() as session:
+        session.execute(
+            update(Book)
+            .where(Book.unique_ISBN == unique_ISBN)
+            .values(available=False, reserved_by=user_id)
+        )
+        session.execute(
+            insert(BorrowedBooks).values(user_id=user_id, book_id=unique_ISBN)
+        )
+    return DONE, book
+
+
+def borrowers_counter(connection: SQLConnection) -> Callable[[int], int]:
+    """Count the current borrowers of a book.
+
+    Args:
+        connection (SQLConnection): Connection to the database.
+
+    Returns:
+        Callable[[int], int]: Borrowers by ISBN.
+    """
+
+    def borrowers(unique_ISBN: int) -> int:
+        statement = select(func.count()).where(BorrowedBooks.book_id == unique_ISBN)
+        with connection.session_scope() as session:
+            return session.scalar(statement) or 0
+
+    return borrowers
+
+
+def run(
+    connection: SQLConnection,
+    loan: Callable[[int, int], Outcome],
+    threads: int,
+    attempts: int,
+    popular: int,
+) -> str:
+    """Race the threads for the popular books.
+
+    Args:
+        connection (SQLConnection): Connection to the database with the books.
+        loan (Callable[[int, int], Outcome]): Loan transaction to time.
+        threads (int): Desks loaning at once.
+        attempts (int): Loans tried by each desk.
+        popular (int): Books all desks ask for.
+
+    Returns:
+        str: Result line.
+    """
+    lock = threading.Lock()
+    counts = {"done": 0, "conflict": 0, "double": 0, "error": 0}
+    timings: list[float] = []
+    barrier = threading.Barrier(threads)
+    borrowers = borrowers_counter(connection)
+
+    def desk(user_id: int) -> None:
+        generator = random.Random(user_id)
+        barrier.wait()
+        for _ in range(attempts):
+            unique_ISBN = generator.randint(1, popular)
+            start = time.perf_counter()
+            try:
+                status, _ = loan(user_id, unique_ISBN)
+            except Exception:
+                status = "error"
+            elapsed = time.perf_counter() - start
+            double = status == DONE and borrowers(unique_ISBN) > 1
+            with lock:
+                timings.append(elapsed)
+                counts[status] += 1
+                counts["double"] += double
+            if status == DONE:
+                connection.return_book(user_id, unique_ISBN)
+
+    workers = [
+        threading.Thread(target=desk, args=(user_id,))
+        for user_id in range(1, threads + 1)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    seconds = time.perf_counter() - start
+
+    timings.sort()
+    return (
+        f"{len(timings) / seconds:7.0f} loans/s"
+        f" | done {counts['done']:>5} | conflicts {counts['conflict']:>5}"
+        f" | errors {counts['error']:>4} | double loans {counts['double']:>4}"
+        f" | median {statistics.median(timings) * 1000:6.2f} ms"
+        f" | p99 {timings[int(len(timings) * 0.99) - 1] * 1000:6.2f} ms"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Database URL, defaults to a SQLite file.")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=200)
+    parser.add_argument("--popular", type=int, default=5)
+    parser.add_argument("--books", type=int, default=10_000)
+    args = parser.parse_args()
+
+    for name in ["transactional", "read-then-write"]:
+        with tempfile.TemporaryDirectory() as directory:
+            url = args.url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            connection = SQLConnection(
+                "", "", url=url, pool_size=args.threads, echo=False
+            )
+            connection.bulk_insert(
+                (
+                    {
+                        "title": f"Title {i}",
+                        "author": "Author",
+                        "release_year": 2000,
+                        "unique_ISBN": i,
+                    }
+                    for i in range(1, args.books + 1)
+                ),
+                Book,  # type: ignore
+            )
+            connection.bulk_insert(
+                (
+                    {"user_id": i, "name": f"User {i}", "address": "Main St"}
+                    for i in range(1, args.threads + 1)
+                ),
+                User,  # type: ignore
+            )
+            loan: Callable[[int, int], Outcome] = connection.loan_book
+            if name == "read-then-write":
+                loan = lambda user_id, isbn: naive_loan(  # noqa: E731
+                    connection, user_id, isbn
+                )
+            result = run(connection, loan, args.threads, args.attempts, args.popular)
+            print(f"{name:<15} | {result}", flush=True)
+            connection.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Benchmark loan reports over years of loan history.
+
+The loan_events table is filled with loans spread over several years,
+counted into the rollups by LoanReports.refresh, and the dashboard reports
+are timed against the same reports computed from the raw events.
+
+Run with ``python -m benchmarks.bench_loan_reports [--url URL]``.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable
+
+from sqlalchemy import func, select
+
+from src.data.database import SQLConnection
+from src.data.reports import LoanReports
+from src.entities.books import Book
+from src.entities.loan_events import LOAN, LoanEvent
+from src.entities.users import User  # noqa: F401 Needed to configure mappers
+
+
+def timed(call: Callable[[], Any], repeats: int = 5) -> float:
+    """Time a report.
+
+    Args:
+        call (Callable[[], Any]): Report to run.
+        repeats (int, optional): Runs. Defaults to 5.
+
+    Returns:
+        float: Median milliseconds.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def raw_top_authors(
+    connection: SQLConnection, start: datetime, end: datetime
+) -> list[Any]:
+    """Compute the top authors from the raw events.
+
+    Args:
+        connection (SQLConnection): Connection to the database.
+        start (datetime): First instant.
+        end (datetime): Instant after the last.
+
+    Returns:
+        list[Any]: Authors and loans.
+    """
+    loans = func.count()
+    statement = (
+        select(Book.author, loans)
+        .join(LoanEvent, LoanEvent.book_id == Book.unique_ISBN)
+        .where(
+            LoanEvent.action == LOAN,
+            LoanEvent.created_at >= start,
+            LoanEvent.created_at < end,
+        )
+        .group_by(Book.author)
+        .order_by(loans.desc())
+        .limit(10)
+    )
+    with connection.session_scope() as session:
+        return session.execute(statement).all()
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Database URL, defaults to a SQLite file.")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--books", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        connection = SQLConnection("", "", url=url)
+        connection.bulk_insert(
+            (
+                {
+                    "title": f"Title {i}",
+                    "author": f"Author {i % 2_000}",
+                    "release_year": 2000,
+                    "unique_ISBN": i,
+                }
+                for i in range(1, args.books + 1)
+            ),
+            Book,  # type: ignore
+        )
+        generator = random.Random(1)
+        first = datetime(2024 - args.years, 1, 1)
+        seconds = args.years * 365 * 24 * 3600
+        offsets = sorted(generator.randrange(seconds) for _ in range(args.events))
+        start = time.perf_counter()
+        connection.bulk_insert(
+            (
+                {
+                    "event_id": number,
+                    "book_id": generator.randint(1, args.books),
+                    "user_id": 1,
+                    "action": LOAN,
+                    "created_at": first + timedelta(seconds=offset),
+                }
+                for number, offset in enumerate(offsets, start=1)
+            ),
+            LoanEvent,  # type: ignore
+        )
+        print(
+            f"Inserted {args.events:,} events in {time.perf_counter() - start:.1f} s",
+            flush=True,
+        )
+
+        reports = LoanReports(connection)
+        start = time.perf_counter()
+        counted = reports.refresh()
+        elapsed = time.perf_counter() - start
+        print(
+            f"Rolled up {counted:,} loans in {elapsed:.1f} s"
+            f" ({counted / elapsed:,.0f} loans/s)",
+            flush=True,
+        )
+        print(f"Refresh without new loans: {timed(reports.refresh):7.2f} ms")
+
+        last = first.date() + timedelta(days=args.years * 365 - 1)
+        ranges = {
+            "last 30 days": (last - timedelta(days=29), last),
+            "last year": (last - timedelta(days=364), last),
+            "all years": (first.date(), last),
+        }
+        for name, (begin, end) in ranges.items():
+            rollup = timed(lambda: reports.top_authors(10, begin, end))
+            raw = timed(
+                lambda: raw_top_authors(
+                    connection,
+                    datetime.combine(begin, datetime.min.time()),
+                    datetime.combine(end + timedelta(days=1), datetime.min.time()),
+                ),
+                repeats=3,
+            )
+            print(
+                f"top authors, {name:<12} | rollups {rollup:8.2f} ms"
+                f" | raw events {raw:9.2f} ms",
+                flush=True,
+            )
+        print(f"top books, all time      | rollups {timed(reports.top_books):8.2f} ms")
+        print(
+            f"loans per day, last year | rollups"
+            f" {timed(lambda: reports.loans_per_day(*ranges['last year'])):8.2f} ms"
+        )
+        connection.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
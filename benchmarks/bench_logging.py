@@ -0,0 +1,139 @@
+"""Benchmark the time one activity log call costs the calling thread.
+
+The structured record of a loan is logged through the queued Loggers
+setup, which writes JSON lines from a background thread, and compared with
+writing the same line synchronously, with the print the log_activity
+decorator used to do, and with logging switched off. The transcript append
+done for every transaction is timed as well. On a single core the
+listener thread shares the CPU with the caller, so part of its formatting
+shows up in the queued timing.
+
+Run with ``python -m benchmarks.bench_logging [--calls N]``.
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable
+
+from src.loggers import JsonFormatter, Loggers, RotatingLogFileHandler, Transcript
+
+
+def per_call(call: Callable[[int], None], calls: int, repeats: int) -> list[float]:
+    """Time a call many times over.
+
+    Args:
+        call (Callable[[int], None]): Call to time, given the call number.
+        calls (int): Calls per repeat.
+        repeats (int): Repeats.
+
+    Returns:
+        list[float]: Microseconds per call of each repeat.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for i in range(calls):
+            call(i)
+        timings.append((time.perf_counter() - start) / calls * 1e6)
+    return timings
+
+
+def log_call(logger: logging.Logger) -> Callable[[int], None]:
+    """Log a loan like log_activity does.
+
+    Args:
+        logger (logging.Logger): Logger to log to.
+
+    Returns:
+        Callable[[int], None]: Logging call.
+    """
+
+    def call(i: int) -> None:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Bogen 'Dune' er blevet udlånt til bruger med ID 7.",
+                extra={"action": "loan_book", "user_id": 7, "book_id": i},
+            )
+
+    return call
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    def report(name: str, timings: list[float], extra: str = "") -> None:
+        print(
+            f"{name:<22} | median {statistics.median(timings):6.2f} µs/call"
+            f" | max {max(timings):6.2f} µs/call{extra}",
+            flush=True,
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "activity.log")
+
+        logger = logging.getLogger("bench.off")
+        logger.setLevel(logging.WARNING)
+        report("disabled", per_call(log_call(logger), args.calls, args.repeats))
+
+        loggers = Loggers(name="bench.queued", path=path)
+        timings = per_call(
+            log_call(logging.getLogger("bench.queued.activity")),
+            args.calls,
+            args.repeats,
+        )
+        drain = time.perf_counter()
+        loggers.close()
+        report(
+            "queued JSON file",
+            timings,
+            f" | {(time.perf_counter() - drain) * 1000:5.0f} ms to drain",
+        )
+
+        logger = logging.getLogger("bench.direct")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = RotatingLogFileHandler(path + ".direct")
+        handler.setFormatter(JsonFormatter())
+        logger.addHandler(handler)
+        report(
+            "synchronous JSON file",
+            per_call(log_call(logger), args.calls, args.repeats),
+        )
+        handler.close()
+
+        with open(path + ".print", "w", encoding="utf-8") as file:
+            with contextlib.redirect_stdout(file):
+                timings = per_call(
+                    lambda i: print(
+                        f"Function 'loan_book' called with args: (7, {i}),"
+                        " kwargs: {}"
+                    ),
+                    args.calls,
+                    args.repeats,
+                )
+        report("print to file", timings)
+
+        transcript = Transcript()
+        report(
+            "transcript append",
+            per_call(
+                lambda i: transcript.append(
+                    user_id=7, action="Loan book", book_title="Dune", book_id=i
+                ),
+                args.calls,
+                args.repeats,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
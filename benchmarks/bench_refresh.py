@@ -0,0 +1,96 @@
+"""Benchmark an incremental catalog refresh against a full reload.
+
+For each catalog size, a few books are added and removed by "another desk"
+and the library catches up either by reloading the whole table or with
+LibrarySystem.refresh, which only reads the changelog and changed rows.
+
+Run with ``python -m benchmarks.bench_refresh [--url URL]``.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from src.data.database import SQLConnection
+from src.entities.books import Book
+from src.lib_system import LibrarySystem
+from src.utils import set_worker_id
+
+
+def run(connection: SQLConnection, size: int, churn: int) -> str:
+    """Time both ways of catching up for one catalog size.
+
+    Args:
+        connection (SQLConnection): Connection to an empty database.
+        size (int): Books in the catalog.
+        churn (int): Books changed by the other desk.
+
+    Returns:
+        str: Result line.
+    """
+    connection.bulk_insert(
+        (
+            {
+                "title": f"Title {i}",
+                "author": f"Author {i % 50}",
+                "release_year": 1950 + i % 70,
+                "unique_ISBN": i + 1,
+            }
+            for i in range(size)
+        ),
+        Book,  # type: ignore
+    )
+    watermark = connection.change_watermark()
+    library = LibrarySystem(
+        connection.load_books_from_database(),
+        change_loader=connection.load_changes,
+        watermark=watermark,
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(churn // 2):
+            connection.add_book(f"New title {i}", "New author", 2024)
+        for i in range(churn - churn // 2):
+            connection.remove_book_by_id(i + 1)
+
+    start = time.perf_counter()
+    reloaded = connection.load_books_from_database()
+    reload_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    library.refresh()
+    refresh_seconds = time.perf_counter() - start
+
+    assert len(library.books) == len(reloaded)  # type: ignore
+    return (
+        f"{size:>9,} books | {churn:>4} changes"
+        f" | reload {reload_seconds * 1000:8.1f} ms"
+        f" | refresh {refresh_seconds * 1000:6.1f} ms"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Database URL, defaults to a SQLite file.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 300_000]
+    )
+    parser.add_argument("--churn", type=int, default=50)
+    args = parser.parse_args()
+    # Benchmarks write to throwaway databases, so one worker id is enough
+    set_worker_id(0)
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            url = args.url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            connection = SQLConnection("", "", url=url, echo=False)
+            print(run(connection, size, args.churn), flush=True)
+            connection.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
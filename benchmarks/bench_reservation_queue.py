@@ -0,0 +1,127 @@
+"""Benchmark returns that hand books to the next user in the queue.
+
+The reservations table is filled with queues for many books, then books
+are loaned and returned, each return promoting the first user in line.
+The (book_id, created_at) index keeps the promotion cost flat as the
+table grows. Notifications go to a sink taking 50 ms per batch, which the
+returns do not wait for.
+
+Run with ``python -m benchmarks.bench_reservation_queue [--url URL]``.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.data.database import DONE, SQLConnection
+from src.entities.books import Book
+from src.entities.reservations import Reservation
+from src.entities.users import User
+from src.notifications import MemorySink, Notification, NotificationDispatcher
+
+
+class SlowSink(MemorySink):
+    """Sink taking a while per batch, like a remote mail service."""
+
+    def send_batch(self, notifications: list[Notification]) -> None:
+        """Wait, then store notifications.
+
+        Args:
+            notifications (list[Notification]): Notifications to store.
+        """
+        time.sleep(0.05)
+        super().send_batch(notifications)
+
+
+def run(connection: SQLConnection, queued: int, returns: int) -> str:
+    """Time loan and return cycles over a filled reservations table.
+
+    Args:
+        connection (SQLConnection): Connection to an empty database.
+        queued (int): Reservations in the table.
+        returns (int): Returns to time.
+
+    Returns:
+        str: Result line.
+    """
+    books = max(returns, queued // 100)
+    connection.bulk_insert(
+        (
+            {
+                "title": f"Title {i}",
+                "author": "A",
+                "release_year": 2000,
+                "unique_ISBN": i,
+            }
+            for i in range(1, books + 1)
+        ),
+        Book,  # type: ignore
+    )
+    connection.bulk_insert(
+        (
+            {"user_id": i, "name": f"User {i}", "address": "Main St"}
+            for i in range(1, 102)
+        ),
+        User,  # type: ignore
+    )
+    start = datetime.now(timezone.utc)
+    connection.bulk_insert(
+        (
+            {
+                "book_id": 1 + i % books,
+                "user_id": 2 + i // books % 100,
+                "created_at": start + timedelta(microseconds=i),
+            }
+            for i in range(queued)
+        ),
+        Reservation,  # type: ignore
+    )
+
+    sink = SlowSink()
+    dispatcher = NotificationDispatcher([sink], flush_interval=0.01)
+    connection.add_listener(dispatcher.on_change)
+    timings = []
+    for unique_ISBN in range(1, returns + 1):
+        # User 1 borrows the book and hands it back to the queue
+        connection.reserve_book(1, unique_ISBN)
+        status, _ = connection.loan_book(1, unique_ISBN)
+        assert status == DONE
+        begin = time.perf_counter()
+        connection.return_book(1, unique_ISBN)
+        timings.append((time.perf_counter() - begin) * 1000)
+    connection.remove_listener(dispatcher.on_change)
+    drain = time.perf_counter()
+    dispatcher.close()
+    drain_seconds = time.perf_counter() - drain
+
+    return (
+        f"{queued:>9,} reservations | return median"
+        f" {statistics.median(timings):5.2f} ms | max {max(timings):6.2f} ms"
+        f" | {len(sink.notifications)} notified in {len(sink.batches)} batches,"
+        f" {drain_seconds * 1000:5.0f} ms left to send at the end"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Database URL, defaults to a SQLite file.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--returns", type=int, default=200)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            url = args.url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            connection = SQLConnection("", "", url=url, echo=False)
+            print(run(connection, size, args.returns), flush=True)
+            connection.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
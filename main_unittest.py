@@ -2,13 +2,55 @@
 
 import unittest
 
+from unit_test.test_async_database import TestAsyncSQLConnection
+from unit_test.test_autocomplete import TestAutocomplete
+from unit_test.test_batch_search import TestBatchSearch
 from unit_test.test_book import TestBook
+from unit_test.test_cache import TestCatalogCache
+from unit_test.test_catalog import TestCompactCatalog
+from unit_test.test_database import TestSQLConnection
+from unit_test.test_export import TestExport
+from unit_test.test_fuzzy import TestFuzzySearch
+from unit_test.test_generator import TestGenerator
+from unit_test.test_importer import TestCatalogImporter
+from unit_test.test_lib_system import TestLibrarySystem
+from unit_test.test_loggers import TestLoggers
+from unit_test.test_notifications import TestNotificationDispatcher
+from unit_test.test_profiler import TestQueryProfiler
+from unit_test.test_reports import TestLoanReports
+from unit_test.test_sql_strategies import TestSQLStrategies
+from unit_test.test_tasks import TestTaskRunner
+from unit_test.test_text_index import TestTextIndex
 from unit_test.test_user import TestUser
+from unit_test.test_utils import TestIdGenerator
+from unit_test.test_year_index import TestYearIndex
 
 # Create test suite
 test_suite = unittest.TestSuite()
 test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestUser))
 test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestBook))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestLibrarySystem))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTextIndex))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestYearIndex))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSQLStrategies))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestTaskRunner))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestSQLConnection))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAsyncSQLConnection))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestGenerator))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestIdGenerator))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCatalogCache))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCompactCatalog))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestBatchSearch))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestFuzzySearch))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestAutocomplete))
+test_suite.addTests(
+    unittest.TestLoader().loadTestsFromTestCase(TestNotificationDispatcher)
+)
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestLoggers))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestQueryProfiler))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestLoanReports))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestExport))
+test_suite.addTests(unittest.TestLoader().loadTestsFromTestCase(TestCatalogImporter))
 
 # Run the test suite
 unittest.TextTestRunner(verbosity=2).run(test_suite)
@@ -9,6 +9,7 @@ SETUP_REQUIRES = [
 
 INSTALL_REQUIRES = [
     "faker",
+    "numpy",
     "tqdm",
     "mysql",
     "sqlalchemy",
@@ -25,6 +26,13 @@ EXTRAS_REQUIRE = {
         "pre-commit",
         "versioneer",
     ],
+    "async": [
+        "aiomysql",
+        "aiosqlite",
+    ],
+    "parquet": [
+        "pyarrow",
+    ],
 }
 
 # https://pypi.org/classifiers/
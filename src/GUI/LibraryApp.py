@@ -1,25 +1,54 @@
 """GUI for library system."""
 
-# TODO: Fix messagebox
 import tkinter as tkinter
-from tkinter import ttk
-from typing import Any, Optional
+from itertools import islice
+from tkinter import messagebox, ttk
+from typing import Any, Iterable, Iterator, Optional, Union
 
+from src.data.cache import CachedSearchStrategy, CatalogCache
+from src.data.catalog import CompactCatalog
 from src.data.database import SQLConnection
 from src.entities.books import Book
-from src.lib_system import (
-    AuthorSearchStrategy,
-    ISBNSearchStrategy,
-    LibrarySystem,
-    TitleSearchStrategy,
-    yearSearchStrategy,
+from src.GUI.tasks import TaskRunner
+from src.lib_system import ISBNSearchStrategy, LibrarySystem
+from src.loggers import Loggers
+from src.notifications import NotificationDispatcher, PrintSink
+from src.search.autocomplete import Autocomplete
+from src.search.fuzzy import FuzzyAuthorSearchStrategy, FuzzyTitleSearchStrategy
+from src.search.sql_strategies import (
+    SQLAuthorSearchStrategy,
+    SQLISBNSearchStrategy,
+    SQLTitleSearchStrategy,
+    SQLYearSearchStrategy,
 )
-from src.utils import ConfigManager
+from src.search.text_index import (
+    IndexedAuthorSearchStrategy,
+    IndexedTitleSearchStrategy,
+)
+from src.search.year_index import YearRangeSearchStrategy
+from src.utils import ConfigManager, set_worker_id
 
 
 class LibraryApp(tkinter.Tk):
     """User interface to interact with library system."""
 
+    # Books pulled from the search per page and rows inserted per event loop turn
+    RESULTS_PAGE_SIZE = 100
+    RESULTS_BATCH_SIZE = 25
+    # Fraction of the list scrolled past before the next page is fetched
+    RESULTS_PREFETCH_AT = 0.8
+    # Quiet time after the last keystroke before searching as you type
+    SEARCH_DEBOUNCE_MS = 250
+    # Completions listed under the search box
+    SUGGESTIONS_SHOWN = 8
+    # Searched attribute of the strategies that get completions
+    SUGGESTED_ATTRIBUTES = {
+        "Title": "title",
+        "Author": "author",
+        "Title (fuzzy)": "title",
+        "Author (fuzzy)": "author",
+    }
+
     def __init__(self, *args, **kwargs):  # type: ignore
         """Initialize class."""
         super().__init__(*args, **kwargs)
@@ -28,14 +57,104 @@ class LibraryApp(tkinter.Tk):
         self.user_name = self.config_manager.username()
         self.password = self.config_manager.password()
         self.geometry("800x600")
+        self.loggers = Loggers(
+            path=self.config_manager.get("log_file", "library.log"),
+            max_bytes=int(self.config_manager.get("log_max_bytes", 10_000_000)),
+            interval=float(self.config_manager.get("log_rotate_hours", 24)) * 3600,
+            backup_count=int(self.config_manager.get("log_backups", 7)),
+        )
 
-        self.connection = SQLConnection(self.user_name, self.password)
+        set_worker_id(self.config_manager.worker_id())
+
+        self.connection = SQLConnection(
+            self.user_name,
+            self.password,
+            url=self.config_manager.get("database_url"),
+            pool_size=int(self.config_manager.get("pool_size", 5)),
+            max_overflow=int(self.config_manager.get("max_overflow", 10)),
+            pool_pre_ping=bool(self.config_manager.get("pool_pre_ping", True)),
+            pool_recycle=int(self.config_manager.get("pool_recycle", 3600)),
+            echo=bool(self.config_manager.get("sql_echo", False)),
+            profile=bool(self.config_manager.get("sql_profile", False)),
+            slow_query_threshold=float(self.config_manager.get("slow_query_ms", 100))
+            / 1000,
+        )
         self.connection.create_fake_dataset()
+        self.cache = CatalogCache(
+            self.connection,
+            max_books=int(self.config_manager.get("cache_books", 10_000)),
+            max_searches=int(self.config_manager.get("cache_searches", 256)),
+            ttl=float(self.config_manager.get("cache_ttl", 300)),
+        )
+        # Users next in line for a returned book are told in the background
+        self.notifications = NotificationDispatcher([PrintSink()])
+        self.connection.add_listener(self.notifications.on_change)
+
+        # Changes made after this point are pulled by refresh_catalog
+        watermark = self.connection.change_watermark()
+
+        # Strategies are kept between searches so their indexes are only built once
+        if self.config_manager.get("search_backend", "database") == "memory":
+            # Load books from the database or any other source
+            books: Any
+            if self.config_manager.get("catalog_store", "compact") == "compact":
+                books = CompactCatalog.from_rows(self.connection.load_book_rows())
+            else:
+                books = self.cache.load_books_from_database()
+            self.library = LibrarySystem(
+                books,
+                change_loader=self.connection.load_changes,
+                watermark=watermark,
+                transactions=self.connection,
+            )
+            self.search_strategies = {
+                "Title": IndexedTitleSearchStrategy(),
+                "Author": IndexedAuthorSearchStrategy(),
+                "ISBN": ISBNSearchStrategy(),
+                "Release Year": YearRangeSearchStrategy(),
+                "Title (fuzzy)": FuzzyTitleSearchStrategy(),
+                "Author (fuzzy)": FuzzyAuthorSearchStrategy(),
+            }
+        else:
+            # Search in the database and only load the books that are used
+            self.library = LibrarySystem(
+                book_loader=self.cache.get_book,
+                change_loader=self.connection.load_changes,
+                watermark=watermark,
+                transactions=self.connection,
+            )
+            sql_strategies = {
+                "Title": SQLTitleSearchStrategy(self.connection.Session),
+                "Author": SQLAuthorSearchStrategy(self.connection.Session),
+                "ISBN": SQLISBNSearchStrategy(self.connection.Session),
+                "Release Year": SQLYearSearchStrategy(self.connection.Session),
+            }
+            self.search_strategies = {
+                name: CachedSearchStrategy(strategy, self.cache)
+                for name, strategy in sql_strategies.items()
+            }
+        self.search_results: list[type[Book]] = []
+        self._results_iterator: Iterator[type[Book]] = iter(())
+        self._results_exhausted = True
+        self._results_loading = False
+        self._results_generation = 0
+        self._results_quiet = False
+
+        # Database and search work runs on workers so the window stays responsive
+        self.tasks = TaskRunner(
+            self, max_workers=int(self.config_manager.get("worker_threads", 4))
+        )
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh_interval_ms = int(
+            float(self.config_manager.get("refresh_interval", 30)) * 1000
+        )
+        self.schedule_refresh()
 
-        # Load books from the database or any other source
-        books = self.connection.load_books_from_database()
-
-        self.library = LibrarySystem(books)
+        # Completions are built in the background, the search box works without
+        self.autocomplete: dict[str, Autocomplete] = {}
+        self.tasks.submit(
+            self.build_autocomplete, on_done=self.set_autocomplete, key="autocomplete"
+        )
 
         self.search_frame = tkinter.Frame(self)
         self.search_frame.pack(padx=10, pady=10)
@@ -45,12 +164,23 @@ class LibraryApp(tkinter.Tk):
 
         self.query_entry = tkinter.Entry(self.search_frame)
         self.query_entry.grid(row=1, column=1, padx=10, pady=10, sticky="ew")
+        self.query_entry.bind("<KeyRelease>", self.on_query_typed)
+        self.query_entry.bind("<Down>", self.focus_suggestions)
+        self.query_entry.bind("<Escape>", lambda event: self.hide_suggestions())
+
+        # Floats under the search box while there are completions
+        self.suggestions_listbox = tkinter.Listbox(
+            self.search_frame, height=self.SUGGESTIONS_SHOWN
+        )
+        self.suggestions_listbox.bind("<ButtonRelease-1>", self.pick_suggestion)
+        self.suggestions_listbox.bind("<Return>", self.pick_suggestion)
+        self.suggestions_listbox.bind("<Escape>", lambda event: self.hide_suggestions())
 
         self.strategy_label = tkinter.Label(self.search_frame, text="Search Strategy:")
         self.strategy_label.grid(row=2, column=0, padx=10, pady=10, sticky="w")
 
         self.strategy_combobox = ttk.Combobox(
-            self.search_frame, values=["Title", "Author", "ISBN", "Release Year"]
+            self.search_frame, values=list(self.search_strategies)
         )
         self.strategy_combobox.grid(row=2, column=1, padx=10, pady=10, sticky="ew")
         self.strategy_combobox.current(0)
@@ -108,7 +238,7 @@ class LibraryApp(tkinter.Tk):
         )
         self.results_scrollbar.grid(row=1, column=1, sticky="ns")
 
-        self.results_listbox.config(yscrollcommand=self.results_scrollbar.set)
+        self.results_listbox.config(yscrollcommand=self.on_results_scrolled)
 
     def get_selected_book_id(self) -> Optional[int]:
         """Get id of the selected book.
@@ -118,7 +248,7 @@ class LibraryApp(tkinter.Tk):
         """
         selected_book_index = self.results_listbox.curselection()  # type: ignore
         if selected_book_index:
-            selected_book = self.library.books[selected_book_index[0]]  # type: ignore
+            selected_book = self.search_results[selected_book_index[0]]
             return int(selected_book.unique_ISBN)
         return None
 
@@ -131,30 +261,58 @@ class LibraryApp(tkinter.Tk):
         """
         selected_book_index = self.results_listbox.curselection()  # type: ignore
         if selected_book_index:
-            message = self.library.return_book(user_id, book_id)
-            tkinter.messagebox.showinfo("Return Book", message)  # type: ignore
-            self.search_books()  # Refresh the search results after returning a book
+            self.run_transaction(
+                "Return Book", self.library.return_book, user_id, book_id
+            )
 
     def reserve_book(self) -> None:
         """Get the selected book from the listbox."""
         selected_book_index = self.results_listbox.curselection()  # type: ignore
         if selected_book_index:
-            selected_book = self.library.books[selected_book_index[0]]  # type: ignore
+            selected_book = self.search_results[selected_book_index[0]]
             user_id = self.get_user_id_from_input()
             book_id = selected_book.unique_ISBN
-            message = self.library.reserve_book(user_id, book_id)
-            tkinter.messagebox.showinfo("Reserve Book", message)  # type:ignore
-            self.search_books()  # Refresh the search results after reserving a book
+            self.run_transaction(
+                "Reserve Book", self.library.reserve_book, user_id, book_id
+            )
 
     def loan_book(self) -> None:
         """Get the selected book from the listbox."""
         selected_book_index = self.results_listbox.curselection()  # type: ignore
         if selected_book_index:
-            selected_book = self.library.books[selected_book_index[0]]  # type: ignore
+            selected_book = self.search_results[selected_book_index[0]]
             user_id = self.get_user_id_from_input()
-            message = self.library.loan_book(user_id, selected_book.unique_ISBN)
-            tkinter.messagebox.showinfo("Loan Book", message)  # type: ignore
-            self.search_books()  # Refresh the search results after loaning a book
+            self.run_transaction(
+                "Loan Book", self.library.loan_book, user_id, selected_book.unique_ISBN
+            )
+
+    def run_transaction(
+        self, title: str, transaction: Any, user_id: int, book_id: Optional[int]
+    ) -> None:
+        """Run a loan, return or reservation in the background.
+
+        Args:
+            title (str): Title of the message box showing the result.
+            transaction (Any): LibrarySystem method to run.
+            user_id (int): Id of the user.
+            book_id (Optional[int]): Id of the book.
+        """
+
+        def show_result(message: str) -> None:
+            messagebox.showinfo(title, message)
+            # Refresh the search results after the transaction
+            self.search_books(quiet=True)
+
+        def show_error(error: BaseException) -> None:
+            messagebox.showerror(title, str(error))
+
+        self.tasks.submit(
+            transaction,
+            user_id,
+            book_id,
+            on_done=show_result,
+            on_error=show_error,
+        )
 
     def get_user_id_from_input(self) -> int:
         """Get user ID input from the entry field.
@@ -165,54 +323,264 @@ class LibraryApp(tkinter.Tk):
         user_id = self.user_id_entry.get()
         return int(user_id)
 
-    def search_books(self) -> None:
-        """Search for book."""
+    def on_query_typed(self, event: Any) -> None:
+        """Search as the user types, once typing pauses.
+
+        Args:
+            event (Any): Key release event.
+        """
+        if event.keysym in ("Down", "Up", "Escape", "Return"):
+            return
+        self.show_suggestions()
+        self.tasks.debounce(
+            "search", self.SEARCH_DEBOUNCE_MS, lambda: self.search_books(quiet=True)
+        )
+
+    def build_autocomplete(self) -> dict[str, Autocomplete]:
+        """Build the title and author completions from the database.
+
+        Runs on a worker, so it reads its own copy of the titles and authors
+        rather than the catalog of the library.
+
+        Returns:
+            dict[str, Autocomplete]: Completions by attribute.
+        """
+        catalog = CompactCatalog.from_rows(self.connection.load_book_rows())
+        loans = self.connection.loan_counts()
+        return {
+            attribute: Autocomplete.from_books(catalog, attribute, loans)
+            for attribute in ("title", "author")
+        }
+
+    def set_autocomplete(self, autocomplete: dict[str, Autocomplete]) -> None:
+        """Start suggesting completions.
+
+        Args:
+            autocomplete (dict[str, Autocomplete]): Completions by attribute.
+        """
+        self.autocomplete = autocomplete
+
+    def show_suggestions(self) -> None:
+        """List completions of the query under the search box."""
+        attribute = self.SUGGESTED_ATTRIBUTES.get(self.strategy_combobox.get())
+        completer = self.autocomplete.get(attribute or "")
         query = self.query_entry.get()
-        selected_strategy = self.strategy_combobox.get()
+        suggestions = (
+            completer.complete(query, self.SUGGESTIONS_SHOWN) if completer else []
+        )
+        if not suggestions or suggestions == [query]:
+            self.hide_suggestions()
+            return
 
-        if selected_strategy == "Title":
-            self.library.search_strategy = TitleSearchStrategy()
-        elif selected_strategy == "Author":
-            self.library.search_strategy = AuthorSearchStrategy()
-        elif selected_strategy == "ISBN":
-            self.library.search_strategy = ISBNSearchStrategy()
-        elif selected_strategy == "Release Year":
-            self.library.search_strategy = yearSearchStrategy()
+        self.suggestions_listbox.delete(0, tkinter.END)
+        self.suggestions_listbox.insert(tkinter.END, *suggestions)
+        self.suggestions_listbox.config(height=len(suggestions))
+        self.suggestions_listbox.place(in_=self.query_entry, relx=0, rely=1, relwidth=1)
+        self.suggestions_listbox.lift()
 
-        # Set the search strategy in the LibrarySystem instance
-        self.library.search_strategy = self.library.search_strategy
+    def hide_suggestions(self) -> None:
+        """Remove the completions from the window."""
+        self.suggestions_listbox.place_forget()
 
-        print("Search query:", query)
-        # print("Books in library:", self.library.books)
+    def focus_suggestions(self, event: Any) -> None:
+        """Move the keyboard focus to the completions.
+
+        Args:
+            event (Any): Key press event.
+        """
+        if self.suggestions_listbox.winfo_ismapped():
+            self.suggestions_listbox.focus_set()
+            self.suggestions_listbox.selection_clear(0, tkinter.END)
+            self.suggestions_listbox.selection_set(0)
+            self.suggestions_listbox.activate(0)
+
+    def pick_suggestion(self, event: Any) -> None:
+        """Search for the chosen completion.
+
+        Args:
+            event (Any): Click or key press event.
+        """
+        selection = self.suggestions_listbox.curselection()  # type: ignore
+        if not selection:
+            return
+        self.query_entry.delete(0, tkinter.END)
+        self.query_entry.insert(0, self.suggestions_listbox.get(selection[0]))
+        self.hide_suggestions()
+        self.query_entry.focus_set()
+        self.search_books()
+
+    def refresh_catalog(self) -> None:
+        """Pull books changed by other desks in the background."""
+        self.tasks.submit(
+            self.connection.load_changes,
+            self.library.watermark,
+            on_done=self.apply_catalog_changes,
+            on_error=lambda error: self.schedule_refresh(),
+            key="refresh",
+        )
+
+    def apply_catalog_changes(self, changes: Any) -> None:
+        """Patch the library and the cache with pulled changes.
+
+        Args:
+            changes (Any): Changed books, removed ISBNs and watermark.
+        """
+        books, removed, watermark = changes
+        self.library.apply_changes(books, removed, watermark)
+        for book in books:
+            for attribute, completer in self.autocomplete.items():
+                completer.add(getattr(book, attribute) or "")
+        self.cache.apply_changes(books, removed)
+        self.schedule_refresh()
+
+    def schedule_refresh(self) -> None:
+        """Pull changes again after the refresh interval."""
+        self.after(self.refresh_interval_ms, self.refresh_catalog)
+
+    def close(self) -> None:
+        """Stop the background workers and close the window."""
+        self.tasks.shutdown()
+        self.notifications.close(timeout=2)
+        self.connection.dump_stats(
+            self.config_manager.get("sql_profile_file", "sql_profile.json")
+        )
+        self.loggers.close()
+        self.destroy()
+
+    def search_books(self, quiet: bool = False) -> None:
+        """Search for book.
+
+        Args:
+            quiet (bool, optional): Search not asked for with the Search
+                button, e.g. while the user types. A query that cannot be
+                parsed yet, such as "19" on its way to "1990-1999", then
+                clears the results without an error dialog. Defaults to False.
+        """
+        query = self.query_entry.get()
+        selected_strategy = self.strategy_combobox.get()
+
+        # Set the search strategy in the LibrarySystem instance
+        if selected_strategy in self.search_strategies:
+            self.library.search_strategy = self.search_strategies[selected_strategy]
 
         # Perform search using selected strategy
-        search_results = list(
-            self.library.search_books(query)
-        )  # Only pass query argument
-        self.display_search_results(search_results)
+        search_results = self.library.search_books(query)  # Only pass query argument
+        self.display_search_results(search_results, quiet)
+
+    def display_search_results(
+        self, search_results: Iterable[type[Book]], quiet: bool = False
+    ) -> None:
+        """Display results of search page by page.
 
-    def display_search_results(self, search_results: list[type[Book]]) -> None:
-        """Display results of search.
+        Only the first page is read from the results, the rest is read when
+        the user scrolls towards the end of the list.
 
         Args:
-            search_results (list[Book]): Found books.
+            search_results (Iterable[type[Book]]): Found books.
+            quiet (bool, optional): Leave out the dialog for unparsable
+                queries. Defaults to False.
         """
         self.results_listbox.delete(0, tkinter.END)
+        self.search_results = []
+        self._results_iterator = iter(search_results)
+        self._results_exhausted = False
+        self._results_loading = False
+        self._results_quiet = quiet
+        self._results_generation += 1
+
+        self.load_more_results()
+
+    def load_more_results(self) -> None:
+        """Read the next page of results and start inserting it."""
+        if self._results_loading or self._results_exhausted:
+            return
+
+        self._results_loading = True
+        generation = self._results_generation
+        iterator = self._results_iterator
+
+        # Replaces, and so cancels, the page fetch of an older search
+        self.tasks.submit(
+            lambda: list(islice(iterator, self.RESULTS_PAGE_SIZE)),
+            on_done=lambda page: self.show_results_page(page, generation),
+            on_error=self.show_search_error,
+            key="search",
+        )
 
-        print("Received", len(search_results), "search results.")
-
-        for book in search_results:
-            print(
-                "Displaying book:",
-                book.title,
-                "by",
-                book.author,
-                "(Release Year:",
-                book.release_year,
-                ")",
-            )
-            book_info = f"{book.title} by {book.author} ({book.release_year})"
-            self.results_listbox.insert(tkinter.END, book_info)
+    def show_results_page(self, page: list[type[Book]], generation: int) -> None:
+        """Start inserting a page fetched in the background.
+
+        Args:
+            page (list[type[Book]]): Books of the page.
+            generation (int): Search the page belongs to.
+        """
+        if generation != self._results_generation:
+            return
+
+        if len(page) < self.RESULTS_PAGE_SIZE:
+            self._results_exhausted = True
+        self.insert_results_batch(page, 0, generation)
+
+    def show_search_error(self, error: BaseException) -> None:
+        """Stop loading results and show why the search failed.
+
+        A query rejected during a quiet search, e.g. while the user is still
+        typing, leaves the results empty instead.
+
+        Args:
+            error (BaseException): Error raised by the search.
+        """
+        self._results_loading = False
+        self._results_exhausted = True
+        if self._results_quiet and isinstance(error, ValueError):
+            return
+        messagebox.showerror("Search", str(error))
+
+    def insert_results_batch(
+        self, page: list[type[Book]], start: int, generation: int
+    ) -> None:
+        """Insert a batch of books and schedule the rest of the page.
+
+        Args:
+            page (list[type[Book]]): Books of the page.
+            start (int): Position in the page of the first book to insert.
+            generation (int): Search the page belongs to.
+        """
+        if generation != self._results_generation:
+            return  # A newer search has replaced these results
+
+        batch = page[start : start + self.RESULTS_BATCH_SIZE]
+        self.search_results.extend(batch)
+        self.results_listbox.insert(
+            tkinter.END,
+            *[f"{book.title} by {book.author} ({book.release_year})" for book in batch],
+        )
+
+        end = start + len(batch)
+        if end < len(page):
+            self.after(1, self.insert_results_batch, page, end, generation)
+            return
+
+        self._results_loading = False
+        more = "" if self._results_exhausted else "+"
+        self.results_label.config(
+            text=f"Search Results: {len(self.search_results)}{more}"
+        )
+
+    def on_results_scrolled(
+        self, first: Union[float, str], last: Union[float, str]
+    ) -> None:
+        """Update the scrollbar and fetch more results near the end.
+
+        Args:
+            first (Union[float, str]): Fraction of the list above the view,
+                passed by Tk as a string.
+            last (Union[float, str]): Fraction of the list up to the end of
+                the view.
+        """
+        self.results_scrollbar.set(first, last)
+        if float(last) >= self.RESULTS_PREFETCH_AT:
+            self.after_idle(self.load_more_results)
 
 
 if __name__ == "__main__":
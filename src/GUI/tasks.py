@@ -0,0 +1,174 @@
+"""Background task layer keeping slow work off the Tk main thread."""
+
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+Callback = Callable[[Any], None]
+
+
+class TaskRunner:
+    """Run work on a thread pool and hand the results back to the Tk thread.
+
+    Tk widgets may only be touched from the main thread, so workers never call
+    the callbacks themselves. Finished tasks are put on a queue, which the main
+    thread drains with after() while tasks are outstanding.
+
+    Tasks submitted with a key replace the previous task with the same key:
+    the old one is cancelled if it has not started yet, and its result is
+    dropped if it has.
+    """
+
+    def __init__(
+        self,
+        widget: Any,
+        max_workers: int = 4,
+        poll_interval_ms: int = 15,
+    ) -> None:
+        """Initialize class.
+
+        Args:
+            widget (Any): Tk widget whose after() runs the callbacks.
+            max_workers (int, optional): Worker threads. Defaults to 4.
+            poll_interval_ms (int, optional): How often finished tasks are
+                collected. Defaults to 15.
+        """
+        self.widget = widget
+        self.poll_interval_ms = poll_interval_ms
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="library-worker"
+        )
+        self._finished: queue.Queue[tuple[Any, ...]] = queue.Queue()
+        self._outstanding = 0
+        self._polling = False
+        self._generations: dict[str, int] = {}
+        self._futures: dict[str, Future[Any]] = {}
+        self._debounced: dict[str, str] = {}
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        on_done: Optional[Callback] = None,
+        on_error: Optional[Callback] = None,
+        key: Optional[str] = None,
+    ) -> Future[Any]:
+        """Run a function on a worker thread.
+
+        Args:
+            func (Callable[..., Any]): Work to run.
+            *args (Any): Arguments for the work.
+            on_done (Optional[Callback], optional): Called on the main thread
+                with the result. Defaults to None.
+            on_error (Optional[Callback], optional): Called on the main thread
+                with the exception. Defaults to None.
+            key (Optional[str], optional): Replace the previous task with this
+                key. Defaults to None.
+
+        Returns:
+            Future[Any]: The running task.
+        """
+        generation = self.cancel(key) if key is not None else 0
+
+        future = self.executor.submit(func, *args)
+        if key is not None:
+            self._futures[key] = future
+
+        self._outstanding += 1
+        future.add_done_callback(
+            lambda done: self._finished.put((key, generation, done, on_done, on_error))
+        )
+        self._start_polling()
+        return future
+
+    def cancel(self, key: str) -> int:
+        """Cancel the task with a key and mark its result as stale.
+
+        Args:
+            key (str): Task key.
+
+        Returns:
+            int: The generation for the next task with this key.
+        """
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+
+        future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+        return generation
+
+    def is_current(self, key: Optional[str], generation: int) -> bool:
+        """Check if a task has not been replaced by a newer one.
+
+        Args:
+            key (Optional[str]): Task key.
+            generation (int): Generation of the task.
+
+        Returns:
+            bool: Is the task current.
+        """
+        return key is None or self._generations.get(key) == generation
+
+    def debounce(
+        self, key: str, delay_ms: int, func: Callable[..., Any], *args: Any
+    ) -> None:
+        """Call a function on the main thread once calls stop for a while.
+
+        Args:
+            key (str): Calls with the same key replace each other.
+            delay_ms (int): Quiet time before the function is called.
+            func (Callable[..., Any]): Function to call.
+            *args (Any): Arguments for the function.
+        """
+        pending = self._debounced.pop(key, None)
+        if pending is not None:
+            self.widget.after_cancel(pending)
+
+        def fire() -> None:
+            self._debounced.pop(key, None)
+            func(*args)
+
+        self._debounced[key] = self.widget.after(delay_ms, fire)
+
+    def _start_polling(self) -> None:
+        """Schedule collection of finished tasks if not already scheduled."""
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_interval_ms, self._poll)
+
+    def _poll(self) -> None:
+        """Run the callbacks of finished tasks on the main thread."""
+        self._polling = False
+        while True:
+            try:
+                key, generation, future, on_done, on_error = self._finished.get_nowait()
+            except queue.Empty:
+                break
+
+            self._outstanding -= 1
+            if key is not None and self._futures.get(key) is future:
+                del self._futures[key]
+            if future.cancelled() or not self.is_current(key, generation):
+                continue
+
+            error = future.exception()
+            if error is not None:
+                if on_error is not None:
+                    on_error(error)
+            elif on_done is not None:
+                on_done(future.result())
+
+        if self._outstanding > 0:
+            self._start_polling()
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping tasks that have not started."""
+        for pending in self._debounced.values():
+            self.widget.after_cancel(pending)
+        self._debounced.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    pass
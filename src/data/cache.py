@@ -0,0 +1,361 @@
+"""Read-through cache between SQLConnection and LibrarySystem."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generator, Hashable, Optional
+
+from src.entities.books import Book
+from src.lib_system import SearchStrategy
+from src.search.sql_strategies import PageKey, SQLSearchStrategy
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Mapping that evicts the least recently used entries.
+
+    Entries also expire a fixed time after they were stored. Counters of
+    hits, misses, evictions and expirations are kept to size the cache.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize class.
+
+        Args:
+            max_size (int, optional): Entries kept. Defaults to 1024.
+            ttl (Optional[float], optional): Seconds an entry is valid, None
+                to keep entries until they are evicted. Defaults to None.
+            clock (Callable[[], float], optional): Current time in seconds.
+                Defaults to time.monotonic.
+
+        Raises:
+            ValueError: Size below one.
+        """
+        if max_size < 1:
+            raise ValueError(f"Cache size must be at least 1: {max_size}")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        """Count the stored entries, including expired ones not yet dropped.
+
+        Returns:
+            int: Number of entries.
+        """
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Look up an entry and mark it as recently used.
+
+        Args:
+            key (Hashable): Key of the entry.
+            default (Any, optional): Returned on a miss. Defaults to None.
+
+        Returns:
+            Any: Cached value or the default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < self.clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store an entry, evicting the least recently used one if full.
+
+        Args:
+            key (Hashable): Key of the entry.
+            value (Any): Value to cache.
+        """
+        expires = self.clock() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Any:
+        """Remove an entry.
+
+        Args:
+            key (Hashable): Key of the entry.
+
+        Returns:
+            Any: Removed value, None if there was none.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """Remove all entries, keeping the counters."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Report the counters.
+
+        Returns:
+            dict[str, Any]: Size, limits, counters and hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CatalogCache:
+    """Cache books and search results read through a SQLConnection.
+
+    Writes made through the connection are reported to the cache, which
+    patches the cached books and the cached catalog and drops the cached
+    search results, as a changed book can move in or out of any of them.
+
+    Every write also moves the cache to a new generation. A read stores
+    what it fetched only if no write came in since it started, so a page
+    read before a write cannot be cached after the write dropped it.
+    """
+
+    CATALOG_KEY = "catalog"
+
+    def __init__(
+        self,
+        connection: Any,
+        max_books: int = 10_000,
+        max_searches: int = 256,
+        ttl: Optional[float] = 300,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize class.
+
+        Args:
+            connection (Any): SQLConnection to read through.
+            max_books (int, optional): Books kept. Defaults to 10_000.
+            max_searches (int, optional): Pages of search results kept.
+                Defaults to 256.
+            ttl (Optional[float], optional): Seconds an entry is valid, which
+                bounds how stale writes by other processes can get. Defaults
+                to 300.
+            clock (Callable[[], float], optional): Current time in seconds.
+                Defaults to time.monotonic.
+        """
+        self.connection = connection
+        self.books = LRUCache(max_books, ttl, clock)
+        self.searches = LRUCache(max_searches, ttl, clock)
+        # The whole catalog is a single entry, with its own expiry
+        self.catalog = LRUCache(1, ttl, clock)
+        self.generation = 0
+        self._lock = threading.Lock()
+        connection.add_listener(self.on_change)
+
+    def close(self) -> None:
+        """Stop listening to the connection."""
+        self.connection.remove_listener(self.on_change)
+
+    def _put(self, cache: LRUCache, key: Hashable, value: Any, generation: int) -> None:
+        """Store a value read from the database unless a write came in since.
+
+        Args:
+            cache (LRUCache): Cache to store in.
+            key (Hashable): Key of the entry.
+            value (Any): Value read.
+            generation (int): Generation when the read started.
+        """
+        with self._lock:
+            if generation == self.generation:
+                cache.put(key, value)
+
+    def get_book(self, unique_ISBN: int) -> Optional[type[Book]]:
+        """Fetch a book, from the cache if possible.
+
+        Args:
+            unique_ISBN (int): The unique ISBN of the book.
+
+        Returns:
+            Optional[type[Book]]: The book if it exists.
+        """
+        generation = self.generation
+        book = self.books.get(unique_ISBN, _MISSING)
+        if book is _MISSING:
+            book = self.connection.get_book(unique_ISBN)
+            if book is not None:
+                self._put(self.books, unique_ISBN, book, generation)
+        return book  # type: ignore
+
+    def load_books_from_database(self) -> list[type[Book]]:
+        """Fetch all books, from the cache if possible.
+
+        Returns:
+            list[type[Book]]: Books, in a list the caller may change.
+        """
+        generation = self.generation
+        books = self.catalog.get(self.CATALOG_KEY)
+        if books is None:
+            books = self.connection.load_books_from_database()
+            self._put(self.catalog, self.CATALOG_KEY, list(books), generation)
+        return list(books)
+
+    def fetch_page(
+        self,
+        strategy: SQLSearchStrategy,
+        query: str,
+        after: Optional[PageKey] = None,
+        limit: Optional[int] = None,
+    ) -> tuple[list[type[Book]], Optional[PageKey]]:
+        """Fetch one page of search results, from the cache if possible.
+
+        Args:
+            strategy (SQLSearchStrategy): Strategy running the search.
+            query (str): Query to find books.
+            after (Optional[PageKey], optional): Key returned with the previous
+                page. Defaults to None.
+            limit (Optional[int], optional): Page size. Defaults to the page
+                size of the strategy.
+
+        Returns:
+            tuple[list[type[Book]], Optional[PageKey]]: Books and the key of
+                the next page, None when there are no more results.
+        """
+        limit = limit or strategy.page_size
+        key = (
+            type(strategy).__name__,
+            getattr(strategy, "match", None),
+            query,
+            after,
+            limit,
+        )
+        generation = self.generation
+        page = self.searches.get(key)
+        if page is None:
+            page = strategy.fetch_page(query, after, limit)
+            self._put(self.searches, key, page, generation)
+        books, next_key = page
+        return list(books), next_key
+
+    def on_change(self, event: str, payload: Any) -> None:
+        """Update the cache after a write through the connection.
+
+        Args:
+            event (str): "book_added", "book_updated", "book_removed",
+                "books_inserted" or "reservation_ready", which is ignored.
+            payload (Any): The added or updated book, the ISBN of the removed
+                book or None for bulk inserts.
+        """
+        if event == "reservation_ready":
+            return  # Follows the "book_updated" of the same return
+
+        if event in ("book_added", "book_updated"):
+            self.apply_changes([payload], [])
+        elif event == "book_removed":
+            self.apply_changes([], [payload])
+        else:
+            with self._lock:
+                self.generation += 1
+                self.searches.clear()
+                self.books.clear()
+                self.catalog.clear()
+
+    def apply_changes(self, books: list[type[Book]], removed: list[int]) -> None:
+        """Update the cache after many writes at once.
+
+        Used for the changes pulled from the changelog. The cached catalog
+        is patched once for the whole batch instead of once per book.
+
+        Args:
+            books (list[type[Book]]): Added or updated books.
+            removed (list[int]): ISBNs of removed books.
+        """
+        with self._lock:
+            self.generation += 1
+            self.searches.clear()
+            for book in books:
+                self.books.put(book.unique_ISBN, book)
+            for unique_ISBN in removed:
+                self.books.pop(unique_ISBN)
+            catalog = self.catalog.pop(self.CATALOG_KEY)
+            if catalog is not None:
+                changed = {book.unique_ISBN for book in books}.union(removed)
+                kept = [book for book in catalog if book.unique_ISBN not in changed]
+                self.catalog.put(self.CATALOG_KEY, kept + list(books))
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Report the counters of each part of the cache.
+
+        Returns:
+            dict[str, dict[str, Any]]: Counters of the books, search and
+                catalog caches.
+        """
+        return {
+            "books": self.books.stats(),
+            "searches": self.searches.stats(),
+            "catalog": self.catalog.stats(),
+        }
+
+
+class CachedSearchStrategy(SearchStrategy):
+    """Run a database search strategy through the catalog cache."""
+
+    def __init__(self, strategy: SQLSearchStrategy, cache: CatalogCache) -> None:
+        """Initialize class.
+
+        Args:
+            strategy (SQLSearchStrategy): Strategy running the queries.
+            cache (CatalogCache): Cache of the pages.
+        """
+        self.strategy = strategy
+        self.cache = cache
+
+    def search(
+        self,
+        books: list[type[Book]],
+        query: str,
+    ) -> Generator[type[Book], None, None]:
+        """Search page by page, reusing cached pages.
+
+        Args:
+            books (list[type[Book]]): Ignored, the database is searched.
+            query (str): Query to find books.
+
+        Yields:
+            Generator[type[Book], None, None]: Found books.
+        """
+        after = None
+        while True:
+            page, after = self.cache.fetch_page(self.strategy, query, after)
+            yield from page
+            if after is None:
+                return
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,460 @@
+"""Compact columnar store for the in-memory catalog."""
+
+from array import array
+from typing import Any, Iterable, Iterator, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.entities.books import Book
+
+BookRow = tuple[int, str, str, Optional[int], Optional[bool], Optional[int]]
+
+# Stands for None in the integer columns
+NULL = -(2**63)
+
+
+class BookView:
+    """Read-only view of one book in a CompactCatalog.
+
+    Has the attributes of Book, read from the columns on access. Only the
+    catalog and the row number are stored, so a view costs a few dozen
+    bytes whatever the length of the title.
+    """
+
+    __slots__ = ("catalog", "row")
+
+    def __init__(self, catalog: "CompactCatalog", row: int) -> None:
+        """Initialize class.
+
+        Args:
+            catalog (CompactCatalog): Catalog holding the book.
+            row (int): Row of the book.
+        """
+        self.catalog = catalog
+        self.row = row
+
+    @property
+    def unique_ISBN(self) -> int:
+        """Unique id of the book.
+
+        Returns:
+            int: ISBN.
+        """
+        return int(self.catalog.isbns[self.row])
+
+    @property
+    def title(self) -> str:
+        """Title of the book, decoded from the title buffer.
+
+        Returns:
+            str: Title.
+        """
+        return self.catalog.title(self.row)
+
+    @property
+    def author(self) -> str:
+        """Author of the book.
+
+        Returns:
+            str: Interned author.
+        """
+        return self.catalog.authors[int(self.catalog.author_codes[self.row])]
+
+    @property
+    def release_year(self) -> Optional[int]:
+        """Release year of the book.
+
+        Returns:
+            Optional[int]: Year, None if unknown.
+        """
+        year = int(self.catalog.release_years[self.row])
+        return None if year == NULL else year
+
+    @property
+    def available(self) -> bool:
+        """Is the book on the shelf.
+
+        Returns:
+            bool: Availability.
+        """
+        return bool(self.catalog.available[self.row])
+
+    @property
+    def reserved_by(self) -> Optional[int]:
+        """User holding the book.
+
+        Returns:
+            Optional[int]: User id, None if nobody.
+        """
+        user_id = int(self.catalog.reserved_by[self.row])
+        return None if user_id == NULL else user_id
+
+    def is_available(self) -> bool:
+        """Is book available.
+
+        Returns:
+            bool: Is book available.
+        """
+        return self.available
+
+    def materialize(self) -> Book:
+        """Build a full Book with the values of the view.
+
+        Returns:
+            Book: Detached book.
+        """
+        book = Book(
+            self.title, self.author, self.release_year, self.unique_ISBN  # type: ignore
+        )
+        book.available = self.available  # type: ignore[assignment, unused-ignore]
+        book.reserved_by = self.reserved_by  # type: ignore[assignment, unused-ignore]
+        return book
+
+    def __repr__(self) -> str:
+        """Describe the view.
+
+        Returns:
+            str: Representation.
+        """
+        return f"BookView(unique_ISBN={self.unique_ISBN}, title={self.title!r})"
+
+
+class CompactCatalog:
+    """Catalog keeping books in columns instead of Book instances.
+
+    ISBNs, release years, availability and reservations are NumPy arrays,
+    titles are one UTF-8 buffer with offsets and authors are interned and
+    stored as codes. Books are handed out as BookView objects built on
+    access.
+
+    The columns are read-only. Books fetched with get are materialized so
+    loans and reservations can change them, and added, replaced and removed
+    books are kept in a small overlay on top of the columns.
+    """
+
+    def __init__(
+        self,
+        isbns: NDArray[np.int64],
+        titles: bytes,
+        title_offsets: NDArray[np.int64],
+        authors: list[str],
+        author_codes: NDArray[np.int32],
+        release_years: NDArray[np.int64],
+        available: NDArray[Any],
+        reserved_by: NDArray[np.int64],
+    ) -> None:
+        """Initialize class.
+
+        Use from_rows or from_books instead of passing the columns directly.
+
+        Args:
+            isbns (NDArray[np.int64]): ISBN of each row.
+            titles (bytes): UTF-8 titles, one after another.
+            title_offsets (NDArray[np.int64]): Start of each title in the
+                buffer, followed by the end of the last one.
+            authors (list[str]): Distinct authors.
+            author_codes (NDArray[np.int32]): Position of each row's author.
+            release_years (NDArray[np.int64]): Release year of each row, NULL
+                when unknown.
+            available (NDArray[Any]): Availability of each row, as booleans.
+            reserved_by (NDArray[np.int64]): Reserving user of each row, NULL
+                when nobody.
+        """
+        self.isbns = isbns
+        self.titles = titles
+        self.title_offsets = title_offsets
+        self.authors = authors
+        self.author_codes = author_codes
+        self.release_years = release_years
+        self.available = available
+        self.reserved_by = reserved_by
+
+        self._sorted_rows = np.argsort(isbns, kind="stable")
+        self._sorted_isbns = isbns[self._sorted_rows]
+        self._deleted = np.zeros(len(isbns), dtype=bool)
+        self._deleted_count = 0
+        # Rows materialized or replaced, and books not in the columns
+        self._overrides: dict[int, Any] = {}
+        self._extra: dict[int, Any] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[BookRow]) -> "CompactCatalog":
+        """Build a catalog from plain rows, without creating Book objects.
+
+        Args:
+            rows (Iterable[BookRow]): ISBN, title, author, release year,
+                availability and reserving user of each book.
+
+        Returns:
+            CompactCatalog: Catalog of the rows.
+        """
+        isbns = array("q")
+        titles = bytearray()
+        title_offsets = array("q", [0])
+        author_codes = array("i")
+        codes: dict[str, int] = {}
+        release_years = array("q")
+        available = array("b")
+        reserved_by = array("q")
+
+        for isbn, title, author, year, is_available, user_id in rows:
+            isbns.append(isbn)
+            titles += (title or "").encode()
+            title_offsets.append(len(titles))
+            author_codes.append(codes.setdefault(author or "", len(codes)))
+            release_years.append(NULL if year is None else year)
+            available.append(is_available is not False)
+            reserved_by.append(NULL if user_id is None else user_id)
+
+        return cls(
+            np.frombuffer(isbns, dtype=np.int64),
+            bytes(titles),
+            np.frombuffer(title_offsets, dtype=np.int64),
+            list(codes),
+            np.frombuffer(author_codes, dtype=np.int32),
+            np.frombuffer(release_years, dtype=np.int64),
+            np.frombuffer(available, dtype=np.int8).astype(bool),
+            np.frombuffer(reserved_by, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_books(cls, books: Iterable[Any]) -> "CompactCatalog":
+        """Build a catalog from Book objects.
+
+        Args:
+            books (Iterable[Any]): Books.
+
+        Returns:
+            CompactCatalog: Catalog of the books.
+        """
+        return cls.from_rows(
+            (
+                book.unique_ISBN,
+                book.title,
+                book.author,
+                book.release_year,
+                book.available,
+                book.reserved_by,
+            )
+            for book in books
+        )
+
+    def title(self, row: int) -> str:
+        """Decode the title of a row.
+
+        Args:
+            row (int): Row of the book.
+
+        Returns:
+            str: Title.
+        """
+        start, end = self.title_offsets[row], self.title_offsets[row + 1]
+        return self.titles[start:end].decode()
+
+    def texts(self, attribute: str, rows: NDArray[Any]) -> list[str]:
+        """Read the titles or authors of rows without building views.
+
+        Args:
+            attribute (str): "title" or "author".
+            rows (NDArray[Any]): Rows to read.
+
+        Raises:
+            ValueError: Unknown attribute.
+
+        Returns:
+            list[str]: Text of each row.
+        """
+        if attribute == "author":
+            authors = self.authors
+            return [authors[code] for code in self.author_codes[rows].tolist()]
+        if attribute != "title":
+            raise ValueError(f"Unknown text attribute: {attribute}")
+        starts = self.title_offsets[rows].tolist()
+        ends = self.title_offsets[rows + 1].tolist()
+        titles = self.titles
+        return [titles[start:end].decode() for start, end in zip(starts, ends)]
+
+    def column_row(self, unique_ISBN: int) -> Optional[int]:
+        """Find the row of an ISBN in the columns, even if it was removed.
+
+        Args:
+            unique_ISBN (int): ISBN to look up.
+
+        Returns:
+            Optional[int]: Row, None if the ISBN is not in the columns.
+        """
+        position = int(np.searchsorted(self._sorted_isbns, unique_ISBN))
+        if position == len(self._sorted_isbns):
+            return None
+        if self._sorted_isbns[position] != unique_ISBN:
+            return None
+        return int(self._sorted_rows[position])
+
+    def row_of(self, unique_ISBN: int) -> Optional[int]:
+        """Find the row of an ISBN in the columns.
+
+        Args:
+            unique_ISBN (int): ISBN to look up.
+
+        Returns:
+            Optional[int]: Row, None if the ISBN is not in the columns or
+                was removed.
+        """
+        row = self.column_row(unique_ISBN)
+        if row is None or self._deleted[row]:
+            return None
+        return row
+
+    def book(self, row: int) -> Any:
+        """Hand out the book of a row.
+
+        Args:
+            row (int): Row of the book.
+
+        Returns:
+            Any: The materialized or replaced book, else a view.
+        """
+        book = self._overrides.get(row)
+        return book if book is not None else BookView(self, row)
+
+    def rows_of(self, isbns: NDArray[Any]) -> NDArray[Any]:
+        """Find the rows of many ISBNs at once.
+
+        Args:
+            isbns (NDArray[Any]): ISBNs to look up.
+
+        Returns:
+            NDArray[Any]: Row of each ISBN in the columns, -1 where it is
+                missing or was removed.
+        """
+        isbns = np.asarray(isbns, dtype=np.int64)
+        if not len(self._sorted_isbns):
+            return np.full(len(isbns), -1, dtype=np.int64)
+
+        positions = np.searchsorted(self._sorted_isbns, isbns)
+        positions = np.minimum(positions, len(self._sorted_isbns) - 1)
+        found = self._sorted_isbns[positions] == isbns
+        rows = np.where(found, self._sorted_rows[positions], -1)
+        rows[found & self._deleted[rows]] = -1
+        return rows
+
+    def column_rows(self) -> NDArray[Any]:
+        """Mark the rows whose book is still described by the columns.
+
+        Returns:
+            NDArray[Any]: False for removed rows and rows in the overlay.
+        """
+        mask = ~self._deleted
+        if self._overrides:
+            mask[np.fromiter(self._overrides, dtype=np.int64)] = False
+        return mask
+
+    def overlay(self) -> Iterator[Any]:
+        """Iterate over the books kept outside the columns.
+
+        Yields:
+            Iterator[Any]: Materialized, replaced and added books.
+        """
+        yield from self._overrides.values()
+        yield from self._extra.values()
+
+    def get(self, unique_ISBN: int) -> Optional[Any]:
+        """Fetch a book as a full Book that can be changed.
+
+        Args:
+            unique_ISBN (int): ISBN of the book.
+
+        Returns:
+            Optional[Any]: The book if present.
+        """
+        book = self._extra.get(unique_ISBN)
+        if book is not None:
+            return book
+
+        row = self.row_of(unique_ISBN)
+        if row is None:
+            return None
+        book = self._overrides.get(row)
+        if book is None:
+            book = BookView(self, row).materialize()
+            self._overrides[row] = book
+        return book
+
+    def add(self, book: Any) -> None:
+        """Add a book, replacing any book with the same ISBN.
+
+        Args:
+            book (Any): Book to add.
+        """
+        row = self.row_of(book.unique_ISBN)
+        if row is not None:
+            self._overrides[row] = book
+        else:
+            self._extra[book.unique_ISBN] = book
+
+    def remove(self, unique_ISBN: int) -> Optional[Any]:
+        """Remove a book.
+
+        Args:
+            unique_ISBN (int): ISBN of the book.
+
+        Returns:
+            Optional[Any]: The removed book if it was present.
+        """
+        book = self._extra.pop(unique_ISBN, None)
+        if book is not None:
+            return book
+
+        row = self.row_of(unique_ISBN)
+        if row is None:
+            return None
+        self._deleted[row] = True
+        self._deleted_count += 1
+        return self._overrides.pop(row, None) or BookView(self, row)
+
+    def __len__(self) -> int:
+        """Count the books.
+
+        Returns:
+            int: Number of books.
+        """
+        return len(self.isbns) - self._deleted_count + len(self._extra)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the books, as views unless materialized.
+
+        Yields:
+            Iterator[Any]: Books.
+        """
+        rows: Iterable[int] = range(len(self.isbns))
+        if self._deleted_count:
+            rows = np.flatnonzero(~self._deleted).tolist()
+        for row in rows:
+            yield self.book(row)
+        yield from self._extra.values()
+
+    def nbytes(self) -> int:
+        """Size of the columns, not counting the overlay.
+
+        Returns:
+            int: Bytes used by the columns.
+        """
+        arrays: list[NDArray[Any]] = [
+            self.isbns,
+            self.title_offsets,
+            self.author_codes,
+            self.release_years,
+            self.available,
+            self.reserved_by,
+            self._sorted_rows,
+            self._sorted_isbns,
+            self._deleted,
+        ]
+        authors = sum(len(author) for author in self.authors)
+        columns: int = sum(column.nbytes for column in arrays)
+        return columns + len(self.titles) + authors
+
+
+if __name__ == "__main__":
+    pass
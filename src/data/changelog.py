@@ -0,0 +1,160 @@
+"""Reading autoincrement logs without missing rows that commit late."""
+
+import json
+import time
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import ColumnElement, or_
+
+# First id, last id and expiry time of a range of ids not seen yet
+Gap = tuple[int, int, float]
+
+
+class ChangeCursor:
+    """Position in a log table whose rows are numbered by autoincrement.
+
+    Databases such as MySQL hand out autoincrement ids when a row is
+    inserted, not when it is committed. A transaction holding a lower id can
+    therefore commit after one holding a higher id, and a reader that only
+    remembers the highest id it has seen would skip the late row for good.
+
+    The cursor keeps the highest id seen and the ranges of lower ids it has
+    not seen yet. Those gaps are read again on every call until their rows
+    show up, or until gap_timeout seconds pass, after which the ids are
+    taken to belong to rolled back transactions or pruned rows. Keep the
+    timeout above the longest write transaction, e.g. a large bulk insert.
+    """
+
+    __slots__ = ("position", "gaps")
+
+    def __init__(self, position: int = 0, gaps: Iterable[Gap] = ()) -> None:
+        """Initialize class.
+
+        Args:
+            position (int, optional): Highest id seen. Defaults to 0.
+            gaps (Iterable[Gap], optional): Ranges of lower ids not seen
+                yet, with the time they expire at. Defaults to ().
+        """
+        self.position = position
+        self.gaps = tuple(gaps)
+
+    @property
+    def floor(self) -> int:
+        """Id up to which every row has been seen or given up on.
+
+        Returns:
+            int: Highest id below all gaps.
+        """
+        return min([first - 1 for first, _, _ in self.gaps] + [self.position])
+
+    def condition(self, column: Any) -> ColumnElement[bool]:
+        """Select the ids after the position or in a gap.
+
+        Args:
+            column (Any): Id column of the log.
+
+        Returns:
+            ColumnElement[bool]: WHERE clause.
+        """
+        return or_(
+            column > self.position,
+            *(column.between(first, last) for first, last, _ in self.gaps),
+        )
+
+    def advance(
+        self,
+        ids: Iterable[int],
+        gap_timeout: float = 3600.0,
+        max_gaps: int = 1000,
+        now: Optional[float] = None,
+    ) -> "ChangeCursor":
+        """Move past ids read with condition.
+
+        Args:
+            ids (Iterable[int]): Ids read. When the read was limited, they
+                must be the lowest matching ids.
+            gap_timeout (float, optional): Seconds a new gap is read again.
+                Defaults to 3600.0.
+            max_gaps (int, optional): Gaps kept, the oldest are given up
+                first. Defaults to 1000.
+            now (Optional[float], optional): Current time. Defaults to
+                time.time().
+
+        Returns:
+            ChangeCursor: Cursor after the ids.
+        """
+        now = time.time() if now is None else now
+        seen = sorted(set(ids))
+        position = max(seen[-1] if seen else 0, self.position)
+        ranges = [gap for gap in self.gaps if gap[2] > now]
+        ranges.append((self.position + 1, position, now + gap_timeout))
+
+        gaps: list[Gap] = []
+        index = 0
+        for first, last, expires in sorted(ranges):
+            # Split the range around the ids seen in it
+            while index < len(seen) and seen[index] < first:
+                index += 1
+            start = first
+            while index < len(seen) and seen[index] <= last:
+                if seen[index] > start:
+                    gaps.append((start, seen[index] - 1, expires))
+                start = seen[index] + 1
+                index += 1
+            if start <= last:
+                gaps.append((start, last, expires))
+        if len(gaps) > max_gaps:
+            gaps = sorted(gaps, key=lambda gap: gap[2])[-max_gaps:]
+        return ChangeCursor(position, sorted(gaps))
+
+    def dumps(self) -> str:
+        """Write the gaps as JSON, to be stored next to the position.
+
+        Returns:
+            str: JSON list of gaps.
+        """
+        return json.dumps([list(gap) for gap in self.gaps])
+
+    @classmethod
+    def loads(cls, position: int, gaps: Optional[str]) -> "ChangeCursor":
+        """Read a cursor stored with dumps.
+
+        Args:
+            position (int): Highest id seen.
+            gaps (Optional[str]): JSON written by dumps, None for no gaps.
+
+        Returns:
+            ChangeCursor: Cursor.
+        """
+        return cls(
+            position,
+            (
+                (first, last, expires)
+                for first, last, expires in json.loads(gaps or "[]")
+            ),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare cursors.
+
+        Args:
+            other (object): Other cursor.
+
+        Returns:
+            bool: Same position and gaps.
+        """
+        if not isinstance(other, ChangeCursor):
+            return NotImplemented
+        return (self.position, self.gaps) == (other.position, other.gaps)
+
+    def __repr__(self) -> str:
+        """Describe the cursor.
+
+        Returns:
+            str: Position and gaps.
+        """
+        return f"ChangeCursor({self.position}, {list(self.gaps)})"
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,277 @@
+"""Streaming export of the library tables to CSV and Parquet files."""
+
+import argparse
+import csv
+import os
+import time
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Sequence
+
+from sqlalchemy import select
+
+from src.data.database import SQLConnection
+from src.entities.books import Book
+from src.entities.loan_events import LoanEvent
+from src.entities.users import BorrowedBooks, User
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+# Columns of each exported table, in the order they are written
+EXPORTS: dict[str, tuple[Any, ...]] = {
+    "books": (
+        Book.unique_ISBN,
+        Book.title,
+        Book.author,
+        Book.release_year,
+        Book.available,
+        Book.reserved_by,
+    ),
+    "users": (User.user_id, User.name, User.address),
+    "loans": (BorrowedBooks.user_id, BorrowedBooks.book_id),
+    "loan_history": (
+        LoanEvent.event_id,
+        LoanEvent.book_id,
+        LoanEvent.user_id,
+        LoanEvent.action,
+        LoanEvent.created_at,
+    ),
+}
+FORMATS = ("csv", "parquet")
+
+
+class ExportStats:
+    """Size and duration of one export."""
+
+    __slots__ = ("table", "path", "rows", "chunks", "bytes", "seconds")
+
+    def __init__(self, table: str, path: str) -> None:
+        """Initialize class.
+
+        Args:
+            table (str): Exported table.
+            path (str): Written file.
+        """
+        self.table = table
+        self.path = path
+        self.rows = 0
+        self.chunks = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput of the export.
+
+        Returns:
+            float: Rows written per second.
+        """
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        """Describe the export.
+
+        Returns:
+            str: Rows, size, time and throughput.
+        """
+        return (
+            f"{self.table}: {self.rows:,} rows, {self.bytes / 1e6:.1f} MB"
+            f" in {self.seconds:.1f} s ({self.rows_per_second:,.0f} rows/s)"
+        )
+
+
+def _arrow_schema(columns: Sequence[Any]) -> Any:
+    """Build the Parquet schema of exported columns.
+
+    The types come from the columns rather than from the rows, so every
+    chunk gets the same schema even when a column is empty in some chunks.
+
+    Args:
+        columns (Sequence[Any]): Exported columns.
+
+    Returns:
+        Any: pyarrow schema.
+    """
+    types = {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        str: pa.string(),
+        datetime: pa.timestamp("us"),
+        date: pa.date32(),
+    }
+    return pa.schema(
+        [(column.key, types[column.type.python_type]) for column in columns]
+    )
+
+
+def _write_csv(
+    path: str, columns: Sequence[Any], chunks: Iterable[Sequence[Any]]
+) -> int:
+    """Write chunks of rows to a CSV file with a header line.
+
+    Args:
+        path (str): File to write.
+        columns (Sequence[Any]): Exported columns.
+        chunks (Iterable[Sequence[Any]]): Chunks of rows.
+
+    Returns:
+        int: Number of chunks written.
+    """
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow([column.key for column in columns])
+        for chunk in chunks:
+            writer.writerows(chunk)
+            written += 1
+    return written
+
+
+def _write_parquet(
+    path: str, columns: Sequence[Any], chunks: Iterable[Sequence[Any]]
+) -> int:
+    """Write chunks of rows to a Parquet file, one row group per chunk.
+
+    Args:
+        path (str): File to write.
+        columns (Sequence[Any]): Exported columns.
+        chunks (Iterable[Sequence[Any]]): Chunks of rows.
+
+    Raises:
+        ImportError: pyarrow is not installed.
+
+    Returns:
+        int: Number of chunks written.
+    """
+    if pa is None:
+        raise ImportError(
+            "Parquet export needs pyarrow, installed with pip install .[parquet]"
+        )
+    schema = _arrow_schema(columns)
+    written = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            arrays = [
+                pa.array(values, type=field.type)
+                for values, field in zip(zip(*chunk), schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            written += 1
+    return written
+
+
+def export_table(
+    connection: SQLConnection,
+    table: str,
+    path: str,
+    file_format: Optional[str] = None,
+    batch_size: int = 50_000,
+) -> ExportStats:
+    """Stream one table to a file.
+
+    Rows are read batch_size at a time in primary key order, each batch by a
+    query of its own, and written before the next is read, so the memory
+    used does not grow with the size of the table.
+
+    Args:
+        connection (SQLConnection): Connection to the library database.
+        table (str): "books", "users", "loans" for the current loans, or
+            "loan_history".
+        path (str): File to write.
+        file_format (Optional[str], optional): "csv" or "parquet", None to
+            take it from the file extension. Defaults to None.
+        batch_size (int, optional): Rows per chunk. Defaults to 50_000.
+
+    Raises:
+        ValueError: Unknown table or format.
+
+    Returns:
+        ExportStats: Rows, size and duration of the export.
+    """
+    if table not in EXPORTS:
+        raise ValueError(f"Unknown table: {table}")
+    file_format = file_format or os.path.splitext(path)[1].lstrip(".").lower()
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown export format: {file_format}")
+
+    columns = EXPORTS[table]
+    keys = list(columns[0].table.primary_key.columns)
+    stats = ExportStats(table, path)
+
+    def counted() -> Iterable[Sequence[Any]]:
+        for chunk in connection.stream_rows(select(*columns), keys, batch_size):
+            stats.rows += len(chunk)
+            yield chunk
+
+    write = _write_parquet if file_format == "parquet" else _write_csv
+    start = time.perf_counter()
+    stats.chunks = write(path, columns, counted())
+    stats.seconds = time.perf_counter() - start
+    stats.bytes = os.path.getsize(path)
+    return stats
+
+
+def export_all(
+    connection: SQLConnection,
+    directory: str,
+    file_format: str = "csv",
+    tables: Optional[Iterable[str]] = None,
+    batch_size: int = 50_000,
+) -> list[ExportStats]:
+    """Stream tables to one file each, named after the table.
+
+    Args:
+        connection (SQLConnection): Connection to the library database.
+        directory (str): Directory of the files, created if missing.
+        file_format (str, optional): "csv" or "parquet". Defaults to "csv".
+        tables (Optional[Iterable[str]], optional): Tables to export, None
+            for all of them. Defaults to None.
+        batch_size (int, optional): Rows per chunk. Defaults to 50_000.
+
+    Returns:
+        list[ExportStats]: Statistics of each export.
+    """
+    os.makedirs(directory, exist_ok=True)
+    return [
+        export_table(
+            connection,
+            table,
+            os.path.join(directory, f"{table}.{file_format}"),
+            file_format,
+            batch_size,
+        )
+        for table in tables or EXPORTS
+    ]
+
+
+def main() -> None:
+    """Export the library tables and print the throughput."""
+    from src.utils import ConfigManager, set_worker_id
+
+    parser = argparse.ArgumentParser(description="Export the library tables.")
+    parser.add_argument("directory", help="Directory of the exported files.")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--tables", nargs="+", choices=list(EXPORTS))
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--config", default="config.json", help="Config file.")
+    parser.add_argument("--url", help="Database URL instead of the config.")
+    args = parser.parse_args()
+
+    config = ConfigManager(args.config)
+    set_worker_id(config.worker_id())
+    connection = SQLConnection(
+        config.username(),
+        config.password(),
+        url=args.url or config.get("database_url"),
+    )
+    for stats in export_all(
+        connection, args.directory, args.format, args.tables, args.batch_size
+    ):
+        print(stats)
+
+
+if __name__ == "__main__":
+    main()
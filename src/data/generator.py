@@ -1,47 +1,233 @@
 """Data generation script."""
 
+import argparse
+import random
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
-from typing import Any, Generator
+from typing import Any, Generator, Iterable, Iterator, Optional, Sequence
+
+from faker import Faker
 
 from src.constants import fake
-from src.utils import generate_id
+from src.utils import generate_ids, iter_ids
 
 
-def generate_fake_data_user(num_users: int) -> Generator[dict[str, Any], None, None]:
+def generate_fake_data_user(
+    num_users: int,
+    faker: Faker = fake,
+    first_id: Optional[int] = None,
+    ids: Optional[Iterable[int]] = None,
+) -> Generator[dict[str, Any], None, None]:
     """Generate fake data.
 
     Args:
-        Num_users (int): Number of fake users.
+        num_users (int): Number of fake users.
+        faker (Faker, optional): Faker to draw from. Defaults to the shared one.
+        first_id (Optional[int], optional): Number the users from this id
+            instead of generating ids. Defaults to None.
+        ids (Optional[Iterable[int]], optional): Ids of the users, instead
+            of numbering or generating them. Defaults to None.
 
     Returns:
         Generator[dict[str, Any], None, None]: Fake users.
     """
-    for _ in range(num_users):
+    if ids is None:
+        ids = (
+            iter_ids(num_users)
+            if first_id is None
+            else range(first_id, first_id + num_users)
+        )
+    for user_id in ids:
         yield {
-            "user_id": generate_id,
-            "name": fake.name(),
-            "address": fake.address(),
+            "user_id": user_id,
+            "name": faker.name(),
+            "address": faker.address(),
         }
 
 
-def generate_fake_data_book(num_records: int) -> Generator[dict[str, Any], None, None]:
+def generate_fake_data_book(
+    num_records: int,
+    faker: Faker = fake,
+    first_id: Optional[int] = None,
+    current_year: Optional[int] = None,
+    ids: Optional[Iterable[int]] = None,
+) -> Generator[dict[str, Any], None, None]:
     """Generate fake books.
 
     Args:
         num_records (int): Number of fake books.
+        faker (Faker, optional): Faker to draw from. Defaults to the shared one.
+        first_id (Optional[int], optional): Number the books from this id
+            instead of generating ids. Defaults to None.
+        current_year (Optional[int], optional): Latest release year.
+            Defaults to this year.
+        ids (Optional[Iterable[int]], optional): ISBNs of the books, instead
+            of numbering or generating them. Defaults to None.
 
     Yields:
         Generator[dict[str, Any], None, None]: Fake books.
     """
-    current_year = datetime.now().year
-    for _ in range(num_records):
+    current_year = current_year or datetime.now().year
+    if ids is None:
+        ids = (
+            iter_ids(num_records)
+            if first_id is None
+            else range(first_id, first_id + num_records)
+        )
+    for unique_ISBN in ids:
         yield {
-            "title": fake.text(max_nb_chars=50),
-            "author": fake.name(),
-            "release_year": fake.random_int(min=1950, max=current_year),
-            "unique_ISBN": generate_id(),
+            "title": faker.text(max_nb_chars=50),
+            "author": faker.name(),
+            "release_year": faker.random_int(min=1950, max=current_year),
+            "unique_ISBN": unique_ISBN,
         }
 
 
+GENERATORS = {
+    "book": generate_fake_data_book,
+    "user": generate_fake_data_user,
+}
+
+
+def shard_seed(seed: int, kind: str, shard: int) -> int:
+    """Derive the seed of one shard.
+
+    Args:
+        seed (int): Seed of the whole dataset.
+        kind (str): "book" or "user".
+        shard (int): Number of the shard.
+
+    Returns:
+        int: Seed of the shard.
+    """
+    return random.Random(f"{seed}-{kind}-{shard}").getrandbits(64)
+
+
+def generate_shard(
+    kind: str,
+    shard: int,
+    ids: Sequence[int],
+    seed: Optional[int],
+    current_year: int,
+) -> list[dict[str, Any]]:
+    """Generate one shard of fake records, in a worker process.
+
+    Args:
+        kind (str): "book" or "user".
+        shard (int): Number of the shard.
+        ids (Sequence[int]): Ids of the records in the shard.
+        seed (Optional[int]): Seed of the whole dataset, None for random data.
+        current_year (int): Latest release year.
+
+    Returns:
+        list[dict[str, Any]]: Fake records.
+    """
+    faker = Faker()
+    if seed is not None:
+        faker.seed_instance(shard_seed(seed, kind, shard))
+
+    if kind == "book":
+        return list(generate_fake_data_book(len(ids), faker, None, current_year, ids))
+    return list(generate_fake_data_user(len(ids), faker, None, ids))
+
+
+def generate_fake_data_parallel(
+    kind: str,
+    count: int,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    shard_size: int = 10_000,
+    first_id: Optional[int] = None,
+) -> Generator[list[dict[str, Any]], None, None]:
+    """Generate fake records on a process pool, one shard at a time.
+
+    The records are split into shards of a fixed size, each with its own
+    Faker seeded from the dataset seed and the shard number. The output for
+    a seed is therefore the same whatever the number of workers. Shards are
+    yielded in order, with at most two per worker in flight, so memory does
+    not grow with count.
+
+    Args:
+        kind (str): "book" or "user".
+        count (int): Number of records.
+        workers (int, optional): Worker processes, 1 to generate in this
+            process. Defaults to 1.
+        seed (Optional[int], optional): Seed for reproducible data.
+            Defaults to None.
+        shard_size (int, optional): Records per shard. Defaults to 10_000.
+        first_id (Optional[int], optional): Number the records from this id.
+            Defaults to 1 when seeded, otherwise ids are generated.
+
+    Raises:
+        ValueError: Unknown kind of record.
+
+    Yields:
+        Generator[list[dict[str, Any]], None, None]: Shards of fake records.
+    """
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown kind of record: {kind}")
+    if first_id is None and seed is not None:
+        first_id = 1
+
+    current_year = datetime.now().year
+
+    def shards() -> Iterator[tuple[Any, ...]]:
+        for shard, start in enumerate(range(0, count, shard_size)):
+            size = min(shard_size, count - start)
+            # Generated here, as worker processes have no worker id of their own
+            if first_id is None:
+                ids: Sequence[int] = generate_ids(size)
+            else:
+                ids = range(first_id + start, first_id + start + size)
+            yield kind, shard, ids, seed, current_year
+
+    if workers <= 1:
+        for arguments in shards():
+            yield generate_shard(*arguments)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque[Future[list[dict[str, Any]]]] = deque()
+        for arguments in shards():
+            pending.append(executor.submit(generate_shard, *arguments))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main() -> None:
+    """Generate a fake dataset and upload it to the database."""
+    from src.data.database import SQLConnection
+    from src.utils import ConfigManager, set_worker_id
+
+    parser = argparse.ArgumentParser(description="Fill the library with fake data.")
+    parser.add_argument("--books", type=int, default=1000, help="Number of books.")
+    parser.add_argument("--users", type=int, default=200, help="Number of users.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes.")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible data.")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--config", default="config.json", help="Config file.")
+    parser.add_argument("--url", help="Database URL instead of the config.")
+    args = parser.parse_args()
+
+    config = ConfigManager(args.config)
+    set_worker_id(config.worker_id())
+    connection = SQLConnection(
+        config.username(),
+        config.password(),
+        url=args.url or config.get("database_url"),
+        echo=False,
+    )
+    connection.create_fake_dataset(
+        num_books=args.books,
+        num_users=args.users,
+        workers=args.workers,
+        seed=args.seed,
+        chunk_size=args.chunk_size,
+    )
+
+
 if __name__ == "__main__":
-    pass
+    main()
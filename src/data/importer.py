@@ -0,0 +1,488 @@
+"""Bulk import of book catalogs from CSV and JSON files."""
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Iterable, Iterator, Optional
+
+from src.data.database import SQLConnection
+from src.entities.books import Book
+from src.utils import chunked
+
+# Column names accepted for each book field, compared in lower case
+FIELDS = {
+    "unique_ISBN": ("isbn", "isbn13", "isbn_13", "isbn10", "isbn_10", "unique_isbn"),
+    "title": ("title",),
+    "author": ("author", "creator", "main_author"),
+    "release_year": ("release_year", "year", "publication_year", "date"),
+}
+MAX_TEXT = 255  # Length of the title and author columns
+YEAR = re.compile(r"\d{4}")
+Chunk = tuple[int, list[dict[str, Any]], int, int]
+
+
+class ImportStats:
+    """Rows read, inserted, skipped and refused by one run of an import."""
+
+    __slots__ = ("path", "read", "inserted", "rejected", "seconds")
+
+    def __init__(self, path: str) -> None:
+        """Initialize class.
+
+        Args:
+            path (str): Imported file.
+        """
+        self.path = path
+        self.read = 0
+        self.inserted = 0
+        self.rejected = 0
+        self.seconds = 0.0
+
+    @property
+    def duplicates(self) -> int:
+        """Valid rows whose ISBN was already imported or in the library.
+
+        Returns:
+            int: Rows skipped as duplicates.
+        """
+        return self.read - self.rejected - self.inserted
+
+    @property
+    def rows_per_second(self) -> float:
+        """Throughput of the import.
+
+        Returns:
+            float: Rows read per second.
+        """
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        """Describe the import.
+
+        Returns:
+            str: Counts, time and throughput.
+        """
+        return (
+            f"{self.path}: {self.read:,} rows, {self.inserted:,} inserted,"
+            f" {self.duplicates:,} duplicates, {self.rejected:,} rejected"
+            f" in {self.seconds:.1f} s ({self.rows_per_second:,.0f} rows/s)"
+        )
+
+
+def isbn13_check_digit(digits: str) -> int:
+    """Compute the check digit of an ISBN-13.
+
+    Args:
+        digits (str): First 12 digits.
+
+    Returns:
+        int: Thirteenth digit.
+    """
+    total = sum(map(int, digits[0::2])) + 3 * sum(map(int, digits[1::2]))
+    return -total % 10
+
+
+def parse_isbn(value: Any) -> Optional[int]:
+    """Validate an ISBN-10 or ISBN-13 and convert it to an ISBN-13 number.
+
+    Hyphens and spaces are ignored, so "0-306-40615-2" and "9780306406157"
+    give the same book.
+
+    Args:
+        value (Any): ISBN as written in the catalog.
+
+    Returns:
+        Optional[int]: ISBN-13, None when the ISBN is not valid.
+    """
+    text = str(value).replace("-", "").replace(" ", "").upper()
+    if len(text) == 10 and text[:9].isdigit() and text.isascii():
+        check = 10 if text[9] == "X" else int(text[9]) if text[9].isdigit() else -1
+        total = sum((10 - i) * int(digit) for i, digit in enumerate(text[:9]))
+        if check < 0 or (total + check) % 11:
+            return None
+        text = "978" + text[:9]
+        return int(text + str(isbn13_check_digit(text)))
+    if (
+        len(text) == 13
+        and text.isdigit()
+        and text.isascii()
+        and text[:3] in ("978", "979")
+        and isbn13_check_digit(text[:12]) == int(text[12])
+    ):
+        return int(text)
+    return None
+
+
+def to_book(
+    record: dict[str, Any], fields: dict[str, tuple[str, ...]] = FIELDS
+) -> Optional[dict[str, Any]]:
+    """Convert a catalog record to a book record.
+
+    Args:
+        record (dict[str, Any]): Record with lower case field names.
+        fields (dict[str, tuple[str, ...]], optional): Names to look up for
+            each book field. Defaults to FIELDS.
+
+    Returns:
+        Optional[dict[str, Any]]: Book for bulk_insert, None when the record
+            has no valid ISBN or no title.
+    """
+    values = {
+        field: next(
+            (record[name] for name in names if record.get(name) not in (None, "")),
+            None,
+        )
+        for field, names in fields.items()
+    }
+    unique_ISBN = parse_isbn(values["unique_ISBN"] or "")
+    title = str(values["title"] or "").strip()
+    if unique_ISBN is None or not title:
+        return None
+    # MARC dates look like "c1999." or "[1987?]"
+    year = YEAR.search(str(values["release_year"] or ""))
+    return {
+        "unique_ISBN": unique_ISBN,
+        "title": title[:MAX_TEXT],
+        "author": str(values["author"] or "").strip()[:MAX_TEXT] or None,
+        "release_year": int(year.group()) if year else None,
+    }
+
+
+def file_kind(path: str) -> str:
+    """Tell the format of a catalog file.
+
+    Args:
+        path (str): Catalog file.
+
+    Returns:
+        str: "csv", "jsonl" for one JSON object per line, or "json" for a
+            JSON array.
+    """
+    if path.lower().endswith(".csv"):
+        return "csv"
+    with open(path, "rb") as file:
+        start = file.read(64).lstrip(b"\xef\xbb\xbf \t\r\n")
+    return "json" if start.startswith(b"[") else "jsonl"
+
+
+def parse_records(
+    records: Iterable[Any], position: int, header: Optional[list[str]] = None
+) -> Chunk:
+    """Validate catalog records and keep the first book of each ISBN.
+
+    Args:
+        records (Iterable[Any]): Records, as dicts or JSON text.
+        position (int): Position in the file after the records.
+        header (Optional[list[str]], optional): Lower case field names
+            shared by all records, as in a CSV file. None to look the
+            fields up in each record. Defaults to None.
+
+    Returns:
+        Chunk: Position, valid books with one per ISBN, number of records
+            read and number of records rejected.
+    """
+    fields = FIELDS
+    if header is not None:
+        fields = {
+            field: tuple(name for name in names if name in header)
+            for field, names in FIELDS.items()
+        }
+    books: dict[int, dict[str, Any]] = {}
+    read = rejected = 0
+    for record in records:
+        read += 1
+        try:
+            if isinstance(record, str):
+                record = json.loads(record)
+            if header is None:
+                record = {key.lower(): value for key, value in record.items()}
+            book = to_book(record, fields)
+        except (ValueError, AttributeError):
+            book = None
+        if book is None:
+            rejected += 1
+        else:
+            books.setdefault(book["unique_ISBN"], book)
+    return position, list(books.values()), read, rejected
+
+
+def parse_range(
+    path: str, kind: str, start: int, stop: int, header: list[str]
+) -> Chunk:
+    """Parse the lines between two byte offsets, in a worker process.
+
+    Args:
+        path (str): Catalog file.
+        kind (str): "csv" or "jsonl".
+        start (int): Offset of the first line.
+        stop (int): Offset after the last line.
+        header (list[str]): CSV field names, unused for JSON.
+
+    Returns:
+        Chunk: Offset after the chunk, its valid books with one per ISBN,
+            number of lines read and number of lines rejected.
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(stop - start)
+    # Lines end at b"\n" only, as str.splitlines would also break titles
+    # holding characters such as U+2028 LINE SEPARATOR.
+    if kind == "csv":
+        text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", newline="")
+        records = csv.DictReader(text, fieldnames=header)
+        return parse_records(records, stop, header)
+    lines = (line.decode("utf-8") for line in data.split(b"\n"))
+    return parse_records((line for line in lines if line.strip()), stop)
+
+
+def split_file(path: str, start: int, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Split a file into byte ranges of whole lines.
+
+    Args:
+        path (str): File to split.
+        start (int): Offset of the first line.
+        chunk_bytes (int): Approximate bytes per range.
+
+    Returns:
+        list[tuple[int, int]]: Start and stop offsets of each range.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as file:
+        while start < size:
+            file.seek(min(start + chunk_bytes, size))
+            file.readline()
+            stop = min(file.tell(), size)
+            ranges.append((start, stop))
+            start = stop
+    return ranges
+
+
+class CatalogImporter:
+    """Import books from a catalog file into a SQLConnection.
+
+    The file is split into chunks of whole lines, which worker processes
+    parse and validate while the previous chunks are inserted. Rows without
+    a valid ISBN-10 or ISBN-13, or without a title, are rejected. Each ISBN
+    is inserted once: the first row of an ISBN wins, and books already in
+    the library are kept as they are.
+
+    After each chunk is committed, the position reached is written to a
+    checkpoint file next to the catalog. An import that stopped halfway
+    continues from there when run again, and the checkpoint is removed once
+    the whole file is in. Chunks are inserted skipping existing ISBNs, so a
+    chunk committed just before a crash is not inserted twice.
+
+    CSV files need a header line and no line breaks inside values. JSON
+    files hold one object per line, or a single array of objects, which is
+    read whole and parsed in this process.
+    """
+
+    def __init__(
+        self,
+        connection: SQLConnection,
+        workers: int = 1,
+        chunk_bytes: int = 4_000_000,
+        batch_size: int = 10_000,
+    ) -> None:
+        """Initialize class.
+
+        Args:
+            connection (SQLConnection): Connection to the library database.
+            workers (int, optional): Processes parsing the file, 1 to parse
+                in this process. Defaults to 1.
+            chunk_bytes (int, optional): Bytes of the file parsed and
+                committed at a time. Defaults to 4_000_000.
+            batch_size (int, optional): Books per insert statement.
+                Defaults to 10_000.
+        """
+        self.connection = connection
+        self.workers = workers
+        self.chunk_bytes = chunk_bytes
+        self.batch_size = batch_size
+
+    @staticmethod
+    def checkpoint_path(path: str) -> str:
+        """Name the checkpoint file of a catalog.
+
+        Args:
+            path (str): Catalog file.
+
+        Returns:
+            str: Checkpoint file.
+        """
+        return path + ".checkpoint"
+
+    def _load_checkpoint(self, path: str) -> int:
+        """Read where a previous import of the same file stopped.
+
+        Args:
+            path (str): Catalog file.
+
+        Returns:
+            int: Position to continue from, 0 to start over.
+        """
+        try:
+            with open(self.checkpoint_path(path), encoding="utf-8") as file:
+                checkpoint = json.load(file)
+        except (OSError, ValueError):
+            return 0
+        status = os.stat(path)
+        if (checkpoint.get("size"), checkpoint.get("mtime")) != (
+            status.st_size,
+            status.st_mtime,
+        ):
+            # The file changed since, its positions no longer apply
+            return 0
+        return int(checkpoint["position"])
+
+    def _save_checkpoint(self, path: str, position: int) -> None:
+        """Record the position up to which the file is committed.
+
+        The file is replaced in one step, so a crash leaves the old or the
+        new checkpoint.
+
+        Args:
+            path (str): Catalog file.
+            position (int): Byte offset, or record number of a JSON array.
+        """
+        status = os.stat(path)
+        checkpoint = {
+            "size": status.st_size,
+            "mtime": status.st_mtime,
+            "position": position,
+        }
+        temporary = self.checkpoint_path(path) + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(checkpoint, file)
+        os.replace(temporary, self.checkpoint_path(path))
+
+    def _lines(self, path: str, kind: str, position: int) -> Iterator[Chunk]:
+        """Parse a CSV or JSON lines file a chunk at a time.
+
+        Args:
+            path (str): Catalog file.
+            kind (str): "csv" or "jsonl".
+            position (int): Offset to start from, 0 for the beginning.
+
+        Yields:
+            Iterator[Chunk]: Parsed chunks, in file order.
+        """
+        header: list[str] = []
+        if kind == "csv":
+            with open(path, "rb") as file:
+                first = file.readline()
+            header = [
+                name.strip().lower()
+                for name in next(csv.reader([first.decode("utf-8-sig")]))
+            ]
+            position = max(position, len(first))
+        ranges = [
+            (path, kind, start, stop, header)
+            for start, stop in split_file(path, position, self.chunk_bytes)
+        ]
+
+        if self.workers <= 1:
+            for arguments in ranges:
+                yield parse_range(*arguments)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending: deque[Future[Chunk]] = deque()
+            for arguments in ranges:
+                pending.append(executor.submit(parse_range, *arguments))
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _array(self, path: str, position: int) -> Iterator[Chunk]:
+        """Parse a JSON array file a chunk of records at a time.
+
+        Args:
+            path (str): Catalog file.
+            position (int): Records already imported.
+
+        Yields:
+            Iterator[Chunk]: Parsed chunks, positioned by record number.
+        """
+        with open(path, encoding="utf-8-sig") as file:
+            records = json.load(file)
+        for chunk in chunked(records[position:], self.batch_size):
+            position += len(chunk)
+            yield parse_records(chunk, position)
+
+    def run(self, path: str, restart: bool = False) -> ImportStats:
+        """Import a catalog file.
+
+        Args:
+            path (str): CSV, JSON lines or JSON array file.
+            restart (bool, optional): Ignore the checkpoint of an earlier
+                import and start from the beginning. Defaults to False.
+
+        Returns:
+            ImportStats: Counts of this run, which leaves out the part of the
+                file imported before the checkpoint.
+        """
+        stats = ImportStats(path)
+        position = 0 if restart else self._load_checkpoint(path)
+        kind = file_kind(path)
+        chunks = (
+            self._array(path, position)
+            if kind == "json"
+            else self._lines(path, kind, position)
+        )
+
+        start = time.perf_counter()
+        for position, books, read, rejected in chunks:
+            if books:
+                stats.inserted += self.connection.bulk_insert(
+                    books, Book, batch_size=self.batch_size, skip_existing=True
+                )
+            stats.read += read
+            stats.rejected += rejected
+            self._save_checkpoint(path, position)
+        stats.seconds = time.perf_counter() - start
+        if os.path.exists(self.checkpoint_path(path)):
+            os.remove(self.checkpoint_path(path))
+        return stats
+
+
+def main() -> None:
+    """Import a catalog file and print the counts."""
+    from src.utils import ConfigManager, set_worker_id
+
+    parser = argparse.ArgumentParser(description="Import books from a catalog file.")
+    parser.add_argument("path", help="CSV, JSON lines or JSON array file.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-mb", type=float, default=4, help="MB per chunk.")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoint.")
+    parser.add_argument("--config", default="config.json", help="Config file.")
+    parser.add_argument("--url", help="Database URL instead of the config.")
+    args = parser.parse_args()
+
+    config = ConfigManager(args.config)
+    set_worker_id(config.worker_id())
+    connection = SQLConnection(
+        config.username(),
+        config.password(),
+        url=args.url or config.get("database_url"),
+    )
+    importer = CatalogImporter(
+        connection,
+        workers=args.workers,
+        chunk_bytes=int(args.chunk_mb * 1_000_000),
+        batch_size=args.batch_size,
+    )
+    print(importer.run(args.path, restart=args.restart))
+
+
+if __name__ == "__main__":
+    main()
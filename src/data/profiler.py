@@ -0,0 +1,297 @@
+"""Profiling of the SQL statements sent through an engine."""
+
+import argparse
+import bisect
+import json
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("library.sql")
+
+# Upper bounds in milliseconds of the latency histogram buckets
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class StatementStats:
+    """Counters of one SQL statement."""
+
+    __slots__ = ("count", "total_ms", "max_ms", "rows", "histogram", "n_plus_one")
+
+    def __init__(self) -> None:
+        """Initialize class."""
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        # One bucket per bound and one for slower statements
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.n_plus_one = 0
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a latency percentile from the histogram.
+
+        Args:
+            fraction (float): Percentile as a fraction, e.g. 0.95.
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile in
+                milliseconds, the slowest time for the last bucket.
+        """
+        wanted = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.histogram):
+            seen += count
+            if count and seen >= wanted:
+                return float(bound)
+        return self.max_ms
+
+    def report(self) -> dict[str, Any]:
+        """Summarize the counters.
+
+        Returns:
+            dict[str, Any]: Counters, mean and percentiles.
+        """
+        labels = [f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms,
+            "rows": self.rows,
+            "n_plus_one": self.n_plus_one,
+            "histogram": {
+                label: count for label, count in zip(labels, self.histogram) if count
+            },
+        }
+
+
+class QueryProfiler:
+    """Time every statement an engine sends to the database.
+
+    Statements are grouped by their SQL text, which holds placeholders
+    instead of values, so a query run for many ids counts as one statement.
+    For each statement it keeps a latency histogram and the rows changed by
+    INSERT, UPDATE and DELETE statements. Only the public arguments of the
+    engine events are used, so rows fetched by SELECT statements, which are
+    read after the statement has run, are not counted. Statements slower
+    than slow_threshold are logged to the library.sql logger. A SELECT
+    repeated n_plus_one times in one transaction is counted and logged as a
+    likely N+1 pattern, e.g. a lazy relationship loaded once per row. The
+    counters are shared by the pooled connections and updated under a lock.
+    """
+
+    def __init__(
+        self, slow_threshold: Optional[float] = 0.1, n_plus_one: int = 10
+    ) -> None:
+        """Initialize class.
+
+        Args:
+            slow_threshold (Optional[float], optional): Seconds above which a
+                statement is logged as slow, None to log none.
+                Defaults to 0.1.
+            n_plus_one (int, optional): Runs of one SELECT in a transaction
+                counted as an N+1 pattern. Defaults to 10.
+        """
+        self.slow_threshold = slow_threshold
+        self.n_plus_one = n_plus_one
+        self.slow_queries = 0
+        self._statements: dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+        self._engines: list[Engine] = []
+
+    def attach(self, engine: Engine) -> None:
+        """Start profiling the statements of an engine.
+
+        Args:
+            engine (Engine): Engine to profile.
+        """
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        event.listen(engine, "commit", self._end_transaction)
+        event.listen(engine, "rollback", self._end_transaction)
+        self._engines.append(engine)
+
+    def detach(self) -> None:
+        """Stop profiling all engines."""
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._before)
+            event.remove(engine, "after_cursor_execute", self._after)
+            event.remove(engine, "commit", self._end_transaction)
+            event.remove(engine, "rollback", self._end_transaction)
+        self._engines.clear()
+
+    def _before(
+        self,
+        connection: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        """Note when a statement starts.
+
+        Args:
+            connection (Any): Connection running the statement.
+            cursor (Any): DBAPI cursor.
+            statement (str): SQL text.
+            parameters (Any): Parameters.
+            context (Any): Execution context.
+            executemany (bool): Is it run for many parameter sets.
+        """
+        # A connection runs one statement at a time
+        connection.info["profiler_start"] = time.perf_counter()
+
+    def _after(
+        self,
+        connection: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        """Record the time and changed rows of a statement.
+
+        Args:
+            connection (Any): Connection running the statement.
+            cursor (Any): DBAPI cursor.
+            statement (str): SQL text.
+            parameters (Any): Parameters.
+            context (Any): Execution context.
+            executemany (bool): Is it run for many parameter sets.
+        """
+        started = connection.info.pop("profiler_start")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        repeated = False
+        if cursor.description is not None:
+            runs = connection.info.setdefault("profiler_runs", {})
+            runs[statement] = runs.get(statement, 0) + 1
+            repeated = runs[statement] == self.n_plus_one
+        slow = self.slow_threshold is not None and (
+            elapsed_ms > self.slow_threshold * 1000
+        )
+
+        with self._lock:
+            stats = self._statements.get(statement)
+            if stats is None:
+                stats = self._statements[statement] = StatementStats()
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.histogram[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+            if cursor.description is None and cursor.rowcount > 0:
+                stats.rows += cursor.rowcount
+            if repeated:
+                stats.n_plus_one += 1
+            if slow:
+                self.slow_queries += 1
+
+        if repeated:
+            logger.warning(
+                "Statement run %d times in one transaction",
+                self.n_plus_one,
+                extra={"statement": statement},
+            )
+        if slow:
+            logger.warning(
+                "Slow statement took %.1f ms",
+                elapsed_ms,
+                extra={"statement": statement, "elapsed_ms": elapsed_ms},
+            )
+
+    def _end_transaction(self, connection: Any) -> None:
+        """Forget the statements run in the finished transaction.
+
+        Args:
+            connection (Any): Connection ending its transaction.
+        """
+        connection.info.pop("profiler_runs", None)
+
+    def stats(self) -> dict[str, Any]:
+        """Report the counters, the most time consuming statements first.
+
+        Returns:
+            dict[str, Any]: Totals, and counters per statement.
+        """
+        with self._lock:
+            statements = {
+                statement: stats.report()
+                for statement, stats in self._statements.items()
+            }
+            slow_queries = self.slow_queries
+        ordered = dict(
+            sorted(statements.items(), key=lambda item: -item[1]["total_ms"])
+        )
+        return {
+            "statements": len(ordered),
+            "executions": sum(report["count"] for report in ordered.values()),
+            "total_ms": sum(report["total_ms"] for report in ordered.values()),
+            "slow_queries": slow_queries,
+            "n_plus_one": sum(report["n_plus_one"] for report in ordered.values()),
+            "by_statement": ordered,
+        }
+
+    def reset(self) -> None:
+        """Clear the counters."""
+        with self._lock:
+            self._statements.clear()
+            self.slow_queries = 0
+
+    def dump(self, path: str) -> None:
+        """Write the counters to a JSON file, to be read by format_report.
+
+        Args:
+            path (str): File to write.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.stats(), file, indent=2)
+
+
+def format_report(stats: dict[str, Any], top: int = 20) -> str:
+    """Format profiler counters as a table.
+
+    Args:
+        stats (dict[str, Any]): Counters from QueryProfiler.stats.
+        top (int, optional): Statements listed. Defaults to 20.
+
+    Returns:
+        str: Report.
+    """
+    lines = [
+        f"{stats['executions']} executions of {stats['statements']} statements"
+        f" in {stats['total_ms']:.1f} ms, {stats['slow_queries']} slow,"
+        f" {stats['n_plus_one']} N+1 patterns",
+        f"{'count':>8} {'total ms':>10} {'mean ms':>8} {'p95 ms':>8}"
+        f" {'rows':>9} {'N+1':>4}  statement",
+    ]
+    for statement, report in list(stats["by_statement"].items())[:top]:
+        text = " ".join(statement.split())
+        lines.append(
+            f"{report['count']:>8} {report['total_ms']:>10.1f}"
+            f" {report['mean_ms']:>8.2f} {report['p95_ms']:>8.2f}"
+            f" {report['rows']:>9} {report['n_plus_one']:>4}  {text[:100]}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Print a report of counters dumped by QueryProfiler.dump."""
+    parser = argparse.ArgumentParser(description="Report profiled SQL statements.")
+    parser.add_argument("path", help="JSON file written by QueryProfiler.dump.")
+    parser.add_argument("--top", type=int, default=20, help="Statements listed.")
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as file:
+        print(format_report(json.load(file), args.top))
+
+
+if __name__ == "__main__":
+    main()
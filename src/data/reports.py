@@ -0,0 +1,568 @@
+"""Loan reports read from pre-aggregated rollups of the loan history."""
+
+import argparse
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import (
+    ColumnElement,
+    String,
+    bindparam,
+    cast,
+    func,
+    insert,
+    literal,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+
+from src.data.changelog import ChangeCursor
+from src.data.database import SQLConnection
+from src.entities.books import Book
+from src.entities.loan_events import LOAN, LoanEvent
+from src.entities.loan_rollups import LoanRollup, RollupWatermark
+from src.utils import chunked
+
+# Start of the single period of the "all" rollups
+ALL_TIME = date(1970, 1, 1)
+# Author of loan events whose book has been removed
+UNKNOWN_AUTHOR = "Unknown"
+WATERMARK = "loan_rollups"
+
+RollupKey = tuple[str, str, date, str]
+DayRange = tuple[date, date]
+ROLLUP_COLUMNS = ("dimension", "period", "start", "item")
+
+
+def utc_today() -> date:
+    """Current day in UTC, the timezone the loan events are stored in.
+
+    Returns:
+        date: Today in UTC.
+    """
+    return datetime.now(timezone.utc).date()
+
+
+def utc_day(moment: datetime) -> date:
+    """Day of a loan event in UTC.
+
+    Args:
+        moment (datetime): Creation time, naive in UTC or timezone-aware.
+
+    Returns:
+        date: UTC day.
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return moment.date()
+
+
+def next_month(day: date) -> date:
+    """Find the first day of the following month.
+
+    Args:
+        day (date): Any day.
+
+    Returns:
+        date: First day of the next month.
+    """
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def split_range(start: date, end: date) -> dict[str, list[DayRange]]:
+    """Split the days from start to end into whole years, months and days.
+
+    Args:
+        start (date): First day, included.
+        end (date): Last day, included.
+
+    Returns:
+        dict[str, list[DayRange]]: Ranges by period, "year", "month" and
+            "day", each as first day and the day after the last.
+    """
+    after = end + timedelta(days=1)
+    first_month = start if start.day == 1 else next_month(start)
+    last_month = after.replace(day=1)
+    if first_month >= last_month:
+        return {"year": [], "month": [], "day": [(start, after)]}
+
+    first_year = date(first_month.year + (first_month.month > 1), 1, 1)
+    last_year = last_month.replace(month=1)
+    if first_year >= last_year:
+        first_year = last_year = last_month
+    ranges = {
+        "year": [(first_year, last_year)],
+        "month": [(first_month, first_year), (last_year, last_month)],
+        "day": [(start, first_month), (last_month, after)],
+    }
+    return {
+        period: [(begin, stop) for begin, stop in days if begin < stop]
+        for period, days in ranges.items()
+    }
+
+
+class LoanReports:
+    """Reports on the loan history of a SQLConnection.
+
+    refresh counts the loan events added since its last call into rollups
+    per month, per year and for all time of each book, each author and all
+    loans together, and per day of all loans. Reports read these rollups,
+    and the events of at most two partial months at the ends of a range, so
+    they take the same time however long the history is. Refreshing reads
+    only the new events, and can run from any number of desks: the first to
+    claim a batch of events counts it. Events that commit after one with a
+    higher id are counted by a later refresh, see ChangeCursor. Days are
+    UTC days, as the events are stored in UTC, so a range ending today ends
+    on the current day in UTC.
+    """
+
+    def __init__(self, connection: SQLConnection, batch_size: int = 10_000) -> None:
+        """Initialize class.
+
+        Args:
+            connection (SQLConnection): Connection to the library database.
+            batch_size (int, optional): Events counted per transaction.
+                Defaults to 10_000.
+        """
+        self.connection = connection
+        self.batch_size = batch_size
+        try:
+            with connection.session_scope() as session:
+                if session.get(RollupWatermark, WATERMARK) is None:
+                    session.add(RollupWatermark(name=WATERMARK, event_id=0))
+        except IntegrityError:
+            # Created by another desk in the meantime
+            pass
+
+    def refresh(self) -> int:
+        """Count the loan events added since the last refresh.
+
+        Returns:
+            int: Number of loans counted.
+        """
+        counted = 0
+        while True:
+            read, loans = self._refresh_batch()
+            counted += loans
+            if read < self.batch_size:
+                return counted
+
+    @staticmethod
+    def _watermark(session: Any) -> tuple[ChangeCursor, str]:
+        """Read the position of the rollups in the loan history.
+
+        Args:
+            session (Any): Open session.
+
+        Returns:
+            tuple[ChangeCursor, str]: Events counted, and the gaps as stored.
+        """
+        watermarks = RollupWatermark.__table__.c
+        position, gaps = session.execute(
+            select(watermarks.event_id, watermarks.gaps).where(
+                watermarks.name == WATERMARK
+            )
+        ).one()
+        return ChangeCursor.loads(position, gaps), gaps
+
+    def _refresh_batch(self) -> tuple[int, int]:
+        """Count the next batch of loan events in one transaction.
+
+        Returns are read along with loans, so that their ids are not taken
+        for gaps left by transactions that have not committed yet.
+
+        Returns:
+            tuple[int, int]: Number of events read and of loans counted,
+                both 0 when there were none or another desk claimed them.
+        """
+        events = LoanEvent.__table__.c
+        books = Book.__table__
+        watermarks = RollupWatermark.__table__
+        with self.connection.session_scope() as session:
+            watermark, gaps = self._watermark(session)
+            rows = session.execute(
+                select(
+                    events.event_id,
+                    events.action,
+                    events.book_id,
+                    events.created_at,
+                    books.c.author,
+                )
+                .outerjoin(books, books.c.unique_ISBN == events.book_id)
+                .where(watermark.condition(events.event_id))
+                .order_by(events.event_id)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                return 0, 0
+
+            # Moving the watermark locks it, so each batch is counted once
+            after = watermark.advance(
+                (row.event_id for row in rows), self.connection.gap_timeout
+            )
+            claimed = session.execute(
+                update(watermarks)
+                .where(
+                    watermarks.c.name == WATERMARK,
+                    watermarks.c.event_id == watermark.position,
+                    watermarks.c.gaps == gaps,
+                )
+                .values(event_id=after.position, gaps=after.dumps())
+            ).rowcount  # type: ignore[attr-defined, unused-ignore]
+            if not claimed:
+                return 0, 0
+
+            loans = [row for row in rows if row.action == LOAN]
+            counts: Counter[RollupKey] = Counter()
+            for row in loans:
+                day = utc_day(row.created_at)
+                month = day.replace(day=1)
+                year = month.replace(month=1)
+                for dimension, item in (
+                    ("book", str(row.book_id)),
+                    ("author", row.author or UNKNOWN_AUTHOR),
+                    ("total", ""),
+                ):
+                    counts[(dimension, "month", month, item)] += 1
+                    counts[(dimension, "year", year, item)] += 1
+                    counts[(dimension, "all", ALL_TIME, item)] += 1
+                counts[("total", "day", day, "")] += 1
+            self._add(session, counts)
+        return len(rows), len(loans)
+
+    @staticmethod
+    def _add(session: Any, counts: Counter[RollupKey]) -> None:
+        """Add loans to the rollups, creating missing rows.
+
+        Args:
+            session (Any): Session of the refresh transaction.
+            counts (Counter[RollupKey]): Loans to add by rollup.
+        """
+        table = LoanRollup.__table__
+        # Looked up per dimension and period, over the days of the batch
+        groups: dict[tuple[str, str], dict[str, None]] = {}
+        starts: dict[tuple[str, str], list[date]] = {}
+        for dimension, period, start, item in counts:
+            groups.setdefault((dimension, period), {})[item] = None
+            starts.setdefault((dimension, period), []).append(start)
+        existing: dict[RollupKey, int] = {}
+        for (dimension, period), items in groups.items():
+            for chunk in chunked(items, 500):
+                rows = session.execute(
+                    select(table.c.start, table.c.item, table.c.loans).where(
+                        table.c.dimension == dimension,
+                        table.c.period == period,
+                        table.c.start.between(
+                            min(starts[(dimension, period)]),
+                            max(starts[(dimension, period)]),
+                        ),
+                        table.c.item.in_(chunk),
+                    )
+                )
+                for start, item, loans in rows:
+                    existing[(dimension, period, start, item)] = loans
+
+        updates = []
+        inserts = []
+        for key, loans in counts.items():
+            if key in existing:
+                updates.append((*key, existing[key] + loans))
+            else:
+                inserts.append(dict(zip(ROLLUP_COLUMNS, key), loans=loans))
+        if updates:
+            session.execute(
+                update(table)
+                .where(
+                    *(
+                        getattr(table.c, name) == bindparam(f"key_{name}")
+                        for name in ROLLUP_COLUMNS
+                    )
+                )
+                .values(loans=bindparam("new_loans")),
+                [
+                    dict(
+                        zip([f"key_{name}" for name in ROLLUP_COLUMNS], key),
+                        new_loans=loans,
+                    )
+                    for *key, loans in updates
+                ],
+            )
+        if inserts:
+            session.execute(insert(table), inserts)
+
+    def _top(
+        self,
+        dimension: str,
+        limit: int,
+        start: Optional[date],
+        end: Optional[date],
+    ) -> list[tuple[str, int]]:
+        """Find the items with the most loans.
+
+        Args:
+            dimension (str): "book", "author" or "total".
+            limit (int): Items returned.
+            start (Optional[date]): First day, None for no limit.
+            end (Optional[date]): Last day, None for no limit.
+
+        Returns:
+            list[tuple[str, int]]: Items and their loans, most loans first.
+        """
+        rollups = LoanRollup.__table__.c
+        with self.connection.session_scope() as session:
+            if start is None and end is None:
+                statement = (
+                    select(rollups.item, rollups.loans)
+                    .where(
+                        rollups.dimension == dimension,
+                        rollups.period == "all",
+                        rollups.start == ALL_TIME,
+                    )
+                    .order_by(rollups.loans.desc(), rollups.item)
+                )
+            else:
+                watermark, _ = self._watermark(session)
+                ranges = split_range(start or ALL_TIME, end or utc_today())
+                parts = [
+                    self._counted_loans(dimension, begin, stop, watermark)
+                    for begin, stop in ranges["day"]
+                ]
+                for period in ("month", "year"):
+                    parts.extend(
+                        select(rollups.item, rollups.loans).where(
+                            rollups.dimension == dimension,
+                            rollups.period == period,
+                            rollups.start >= begin,
+                            rollups.start < stop,
+                        )
+                        for begin, stop in ranges[period]
+                    )
+                counted = union_all(*parts).subquery()
+                loans = func.sum(counted.c.loans)
+                statement = (
+                    select(counted.c.item, loans)
+                    .group_by(counted.c.item)
+                    .order_by(loans.desc(), counted.c.item)
+                )
+            return [
+                (row[0], int(row[1])) for row in session.execute(statement.limit(limit))
+            ]
+
+    @staticmethod
+    def _counted_loans(
+        dimension: str, start: date, stop: date, watermark: ChangeCursor
+    ) -> Any:
+        """Count loans of a few days straight from the loan history.
+
+        Only events already counted in the rollups are read, so the result
+        can be added to the month rollups.
+
+        Args:
+            dimension (str): "book", "author" or "total".
+            start (date): First day.
+            stop (date): Day after the last.
+            watermark (ChangeCursor): Events counted in the rollups.
+
+        Returns:
+            Any: SELECT of item and loans, like the rollups.
+        """
+        events = LoanEvent.__table__.c
+        books = Book.__table__
+        item: ColumnElement[Any]
+        if dimension == "book":
+            item = cast(events.book_id, String)
+        elif dimension == "author":
+            item = func.coalesce(books.c.author, UNKNOWN_AUTHOR)
+        else:
+            item = literal("")
+        # Added one at a time, mypy crashes on select() of both
+        statement = (
+            select(item.label("item"))
+            .add_columns(func.count().label("loans"))
+            .select_from(LoanEvent.__table__)
+            .where(
+                events.action == LOAN,
+                events.created_at >= datetime.combine(start, time.min),
+                events.created_at < datetime.combine(stop, time.min),
+                ~watermark.condition(events.event_id),
+            )
+        )
+        if dimension == "author":
+            statement = statement.outerjoin(
+                books, books.c.unique_ISBN == events.book_id
+            )
+        return statement.group_by(item)
+
+    def top_books(
+        self,
+        limit: int = 10,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> list[tuple[int, int]]:
+        """Find the most borrowed books.
+
+        Args:
+            limit (int, optional): Books returned. Defaults to 10.
+            start (Optional[date], optional): First day, None for no limit.
+                Defaults to None.
+            end (Optional[date], optional): Last day, None for no limit.
+                Defaults to None.
+
+        Returns:
+            list[tuple[int, int]]: ISBNs and their loans, most loans first.
+        """
+        return [
+            (int(item), loans) for item, loans in self._top("book", limit, start, end)
+        ]
+
+    def top_authors(
+        self,
+        limit: int = 10,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> list[tuple[str, int]]:
+        """Find the authors whose books are borrowed the most.
+
+        Args:
+            limit (int, optional): Authors returned. Defaults to 10.
+            start (Optional[date], optional): First day, None for no limit.
+                Defaults to None.
+            end (Optional[date], optional): Last day, None for no limit.
+                Defaults to None.
+
+        Returns:
+            list[tuple[str, int]]: Authors and their loans, most loans first.
+        """
+        return self._top("author", limit, start, end)
+
+    def total_loans(
+        self, start: Optional[date] = None, end: Optional[date] = None
+    ) -> int:
+        """Count all loans.
+
+        Args:
+            start (Optional[date], optional): First day, None for no limit.
+                Defaults to None.
+            end (Optional[date], optional): Last day, None for no limit.
+                Defaults to None.
+
+        Returns:
+            int: Number of loans.
+        """
+        top = self._top("total", 1, start, end)
+        return top[0][1] if top else 0
+
+    def loans_per_day(
+        self, start: date, end: date, unique_ISBN: Optional[int] = None
+    ) -> list[tuple[date, int]]:
+        """Count the loans of each day.
+
+        All loans are read from the day rollups. The loans of one book are
+        few, and are counted from its loan history on the (book_id,
+        created_at) index.
+
+        Args:
+            start (date): First day.
+            end (date): Last day.
+            unique_ISBN (Optional[int], optional): Only count loans of this
+                book. Defaults to None.
+
+        Returns:
+            list[tuple[date, int]]: Days with loans and their loans, oldest
+                first.
+        """
+        events = LoanEvent.__table__.c
+        if unique_ISBN is not None:
+            history = select(events.created_at).where(
+                events.book_id == unique_ISBN,
+                events.action == LOAN,
+                events.created_at >= datetime.combine(start, time.min),
+                events.created_at < datetime.combine(end, time.min) + timedelta(1),
+            )
+            with self.connection.session_scope() as session:
+                days = Counter(utc_day(row[0]) for row in session.execute(history))
+            return sorted(days.items())
+
+        rollups = LoanRollup.__table__.c
+        statement = (
+            select(rollups.start, rollups.loans)
+            .where(
+                rollups.dimension == "total",
+                rollups.period == "day",
+                rollups.item == "",
+                rollups.start.between(start, end),
+            )
+            .order_by(rollups.start)
+        )
+        with self.connection.session_scope() as session:
+            return [(row[0], int(row[1])) for row in session.execute(statement)]
+
+    def loan_history(
+        self,
+        unique_ISBN: Optional[int] = None,
+        user_id: Optional[int] = None,
+        limit: int = 100,
+    ) -> list[type[LoanEvent]]:
+        """Read the latest loans and returns of a book or a user.
+
+        Args:
+            unique_ISBN (Optional[int], optional): Only events of this book.
+                Defaults to None.
+            user_id (Optional[int], optional): Only events of this user.
+                Defaults to None.
+            limit (int, optional): Events returned. Defaults to 100.
+
+        Returns:
+            list[type[LoanEvent]]: Events, newest first.
+        """
+        events = LoanEvent.__table__.c
+        statement = select(LoanEvent)
+        if unique_ISBN is not None:
+            statement = statement.where(events.book_id == unique_ISBN)
+        if user_id is not None:
+            statement = statement.where(events.user_id == user_id)
+        statement = statement.order_by(
+            events.created_at.desc(), events.event_id.desc()
+        ).limit(limit)
+        with self.connection.session_scope() as session:
+            return list(session.scalars(statement))
+
+
+def main() -> None:
+    """Refresh the rollups and print the loan dashboard."""
+    from src.utils import ConfigManager, set_worker_id
+
+    parser = argparse.ArgumentParser(description="Print the loan reports.")
+    parser.add_argument("--days", type=int, default=30, help="Days reported.")
+    parser.add_argument("--top", type=int, default=10, help="Books and authors.")
+    parser.add_argument("--config", default="config.json", help="Config file.")
+    parser.add_argument("--url", help="Database URL instead of the config.")
+    args = parser.parse_args()
+
+    config = ConfigManager(args.config)
+    set_worker_id(config.worker_id())
+    connection = SQLConnection(
+        config.username(),
+        config.password(),
+        url=args.url or config.get("database_url"),
+    )
+    reports = LoanReports(connection)
+    print(f"Counted {reports.refresh()} new loans.")
+
+    end = utc_today()
+    start = end - timedelta(days=args.days - 1)
+    print(f"Loans from {start} to {end}: {reports.total_loans(start, end)}")
+    print(f"Loans in total: {reports.total_loans()}")
+    print("Most borrowed books:")
+    for unique_ISBN, loans in reports.top_books(args.top, start, end):
+        print(f"  {unique_ISBN}: {loans}")
+    print("Most borrowed authors:")
+    for author, loans in reports.top_authors(args.top, start, end):
+        print(f"  {author}: {loans}")
+
+
+if __name__ == "__main__":
+    main()
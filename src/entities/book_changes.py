@@ -0,0 +1,33 @@
+"""Book changelog logic."""
+
+from sqlalchemy import BIGINT, Column, Integer
+
+from src.constants import Base
+
+
+class BookChange(Base):  # type: ignore
+    """Row in the changelog of the books table.
+
+    A row is written in the same transaction as every change to a book, so
+    readers holding a watermark can fetch only the books changed since.
+    """
+
+    __tablename__ = "book_changes"
+
+    # BIGINT only autoincrements on SQLite as INTEGER
+    change_id = Column(
+        BIGINT().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    unique_ISBN = Column(BIGINT, nullable=False)
+
+    def __init__(self, unique_ISBN: int):
+        """Initialize class.
+
+        Args:
+            unique_ISBN (int): Unique id of the changed book.
+        """
+        self.unique_ISBN = unique_ISBN  # type: ignore[assignment, unused-ignore]
+
+
+if __name__ == "__main__":
+    pass
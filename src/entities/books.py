@@ -12,13 +12,16 @@ class Book(Base):  # type: ignore
     __tablename__ = "books"
 
     unique_ISBN = Column(BIGINT, primary_key=True, autoincrement=False)
-    title = Column(String(255))
-    author = Column(String(255))
-    release_year = Column(Integer)
+    title = Column(String(255), index=True)
+    author = Column(String(255), index=True)
+    release_year = Column(Integer, index=True)
     available = Column(Boolean, default=True)
     reserved_by = Column(BIGINT, ForeignKey("users.user_id"))
 
-    borrowers = relationship("User", back_populates="borrowed_books")
+    # Lazy by default, SQLConnection.books_with_borrowers loads them eagerly
+    borrowers = relationship(
+        "User", secondary="borrowed_books", back_populates="borrowed_books"
+    )
 
     def __init__(self, title: str, author: str, release_year: int, unique_ISBN: int):
         """Initialize class.
@@ -0,0 +1,50 @@
+"""Loan history logic."""
+
+from sqlalchemy import BIGINT, Column, DateTime, Index, Integer, String
+
+from src.constants import Base
+from src.entities.reservations import utc_now
+
+# Actions recorded in the loan history
+LOAN = "loan"
+RETURN = "return"
+
+
+class LoanEvent(Base):  # type: ignore
+    """Loan or return of a book, appended to the loan history.
+
+    A row is written in the same transaction as the loan or return. Rows are
+    never changed, and are kept when the book or the user is removed.
+    """
+
+    __tablename__ = "loan_events"
+    __table_args__ = (
+        Index("ix_loan_events_book_created", "book_id", "created_at"),
+        Index("ix_loan_events_user_created", "user_id", "created_at"),
+        Index("ix_loan_events_created", "created_at"),
+    )
+
+    # BIGINT only autoincrements on SQLite as INTEGER
+    event_id = Column(
+        BIGINT().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    book_id = Column(BIGINT, nullable=False)
+    user_id = Column(BIGINT, nullable=False)
+    action = Column(String(16), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=utc_now)
+
+    def __init__(self, book_id: int, user_id: int, action: str):
+        """Initialize class.
+
+        Args:
+            book_id (int): Unique ISBN of the book.
+            user_id (int): Id of the user.
+            action (str): LOAN or RETURN.
+        """
+        self.book_id = book_id  # type: ignore[assignment, unused-ignore]
+        self.user_id = user_id  # type: ignore[assignment, unused-ignore]
+        self.action = action  # type: ignore[assignment, unused-ignore]
+
+
+if __name__ == "__main__":
+    pass
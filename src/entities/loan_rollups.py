@@ -0,0 +1,44 @@
+"""Pre-aggregated loan counts logic."""
+
+from sqlalchemy import BIGINT, Column, Date, Index, String, Text
+
+from src.constants import Base
+
+
+class LoanRollup(Base):  # type: ignore
+    """Number of loans of one item in one period.
+
+    The dimension says what the item is, a book ISBN, an author or "" for
+    all loans. The period is "day", "month", "year" or "all", and start is the
+    first day of the period, 1970-01-01 for "all".
+    """
+
+    __tablename__ = "loan_rollups"
+    __table_args__ = (
+        Index("ix_loan_rollups_item", "dimension", "period", "item", "start"),
+        Index("ix_loan_rollups_top", "dimension", "period", "start", "loans"),
+    )
+
+    dimension = Column(String(16), primary_key=True)
+    period = Column(String(8), primary_key=True)
+    start = Column(Date, primary_key=True)
+    item = Column(String(255), primary_key=True)
+    loans = Column(BIGINT, nullable=False, default=0)
+
+
+class RollupWatermark(Base):  # type: ignore
+    """Latest loan event counted in the rollups.
+
+    gaps holds the lower events not counted yet, as written by
+    ChangeCursor.dumps, because events can commit out of id order.
+    """
+
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(32), primary_key=True)
+    event_id = Column(BIGINT, nullable=False, default=0)
+    gaps = Column(Text, nullable=False, default="[]")
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,49 @@
+"""Reservation queue logic."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import BIGINT, Column, DateTime, ForeignKey, Index, Integer
+
+from src.constants import Base
+
+
+def utc_now() -> datetime:
+    """Current time, used to order the queue.
+
+    Returns:
+        datetime: Timezone-aware UTC time.
+    """
+    return datetime.now(timezone.utc)
+
+
+class Reservation(Base):  # type: ignore
+    """Place of a user in the queue of a book that is not available.
+
+    The queue of a book is its reservations ordered by creation, with the id
+    breaking ties between reservations created at the same instant.
+    """
+
+    __tablename__ = "reservations"
+    __table_args__ = (Index("ix_reservations_book_created", "book_id", "created_at"),)
+
+    # BIGINT only autoincrements on SQLite as INTEGER
+    reservation_id = Column(
+        BIGINT().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    book_id = Column(BIGINT, ForeignKey("books.unique_ISBN"), nullable=False)
+    user_id = Column(BIGINT, ForeignKey("users.user_id"), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=utc_now)
+
+    def __init__(self, book_id: int, user_id: int):
+        """Initialize class.
+
+        Args:
+            book_id (int): Unique ISBN of the reserved book.
+            user_id (int): Id of the waiting user.
+        """
+        self.book_id = book_id  # type: ignore[assignment, unused-ignore]
+        self.user_id = user_id  # type: ignore[assignment, unused-ignore]
+
+
+if __name__ == "__main__":
+    pass
@@ -16,11 +16,9 @@ class User(Base):  # type: ignore
     name = Column(String(255))
     address = Column(String(255))
 
+    # Lazy by default, SQLConnection.users_with_loans loads them eagerly
     borrowed_books = relationship(
-        "Book",
-        secondary="borrowed_books",
-        back_populates="borrowers",
-        overlaps="borrowed_books",
+        "Book", secondary="borrowed_books", back_populates="borrowers"
     )
 
     def __init__(self, name: str, user_id: int, address: str):
@@ -1,10 +1,21 @@
 """Functionality related to library system logic."""
 
+import logging
+import threading
 from functools import wraps
-from typing import Any, Callable, Generator, Optional
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional, Union
 
+from src.data.catalog import CompactCatalog
+from src.data.changelog import ChangeCursor
+from src.data.database import DONE, QUEUED
 from src.entities.books import Book
 from src.entities.users import User
+from src.loggers import Transcript
+
+Watermark = Union[int, ChangeCursor]
+Changes = tuple[list[type[Book]], list[int], Watermark]
+
+logger = logging.getLogger("library.activity")
 
 
 class SearchStrategy:
@@ -29,6 +40,24 @@ class SearchStrategy:
         """
         raise NotImplementedError()
 
+    def book_added(self, book: type[Book]) -> None:
+        """Get notified that a book was added to the library.
+
+        Strategies keeping an index over the books override this.
+
+        Args:
+            book (type[Book]): Added book.
+        """
+
+    def book_removed(self, book: type[Book]) -> None:
+        """Get notified that a book was removed from the library.
+
+        Strategies keeping an index over the books override this.
+
+        Args:
+            book (type[Book]): Removed book.
+        """
+
 
 class TitleSearchStrategy(SearchStrategy):
     """Search by title."""
@@ -48,7 +77,7 @@ class TitleSearchStrategy(SearchStrategy):
             Generator[type[Book], None, None]: Found books.
         """
         for book in books:
-            if query.lower() in book.title.lower():
+            if query.lower() in str(book.title).lower():
                 yield book
 
 
@@ -70,7 +99,7 @@ class AuthorSearchStrategy(SearchStrategy):
             Generator[type[Book], None, None]: Found books.
         """
         for book in books:
-            if query.lower() in book.author.lower():
+            if query.lower() in str(book.author).lower():
                 yield book
 
 
@@ -121,17 +150,299 @@ class yearSearchStrategy(SearchStrategy):
 
 
 class LibrarySystem:
-    """System to handle books and users."""
+    """System to handle books and users.
+
+    The books, the search indexes and the ISBN index are guarded by one
+    lock, so transactions and refreshes may run on other threads than the
+    searches. Search results are read under the lock one book at a time and
+    end early once the books change, as the indexes behind them have moved.
+    """
 
-    def __init__(self, books: Optional[list[type[Book]]] = None) -> None:
+    def __init__(
+        self,
+        books: Optional[list[type[Book]]] = None,
+        book_loader: Optional[Callable[[int], Optional[type[Book]]]] = None,
+        change_loader: Optional[Callable[[Watermark], Changes]] = None,
+        watermark: Watermark = 0,
+        transactions: Optional[Any] = None,
+        transcript_size: int = 1000,
+    ) -> None:
         """Initialize class.
 
         Args:
             books (list[type[Book]], optional): All books. Defaults to None.
+            book_loader (Callable[[int], Optional[type[Book]]], optional):
+                Fetches books missing from memory by ISBN, e.g.
+                SQLConnection.get_book. Defaults to None.
+            change_loader (Callable[[Watermark], Changes], optional): Fetches the
+                books changed since a watermark, e.g.
+                SQLConnection.load_changes. Defaults to None.
+            watermark (Watermark, optional): Changelog position the books
+                were loaded at, e.g. from SQLConnection.change_watermark.
+                Defaults to 0.
+            transactions (Any, optional): Commits loans, returns and
+                reservations, e.g. a SQLConnection. Without it they only
+                change the books in memory. Defaults to None.
+            transcript_size (int, optional): Latest activities kept in the
+                transcript. Defaults to 1000.
         """
+        self.book_loader = book_loader
+        self.change_loader = change_loader
+        self.watermark = watermark
+        self.transactions = transactions
+        self.lock = threading.RLock()
+        self._generation = 0
+        self._isbn_index: dict[Any, type[Book]] = {}
+        self._positions: dict[Any, int] = {}
+        self._catalog: Optional[CompactCatalog] = None
+        self._batch_searcher: Optional[Any] = None
+        self._strategies: list[SearchStrategy] = []
         self.books = books
-        self.search_strategy: Optional[Any] = None
-        self.transcript: list[str] = []
+        self._search_strategy: Optional[Any] = None
+        self.transcript = Transcript(transcript_size)
+
+    @property
+    def search_strategy(self) -> Optional[Any]:
+        """Strategy used by search_books.
+
+        Returns:
+            Optional[Any]: Current search strategy.
+        """
+        return self._search_strategy
+
+    @search_strategy.setter
+    def search_strategy(self, strategy: Optional[Any]) -> None:
+        """Set the search strategy and keep it informed about changed books.
+
+        Args:
+            strategy (Optional[Any]): Search strategy.
+        """
+        with self.lock:
+            self._search_strategy = strategy
+            if strategy is not None and not any(
+                strategy is known for known in self._strategies
+            ):
+                self._strategies.append(strategy)
+
+    @property
+    def books(self) -> Optional[list[type[Book]]]:
+        """All books in the system.
+
+        Returns:
+            Optional[list[type[Book]]]: All books.
+        """
+        return self._books
+
+    @books.setter
+    def books(self, books: Optional[list[type[Book]]]) -> None:
+        """Replace all books and rebuild the ISBN index.
+
+        A CompactCatalog answers ISBN lookups itself, so no index is built
+        and its books stay in columns.
+
+        Args:
+            books (Optional[list[type[Book]]]): All books, or a CompactCatalog.
+        """
+        with self.lock:
+            self._generation += 1
+            self._books = books
+            if isinstance(books, CompactCatalog):
+                self._catalog = books
+                self._isbn_index = {}
+                self._positions = {}
+                return
+
+            self._catalog = None
+            self._isbn_index = {book.unique_ISBN: book for book in books or []}
+            self._positions = {
+                book.unique_ISBN: position for position, book in enumerate(books or [])
+            }
+
+    def get_book(self, book_id: int) -> Optional[type[Book]]:
+        """Find a book by its ISBN in constant time.
+
+        Books not held in memory are fetched with the book loader and kept
+        in the index for later transactions.
+
+        Args:
+            book_id (int): Id of book.
+
+        Returns:
+            Optional[type[Book]]: The book if present.
+        """
+        with self.lock:
+            book = self._isbn_index.get(book_id)
+            if book is None and self._catalog is not None:
+                book = self._catalog.get(book_id)
+        if book is None and self.book_loader is not None:
+            # The database is read without holding up searches
+            book = self.book_loader(book_id)
+            if book is not None:
+                with self.lock:
+                    book = self._isbn_index.setdefault(book_id, book)
+        return book
+
+    def add_book(self, book: type[Book]) -> None:
+        """Add a book to the system, replacing any book with the same ISBN.
+
+        Args:
+            book (type[Book]): Book to add.
+        """
+        with self.lock:
+            self._generation += 1
+            if self._catalog is not None:
+                existing = self._catalog.remove(
+                    book.unique_ISBN  # type: ignore[arg-type, unused-ignore]
+                )
+                self._catalog.add(book)
+                for strategy in self._strategies:
+                    if existing is not None:
+                        strategy.book_removed(existing)
+                    strategy.book_added(book)
+                return
+
+            if self._books is None:
+                self._books = []
+
+            existing = self._isbn_index.get(book.unique_ISBN)
+            if existing is not None:
+                for strategy in self._strategies:
+                    strategy.book_removed(existing)
+
+            position = self._positions.get(book.unique_ISBN)
+            if position is not None:
+                self._books[position] = book
+            else:
+                self._positions[book.unique_ISBN] = len(self._books)
+                self._books.append(book)
+            self._isbn_index[book.unique_ISBN] = book
+
+            for strategy in self._strategies:
+                strategy.book_added(book)
+
+    def remove_book(self, book_id: int) -> Optional[type[Book]]:
+        """Remove a book from the system.
+
+        The last book takes the place of the removed one, so removing does
+        not shift the whole list.
+
+        Args:
+            book_id (int): Id of book.
+
+        Returns:
+            Optional[type[Book]]: The removed book if it was present.
+        """
+        with self.lock:
+            self._generation += 1
+            book = self._isbn_index.pop(book_id, None)
+            if self._catalog is not None:
+                book = self._catalog.remove(book_id) or book
+            elif book is not None and self._books is not None:
+                position = self._positions.pop(book_id, None)
+                if position is not None:
+                    last = self._books.pop()
+                    if position < len(self._books):
+                        self._books[position] = last
+                        self._positions[last.unique_ISBN] = position
+
+            if book is not None and self._books is not None:
+                for strategy in self._strategies:
+                    strategy.book_removed(book)
+            return book
+
+    def refresh(self) -> int:
+        """Pull the books changed since the last refresh.
+
+        Raises:
+            ValueError: No change loader set.
+
+        Returns:
+            int: Number of changed books.
+        """
+        if self.change_loader is None:
+            raise ValueError("No change loader set")
+        return self.apply_changes(*self.change_loader(self.watermark))
+
+    def apply_changes(
+        self, books: list[type[Book]], removed: list[int], watermark: Watermark
+    ) -> int:
+        """Patch the books and the search indexes with fetched changes.
+
+        Without a full catalog in memory, only the books already fetched by
+        the book loader are replaced or dropped.
+
+        Args:
+            books (list[type[Book]]): Added or updated books.
+            removed (list[int]): ISBNs of removed books.
+            watermark (Watermark): Changelog position after the changes,
+                which replaces the current one.
+
+        Returns:
+            int: Number of changed books.
+        """
+        with self.lock:
+            for book in books:
+                if self._books is not None:
+                    self.add_book(book)
+                elif book.unique_ISBN in self._isbn_index:
+                    self._isbn_index[book.unique_ISBN] = book
+            for book_id in removed:
+                self.remove_book(book_id)
+
+            self.watermark = watermark
+            return len(books) + len(removed)
+
+    def _commit(
+        self, action: str, user_id: int, book_id: int
+    ) -> tuple[str, Optional[type[Book]]]:
+        """Run a loan, return or reservation through the transactions.
+
+        The books in memory are patched with the committed book, so they
+        follow the database whether the transaction succeeded or lost to
+        another desk. Only the patch holds the lock, not the transaction.
+
+        Args:
+            action (str): "loan_book", "return_book" or "reserve_book".
+            user_id (int): Id of user.
+            book_id (int): Id of book.
+
+        Returns:
+            tuple[str, Optional[type[Book]]]: Outcome of the transaction,
+                and the book, None if it does not exist.
+        """
+        status, book = getattr(self.transactions, action)(user_id, book_id)
+        with self.lock:
+            if book is None:
+                self.remove_book(book_id)
+            else:
+                self.apply_changes([book], [], self.watermark)
+        return status, book
+
+    def search_batch(self, queries: Iterable[tuple[str, str]]) -> dict[Any, list[int]]:
+        """Run many queries at once over the catalog columns.
+
+        A CompactCatalog is searched directly. A list of books is copied into
+        one first, so keep the catalog compact when batches run often.
+
+        Args:
+            queries (Iterable[tuple[str, str]]): Field and query pairs, the
+                field being "title", "author", "isbn" or "year".
+
+        Returns:
+            dict[Any, list[int]]: ISBNs found for each field and query.
+        """
+        # Imported here as the search package builds on this module
+        from src.search.batch import BatchSearcher
+
+        with self.lock:
+            if self._catalog is None:
+                return BatchSearcher(self._books or []).search(queries)
+            if self._batch_searcher is None or self._batch_searcher.catalog is not (
+                self._catalog
+            ):
+                self._batch_searcher = BatchSearcher(self._catalog)
+            found: dict[Any, list[int]] = self._batch_searcher.search(queries)
+            return found
 
     def log_activity(  # type: ignore
         func: Callable[[Any, int, int], str],
@@ -160,33 +471,43 @@ class LibrarySystem:
             Returns:
                 str: Result of activity.
             """
-            activity = (
-                f"Function '{func.__name__}' called with args: {args}, kwargs: {kwargs}"
-            )
-            print(activity)
-
             result = func(self, *args, **kwargs)
 
+            # Positional arguments are named like keyword ones
+            arguments = dict(zip(("user_id", "book_id"), args), **kwargs)
+            user_id = arguments.get("user_id")
+            book_id = arguments.get("book_id")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    result,
+                    extra={
+                        "action": func.__name__,
+                        "user_id": user_id,
+                        "book_id": book_id,
+                    },
+                )
+
             # Log transaction details to transcript
-            if "user_id" in kwargs and "book_id" in kwargs:
-                user_id = kwargs["user_id"]
-                book_id = kwargs["book_id"]
-                book = next((b for b in self.books if b.unique_ISBN == book_id), None)
-                if book:
-                    action = func.__name__.replace("_", " ").capitalize()
-                    transcript_entry = f"""User ID: {user_id},
-                    Action: {action},
-                    Book Title: {book.title},
-                    Book ID: {book_id}"""
-                    self.transcript.append(transcript_entry)
+            book = self.get_book(book_id) if book_id is not None else None
+            if book:
+                self.transcript.append(
+                    user_id=user_id,
+                    action=func.__name__.replace("_", " ").capitalize(),
+                    book_title=book.title,
+                    book_id=book_id,
+                )
 
             return result
 
         return wrapper
 
-    def search_books(self, query: str) -> list[type[Book]]:
+    def search_books(self, query: str) -> Iterator[type[Book]]:
         """Search for book.
 
+        The search runs lazily under the lock, so the results can be read
+        page by page on another thread. They end early when the books change
+        before they are all read.
+
         Args:
             query (str): Search query.
 
@@ -194,15 +515,36 @@ class LibrarySystem:
             ValueError: Search strategy not implimented.
 
         Returns:
-            list[type[Book]]: Found books
+            Iterator[type[Book]]: Found books
         """
         # Check if a search strategy is set
         if self.search_strategy is None:
             raise ValueError("No search strategy set")
 
         # Perform search using the selected strategy
-        books: list[type[Book]] = self.search_strategy.search(self.books, query)
-        return books
+        return self._read_locked(self.search_strategy, query)
+
+    def _read_locked(self, strategy: Any, query: str) -> Iterator[type[Book]]:
+        """Run a search, holding the lock while each book is found.
+
+        Args:
+            strategy (Any): Search strategy.
+            query (str): Search query.
+
+        Yields:
+            Iterator[type[Book]]: Found books, until the books change.
+        """
+        with self.lock:
+            generation = self._generation
+            books = iter(strategy.search(self._books, query))
+        while True:
+            with self.lock:
+                if generation != self._generation:
+                    return
+                book = next(books, None)
+            if book is None:
+                return
+            yield book
 
     @log_activity
     def loan_book(self, user_id: int, book_id: int) -> str:
@@ -215,19 +557,24 @@ class LibrarySystem:
         Returns:
             str: Result as text.
         """
-        for book in self.books:  # type: ignore
-            if book.unique_ISBN == book_id:
-                if book.is_available():  # type: ignore
+        if self.transactions is not None:
+            status, book = self._commit("loan_book", user_id, book_id)
+            loaned = status == DONE
+        else:
+            with self.lock:
+                book = self.get_book(book_id)
+                loaned = book is not None and book.is_available()  # type: ignore
+                if loaned:
                     book.loan_book(user_id)  # type: ignore
-                    return (
-                        f"Bogen '{book.title}' er blevet udlånt"
-                        f"til bruger med ID {user_id}."
-                    )
-                else:
-                    return f"Bogen '{book.title}' er allerede udlånt."
 
-        # Returnér en fejlbesked, hvis bogen ikke blev fundet
-        return "Bogen med det angivne ID blev ikke fundet."
+        if book is None:
+            # Returnér en fejlbesked, hvis bogen ikke blev fundet
+            return "Bogen med det angivne ID blev ikke fundet."
+
+        if loaned:
+            return f"Bogen '{book.title}' er blevet udlånttil bruger med ID {user_id}."
+        else:
+            return f"Bogen '{book.title}' er allerede udlånt."
 
     @log_activity
     def return_book(self, user_id: int, book_id: int) -> str:
@@ -240,20 +587,25 @@ class LibrarySystem:
         Returns:
             str: Result as text.
         """
-        for book in self.books:  # type: ignore
-            if book.unique_ISBN == book_id:
-                if not book.is_available():  # type:ignore
+        if self.transactions is not None:
+            status, book = self._commit("return_book", user_id, book_id)
+            returned = status == DONE
+        else:
+            with self.lock:
+                book = self.get_book(book_id)
+                returned = book is not None and not book.is_available()  # type: ignore
+                if returned:
                     book.return_book(user_id)  # type: ignore
-                    return (
-                        f"Bogen '{book.title}' blevt afleveret af bruger med ID"
-                        f"{user_id}."
-                    )
-                else:
-                    return (
-                        f"Bogen '{book.title}' er allerede tilgængelig på biblioteket."
-                    )
 
-        return "Bogen med det specifikke ID blev ikke fundet."
+        if book is None:
+            return "Bogen med det specifikke ID blev ikke fundet."
+
+        if returned:
+            return f"Bogen '{book.title}' blevt afleveret af bruger med ID{user_id}."
+        elif not book.is_available():  # type: ignore
+            return f"Bogen '{book.title}' er ikke lånt af bruger med ID {user_id}."
+        else:
+            return f"Bogen '{book.title}' er allerede tilgængelig på biblioteket."
 
     @log_activity
     def reserve_book(self, user_id: int, book_id: int) -> str:
@@ -266,19 +618,30 @@ class LibrarySystem:
         Returns:
             str: Result as text.
         """
-        for book in self.books:  # type: ignore
-            if book.unique_ISBN == book_id:
-                if book.is_available():  # type: ignore
+        status = None
+        if self.transactions is not None:
+            status, book = self._commit("reserve_book", user_id, book_id)
+            reserved = status == DONE
+        else:
+            with self.lock:
+                book = self.get_book(book_id)
+                reserved = book is not None and book.is_available()  # type: ignore
+                if reserved:
                     book.reserve_book(user_id)  # type: ignore
-                    return (
-                        f"Bogen '{book.title}' er blevet reserveret"
-                        f"til bruger med ID {user_id}."
-                    )
-                else:
-                    return f"Bogen '{book.title}' er allerede reserveret."
-
-        # Returnér en fejlbesked, hvis bogen ikke blev fundet
-        return "Bogen med det angivne ID blev ikke fundet."
+
+        if book is None:
+            # Returnér en fejlbesked, hvis bogen ikke blev fundet
+            return "Bogen med det angivne ID blev ikke fundet."
+
+        if reserved:
+            return (
+                f"Bogen '{book.title}' er blevet reserveret"
+                f"til bruger med ID {user_id}."
+            )
+        elif status == QUEUED:
+            return f"Bruger med ID {user_id} er sat i kø til bogen '{book.title}'."
+        else:
+            return f"Bogen '{book.title}' er allerede reserveret."
 
 
 class ReservedBookNotification:
@@ -1,2 +1,337 @@
+"""Logging of library activity, written away from the calling thread."""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Iterator, Optional
+
+# Attributes every LogRecord has, left out of the structured fields
+RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line.
+
+    Values passed with ``extra`` become fields of the object, so records can
+    be filtered and aggregated without parsing messages.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record.
+
+        Args:
+            record (logging.LogRecord): Record to format.
+
+        Returns:
+            str: JSON line.
+        """
+        entry: dict[str, Any] = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RotatingLogFileHandler(RotatingFileHandler):
+    """Write to a file rotated by size and by age.
+
+    The file is rotated when the next record would take it past max_bytes
+    or when it is older than interval seconds, whichever comes first.
+    Rotated files are kept as numbered backups like with
+    RotatingFileHandler. The size is counted as records are written instead
+    of asking the file system on every record.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 10_000_000,
+        interval: Optional[float] = 24 * 60 * 60,
+        backup_count: int = 7,
+        encoding: str = "utf-8",
+        buffered: bool = False,
+    ) -> None:
+        """Initialize class.
+
+        Args:
+            filename (str): Path of the log file.
+            max_bytes (int, optional): Size before rotating, 0 for no limit.
+                Defaults to 10_000_000.
+            interval (Optional[float], optional): Seconds before rotating,
+                None for no limit. Defaults to one day.
+            backup_count (int, optional): Rotated files kept.
+                Defaults to 7.
+            encoding (str, optional): File encoding. Defaults to "utf-8".
+            buffered (bool, optional): Leave flushing to the caller instead
+                of flushing every record. Defaults to False.
+        """
+        super().__init__(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding
+        )
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.buffered = buffered
+        # An existing file is as old as its last change
+        if os.path.exists(self.baseFilename):
+            started = os.path.getmtime(self.baseFilename)
+            self.size = os.path.getsize(self.baseFilename)
+        else:
+            started = time.time()
+            self.size = 0
+        self.rollover_at = self._next_rollover(started)
+
+    def _next_rollover(self, start: float) -> float:
+        """Find when a file started at some time must be rotated.
+
+        Args:
+            start (float): Start of the file, in seconds since the epoch.
+
+        Returns:
+            float: Rotation time, infinity without an interval.
+        """
+        return start + self.interval if self.interval else float("inf")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write a record, rotating the file first if needed.
+
+        Args:
+            record (logging.LogRecord): Record to write.
+        """
+        try:
+            line = self.format(record) + self.terminator
+            size = len(line.encode(self.encoding or "utf-8"))
+            full = 0 < self.size and self.size + size > self.max_bytes
+            if time.time() >= self.rollover_at or (self.max_bytes > 0 and full):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(line)
+            self.size += size
+            if not self.buffered:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self) -> None:
+        """Rotate the file and restart the size and the interval."""
+        super().doRollover()
+        self.size = 0
+        self.rollover_at = self._next_rollover(time.time())
+
+
+class ActivityQueueHandler(QueueHandler):
+    """Put records on a queue with as little work as possible.
+
+    QueueHandler formats and copies every record so it can be sent to
+    another process. The listener here is a thread of the same process, so
+    only the message arguments are merged, in case they change later.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge the message arguments into the message.
+
+        Args:
+            record (logging.LogRecord): Record to queue.
+
+        Returns:
+            logging.LogRecord: The same record.
+        """
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class FlushingQueueListener(QueueListener):
+    """Handle queued records and flush the handlers once the queue is empty.
+
+    Handlers created with buffered=True then write a burst of records with
+    one flush instead of one per record.
+    """
+
+    queue: "queue.SimpleQueue[logging.LogRecord]"
+
+    def handle(self, record: logging.LogRecord) -> None:
+        """Handle a record, flushing when no more are waiting.
+
+        Args:
+            record (logging.LogRecord): Record to handle.
+        """
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+
+class Transcript:
+    """Ring buffer of the latest activity, for display in the app.
+
+    Entries are kept as fields and only formatted when read, so recording
+    costs one append. The oldest entries are dropped once max_entries is
+    reached.
+    """
+
+    def __init__(self, max_entries: int = 1000) -> None:
+        """Initialize class.
+
+        Args:
+            max_entries (int, optional): Entries kept. Defaults to 1000.
+        """
+        self._entries: deque[dict[str, Any]] = deque(maxlen=max_entries)
+
+    def append(self, **fields: Any) -> None:
+        """Record an entry.
+
+        Args:
+            **fields (Any): Fields of the entry, e.g. user_id and book_id.
+        """
+        self._entries.append(fields)
+
+    def records(self) -> list[dict[str, Any]]:
+        """Copy the entries as fields.
+
+        Returns:
+            list[dict[str, Any]]: Entries, oldest first.
+        """
+        return [dict(entry) for entry in self._entries]
+
+    @staticmethod
+    def format(entry: dict[str, Any]) -> str:
+        """Format an entry for display.
+
+        Args:
+            entry (dict[str, Any]): Fields of the entry.
+
+        Returns:
+            str: One line of text.
+        """
+        return ", ".join(
+            f"{key.replace('_', ' ').capitalize()}: {value}"
+            for key, value in entry.items()
+        )
+
+    def __len__(self) -> int:
+        """Count the entries.
+
+        Returns:
+            int: Number of entries.
+        """
+        return len(self._entries)
+
+    def __getitem__(self, index: int) -> str:
+        """Format one entry.
+
+        Args:
+            index (int): Position, 0 being the oldest kept entry.
+
+        Returns:
+            str: Formatted entry.
+        """
+        return self.format(self._entries[index])
+
+    def __iter__(self) -> Iterator[str]:
+        """Format all entries.
+
+        Yields:
+            Iterator[str]: Formatted entries, oldest first.
+        """
+        for entry in list(self._entries):
+            yield self.format(entry)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+
 class Loggers:
-    pass
\ No newline at end of file
+    """Logging setup of the library.
+
+    Loggers below ``name`` get one ActivityQueueHandler, which only puts
+    records on a queue. A listener thread formats them and writes them to
+    the console and to a rotating JSON log file, so logging calls never wait
+    on I/O.
+    """
+
+    def __init__(
+        self,
+        name: str = "library",
+        path: Optional[str] = None,
+        level: int = logging.INFO,
+        console: bool = False,
+        max_bytes: int = 10_000_000,
+        interval: Optional[float] = 24 * 60 * 60,
+        backup_count: int = 7,
+    ) -> None:
+        """Initialize class and start writing records.
+
+        Args:
+            name (str, optional): Root of the configured loggers.
+                Defaults to "library".
+            path (Optional[str], optional): JSON log file, None for no file.
+                Defaults to None.
+            level (int, optional): Lowest level logged.
+                Defaults to logging.INFO.
+            console (bool, optional): Also print records. Defaults to False.
+            max_bytes (int, optional): Size before rotating the file.
+                Defaults to 10_000_000.
+            interval (Optional[float], optional): Seconds before rotating the
+                file. Defaults to one day.
+            backup_count (int, optional): Rotated files kept. Defaults to 7.
+        """
+        handlers: list[logging.Handler] = []
+        if path is not None:
+            file_handler = RotatingLogFileHandler(
+                path, max_bytes, interval, backup_count, buffered=True
+            )
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(
+                logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+            )
+            handlers.append(console_handler)
+
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(level)
+        self.logger.propagate = False
+        self.handlers = handlers
+        self._queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self.queue_handler = ActivityQueueHandler(self._queue)
+        self.logger.addHandler(self.queue_handler)
+        self.listener = FlushingQueueListener(self._queue, *handlers)
+        self.listener.start()
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Write the queued records, then stop and close the handlers."""
+        with self._lock:
+            if self.listener._thread is None:
+                return
+            self.logger.removeHandler(self.queue_handler)
+            self.listener.stop()
+            for handler in self.handlers:
+                handler.close()
+
+
+if __name__ == "__main__":
+    pass
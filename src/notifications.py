@@ -0,0 +1,215 @@
+"""Notifications to users, sent in batches away from the transactions."""
+
+import queue
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+
+class Notification:
+    """Message for one user about one book."""
+
+    __slots__ = ("user_id", "unique_ISBN", "message")
+
+    def __init__(self, user_id: int, unique_ISBN: int, message: str) -> None:
+        """Initialize class.
+
+        Args:
+            user_id (int): Id of the user to notify.
+            unique_ISBN (int): The unique ISBN of the book.
+            message (str): Text for the user.
+        """
+        self.user_id = user_id
+        self.unique_ISBN = unique_ISBN
+        self.message = message
+
+    def __repr__(self) -> str:
+        """Describe the notification.
+
+        Returns:
+            str: Representation.
+        """
+        return f"Notification(user_id={self.user_id}, message={self.message!r})"
+
+
+class NotificationSink:
+    """Destination of notifications, e.g. e-mail, SMS or the console."""
+
+    def send_batch(self, notifications: list[Notification]) -> None:
+        """Deliver notifications.
+
+        Args:
+            notifications (list[Notification]): Notifications to deliver.
+
+        Raises:
+            NotImplementedError: Not implemented.
+        """
+        raise NotImplementedError("Subclasses must implement send_batch method")
+
+
+class PrintSink(NotificationSink):
+    """Print notifications, as ReservedBookNotification does."""
+
+    def send_batch(self, notifications: list[Notification]) -> None:
+        """Print notifications.
+
+        Args:
+            notifications (list[Notification]): Notifications to print.
+        """
+        for notification in notifications:
+            print(
+                f"{notification.message} "
+                f"Notifikation sendt til bruger {notification.user_id}."
+            )
+
+
+class MemorySink(NotificationSink):
+    """Keep notifications in a list, e.g. for tests or a GUI inbox."""
+
+    def __init__(self) -> None:
+        """Initialize class."""
+        self.batches: list[list[Notification]] = []
+
+    @property
+    def notifications(self) -> list[Notification]:
+        """All delivered notifications.
+
+        Returns:
+            list[Notification]: Notifications, oldest first.
+        """
+        return [notification for batch in self.batches for notification in batch]
+
+    def send_batch(self, notifications: list[Notification]) -> None:
+        """Store notifications.
+
+        Args:
+            notifications (list[Notification]): Notifications to store.
+        """
+        self.batches.append(list(notifications))
+
+
+class NotificationDispatcher:
+    """Deliver notifications to sinks from a background thread.
+
+    dispatch only puts the notification on a queue, so a transaction is
+    never held up by a slow or failing sink. The thread sends whatever
+    has queued up, at most batch_size at a time, as soon as a batch is full
+    or flush_interval seconds after its first notification. A failing sink
+    is counted and skipped and the others still get the batch.
+    """
+
+    def __init__(
+        self,
+        sinks: Iterable[NotificationSink],
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        max_queued: int = 100_000,
+    ) -> None:
+        """Initialize class and start the background thread.
+
+        Args:
+            sinks (Iterable[NotificationSink]): Destinations of every batch.
+            batch_size (int, optional): Most notifications per batch.
+                Defaults to 100.
+            flush_interval (float, optional): Seconds a notification waits
+                for its batch to fill up. Defaults to 0.5.
+            max_queued (int, optional): Notifications kept waiting before new
+                ones are dropped. Defaults to 100_000.
+        """
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sent = 0
+        self.dropped = 0
+        self.failures = 0
+        self._queue: queue.Queue[Optional[Notification]] = queue.Queue(max_queued)
+        self._thread = threading.Thread(
+            target=self._run, name="notification-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def dispatch(self, notification: Notification) -> bool:
+        """Queue a notification without waiting.
+
+        Args:
+            notification (Notification): Notification to send.
+
+        Returns:
+            bool: Was it queued, False if the queue is full or closed.
+        """
+        if not self._thread.is_alive():
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait(notification)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def on_change(self, event: str, payload: Any) -> None:
+        """Notify the next user in line, as a SQLConnection listener.
+
+        Args:
+            event (str): Kind of change, only "reservation_ready" is used.
+            payload (Any): Book held for the user in its reserved_by.
+        """
+        if event == "reservation_ready":
+            self.dispatch(
+                Notification(
+                    payload.reserved_by,
+                    payload.unique_ISBN,
+                    f"Bogen '{payload.title}' er nu tilgængelig.",
+                )
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Send the queued notifications and stop the thread.
+
+        Args:
+            timeout (Optional[float], optional): Seconds to wait for the
+                thread, None to wait until it is done. Defaults to None.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        """Collect batches and send them until closed."""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            closing = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    notification = self._queue.get(timeout=max(remaining, 0))
+                except queue.Empty:
+                    break
+                if notification is None:
+                    closing = True
+                    break
+                batch.append(notification)
+            self._send(batch)
+            if closing:
+                return
+
+    def _send(self, batch: list[Notification]) -> None:
+        """Hand a batch to every sink.
+
+        Args:
+            batch (list[Notification]): Notifications to send.
+        """
+        for sink in self.sinks:
+            try:
+                sink.send_batch(batch)
+            except Exception:
+                self.failures += 1
+        self.sent += len(batch)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,245 @@
+"""Prefix autocomplete over titles and authors, ranked by popularity."""
+
+from bisect import bisect_left
+from typing import Any, Iterable, Mapping, Optional
+
+import numpy as np
+
+from src.data.catalog import CompactCatalog
+from src.search.text_index import normalize
+
+# Sorts after any character, so prefix + LAST ends the range of a prefix
+LAST = "\U0010ffff"
+
+
+class Autocomplete:
+    """Complete prefixes with the most popular matching texts.
+
+    Normalized texts are kept in one sorted array, so the texts starting
+    with a prefix form one contiguous range found with two binary searches.
+    A range holding at most SCAN_LIMIT texts is ranked on the spot. Larger
+    ranges come from short prefixes. Their best texts are computed when
+    building, so no lookup ranks more than SCAN_LIMIT texts.
+
+    The popularity of a text is the sum of the weights it was given, e.g.
+    one per book plus its loan count. Texts added after building are kept
+    aside and merged into the results.
+    """
+
+    SCAN_LIMIT = 256
+
+    def __init__(
+        self, entries: Iterable[tuple[str, float]], max_results: int = 10
+    ) -> None:
+        """Build the sorted array.
+
+        Args:
+            entries (Iterable[tuple[str, float]]): Texts and their weights.
+                A text given several times adds up its weights.
+            max_results (int, optional): Most completions returned by one
+                lookup. Defaults to 10.
+        """
+        self.max_results = max_results
+        texts = self._aggregate(entries)
+        self._keys = sorted(texts)
+        self._display = [texts[key][0] for key in self._keys]
+        self._weights = [texts[key][1] for key in self._keys]
+        self._extra: dict[str, list[Any]] = {}
+        self._top: dict[str, list[int]] = {}
+        self._precompute()
+
+    @classmethod
+    def from_books(
+        cls,
+        books: Iterable[Any],
+        attribute: str,
+        loans: Optional[Mapping[int, int]] = None,
+        max_results: int = 10,
+    ) -> "Autocomplete":
+        """Build from books, weighing each book by one plus its loans.
+
+        Args:
+            books (Iterable[Any]): Books, or a CompactCatalog whose columns
+                are read directly.
+            attribute (str): "title" or "author".
+            loans (Optional[Mapping[int, int]], optional): Loan count by
+                ISBN, when known. Defaults to None.
+            max_results (int, optional): Most completions returned by one
+                lookup. Defaults to 10.
+
+        Returns:
+            Autocomplete: Completions of the attribute.
+        """
+        loans = loans or {}
+        if not isinstance(books, CompactCatalog):
+            return cls(
+                (
+                    (getattr(book, attribute) or "", 1 + loans.get(book.unique_ISBN, 0))
+                    for book in books
+                ),
+                max_results,
+            )
+
+        # Read the columns instead of building a view per book
+        catalog = books
+        rows = np.flatnonzero(catalog.column_rows())
+        weights = np.ones(len(catalog.isbns), dtype=np.int64)
+        if loans:
+            found = catalog.rows_of(np.fromiter(loans, dtype=np.int64))
+            counts = np.fromiter(loans.values(), dtype=np.int64)
+            weights[found[found >= 0]] += counts[found >= 0]
+
+        entries: list[tuple[str, float]] = []
+        if attribute == "author":
+            totals = np.bincount(
+                catalog.author_codes[rows],
+                weights=weights[rows],
+                minlength=len(catalog.authors),
+            )
+            entries.extend(zip(catalog.authors, totals.tolist()))
+        else:
+            offsets = catalog.title_offsets.tolist()
+            buffer = catalog.titles
+            entries.extend(
+                (buffer[offsets[row] : offsets[row + 1]].decode(), weight)
+                for row, weight in zip(rows.tolist(), weights[rows].tolist())
+            )
+        entries.extend(
+            (getattr(book, attribute) or "", 1 + loans.get(book.unique_ISBN, 0))
+            for book in catalog.overlay()
+        )
+        return cls(entries, max_results)
+
+    @staticmethod
+    def _aggregate(entries: Iterable[tuple[str, float]]) -> dict[str, list[Any]]:
+        """Group entries by normalized text.
+
+        Args:
+            entries (Iterable[tuple[str, float]]): Texts and their weights.
+
+        Returns:
+            dict[str, list[Any]]: Text as first seen and total weight, by
+                normalized text.
+        """
+        texts: dict[str, list[Any]] = {}
+        for text, weight in entries:
+            key = normalize(text).strip()
+            if not key or weight <= 0:
+                continue
+            entry = texts.get(key)
+            if entry is None:
+                texts[key] = [text.strip(), weight]
+            else:
+                entry[1] += weight
+        return texts
+
+    def _best(self, lo: int, hi: int) -> list[int]:
+        """Rank a range of the sorted array.
+
+        Args:
+            lo (int): Start of the range.
+            hi (int): End of the range.
+
+        Returns:
+            list[int]: Positions of the max_results heaviest texts, ties in
+                alphabetical order.
+        """
+        if hi - lo <= self.SCAN_LIMIT:
+            weights = self._weights
+            ranked = sorted(range(lo, hi), key=lambda i: -weights[i])
+            return ranked[: self.max_results]
+
+        window = np.asarray(self._weights[lo:hi], dtype=np.float64)
+        count = min(self.max_results, hi - lo)
+        threshold = np.partition(window, hi - lo - count)[hi - lo - count]
+        candidates = np.flatnonzero(window >= threshold)
+        order = np.lexsort((candidates, -window[candidates]))
+        best: list[int] = (candidates[order[:count]] + lo).tolist()
+        return best
+
+    def _precompute(self) -> None:
+        """Rank every prefix whose range holds more than SCAN_LIMIT texts.
+
+        A prefix can only hold that many texts if its parent does, so each
+        level only splits the ranges kept at the level before.
+        """
+        keys = self._keys
+        ranges = [(0, len(keys))] if len(keys) > self.SCAN_LIMIT else []
+        length = 0
+        while ranges:
+            larger = []
+            for lo, hi in ranges:
+                self._top[keys[lo][:length]] = self._best(lo, hi)
+                position = lo
+                while position < hi:
+                    if len(keys[position]) <= length:
+                        position += 1
+                        continue
+                    prefix = keys[position][: length + 1]
+                    end = bisect_left(keys, prefix + LAST, position, hi)
+                    if end - position > self.SCAN_LIMIT:
+                        larger.append((position, end))
+                    position = end
+            ranges = larger
+            length += 1
+
+    def __len__(self) -> int:
+        """Count the distinct texts.
+
+        Returns:
+            int: Number of texts.
+        """
+        return len(self._keys) + len(self._extra)
+
+    def add(self, text: str, weight: float = 1) -> None:
+        """Add a text after building.
+
+        Texts already in the sorted array keep the popularity they had when
+        built. Rebuild to rank them again.
+
+        Args:
+            text (str): Text, e.g. the title of a new book.
+            weight (float, optional): Weight of the text. Defaults to 1.
+        """
+        key = normalize(text).strip()
+        if not key:
+            return
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            return
+        entry = self._extra.setdefault(key, [text.strip(), 0])
+        entry[1] += weight
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> list[str]:
+        """Find the most popular texts starting with a prefix.
+
+        Args:
+            prefix (str): Typed text, matched case-insensitively.
+            limit (Optional[int], optional): Completions returned, at most
+                max_results. Defaults to max_results.
+
+        Returns:
+            list[str]: Completions, most popular first.
+        """
+        limit = min(limit or self.max_results, self.max_results)
+        key = normalize(prefix).lstrip()
+        if not key:
+            return []
+
+        best = self._top.get(key)
+        if best is None:
+            lo = bisect_left(self._keys, key)
+            best = self._best(lo, bisect_left(self._keys, key + LAST, lo))
+        found = [(-self._weights[i], self._keys[i], self._display[i]) for i in best]
+        if self._extra:
+            found.extend(
+                (-weight, extra, display)
+                for extra, (display, weight) in self._extra.items()
+                if extra.startswith(key)
+            )
+            found.sort()
+        return [display for _, _, display in found[:limit]]
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,219 @@
+"""Shared logic for search strategies backed by an index."""
+
+from array import array
+from typing import Any, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.data.catalog import CompactCatalog
+from src.entities.books import Book
+from src.lib_system import SearchStrategy
+
+# Markers in IndexedBooks._rows for documents that are not catalog rows
+OBJECT = -1
+EMPTY = -2
+
+
+class IndexedBooks:
+    """Books of an index, by document id.
+
+    Books from the columns of a CompactCatalog are kept as their row and
+    handed out as views when read, so indexing a catalog creates no object
+    per book. Other books are kept as they are. Removed books leave an empty
+    slot until compacted renumbers the documents.
+    """
+
+    def __init__(self, catalog: Optional[CompactCatalog] = None) -> None:
+        """Initialize class.
+
+        Args:
+            catalog (Optional[CompactCatalog], optional): Catalog whose rows
+                are indexed. Defaults to None.
+        """
+        self.catalog = catalog
+        self.size = 0
+        # Catalog row of each document, OBJECT or EMPTY
+        self._rows = array("q")
+        self._objects: dict[int, Any] = {}
+        self._doc_ids: dict[Any, int] = {}
+        rows = 0 if catalog is None else len(catalog.isbns)
+        self._row_docs: NDArray[np.int64] = np.full(rows, -1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Get the number of document ids in use, including empty slots.
+
+        Returns:
+            int: Number of document ids.
+        """
+        return len(self._rows)
+
+    def __contains__(self, unique_ISBN: Any) -> bool:
+        """Check whether a book is indexed.
+
+        Args:
+            unique_ISBN (Any): ISBN of the book.
+
+        Returns:
+            bool: Whether the book is indexed.
+        """
+        return self.doc_of(unique_ISBN) is not None
+
+    def doc_of(self, unique_ISBN: Any) -> Optional[int]:
+        """Find the document id of a book.
+
+        Args:
+            unique_ISBN (Any): ISBN of the book.
+
+        Returns:
+            Optional[int]: Document id, None if the book is not indexed.
+        """
+        doc = self._doc_ids.get(unique_ISBN)
+        if doc is None and self.catalog is not None:
+            # The catalog may have removed the book already
+            row = self.catalog.column_row(unique_ISBN)
+            if row is not None and self._row_docs[row] >= 0:
+                doc = int(self._row_docs[row])
+        return doc
+
+    def append(self, book: Any) -> int:
+        """Index a book as it is.
+
+        Args:
+            book (Any): Book.
+
+        Returns:
+            int: Document id of the book.
+        """
+        doc = len(self._rows)
+        self._rows.append(OBJECT)
+        self._objects[doc] = book
+        self._doc_ids[book.unique_ISBN] = doc
+        self.size += 1
+        return doc
+
+    def extend_rows(self, rows: NDArray[Any]) -> int:
+        """Index catalog rows, in order.
+
+        Args:
+            rows (NDArray[Any]): Rows of the catalog.
+
+        Returns:
+            int: Document id of the first row.
+        """
+        first = len(self._rows)
+        self._rows.frombytes(rows.astype(np.int64).tobytes())
+        self._row_docs[rows] = np.arange(first, first + len(rows))
+        self.size += len(rows)
+        return first
+
+    def pop(self, unique_ISBN: Any) -> Optional[int]:
+        """Empty the slot of a book.
+
+        Args:
+            unique_ISBN (Any): ISBN of the book.
+
+        Returns:
+            Optional[int]: Document id of the book, None if it was not indexed.
+        """
+        doc = self.doc_of(unique_ISBN)
+        if doc is None:
+            return None
+        row = self._rows[doc]
+        if row == OBJECT:
+            del self._objects[doc]
+            del self._doc_ids[unique_ISBN]
+        else:
+            self._row_docs[row] = -1
+        self._rows[doc] = EMPTY
+        self.size -= 1
+        return doc
+
+    def get(self, doc: int) -> Any:
+        """Get the book of a document.
+
+        Args:
+            doc (int): Document id.
+
+        Returns:
+            Any: Book, None if the slot is empty.
+        """
+        row = self._rows[doc]
+        if row >= 0 and self.catalog is not None:
+            return self.catalog.book(row)
+        return self._objects.get(doc)
+
+    def compacted(self) -> tuple["IndexedBooks", list[int]]:
+        """Renumber the documents without the empty slots.
+
+        A new instance is returned so searches already running keep the
+        document ids they started with.
+
+        Returns:
+            tuple[IndexedBooks, list[int]]: Compacted books and the old
+                document id of each new one.
+        """
+        rows = np.frombuffer(self._rows, dtype=np.int64)
+        kept = np.flatnonzero(rows != EMPTY)
+        kept_rows = rows[kept]
+        books = IndexedBooks(self.catalog)
+        books.size = self.size
+        books._rows.frombytes(kept_rows.tobytes())
+        columns = np.flatnonzero(kept_rows >= 0)
+        books._row_docs[kept_rows[columns]] = columns
+        old_ids = kept.tolist()
+        for doc in np.flatnonzero(kept_rows == OBJECT).tolist():
+            book = self._objects[old_ids[doc]]
+            books._objects[doc] = book
+            books._doc_ids[book.unique_ISBN] = doc
+        return books, old_ids
+
+
+class IndexBackedSearchStrategy(SearchStrategy):
+    """Search strategy answering queries from an index over the books.
+
+    The index is built the first time a book list is searched and is kept up
+    to date through the book_added and book_removed notifications from
+    LibrarySystem. Searching a different book list rebuilds it.
+    """
+
+    def __init__(self, index: Any) -> None:
+        """Initialize class.
+
+        Args:
+            index (Any): Index with build, add and remove methods.
+        """
+        self.index = index
+        self._source: Optional[list[type[Book]]] = None
+
+    def ensure_index(self, books: list[type[Book]]) -> None:
+        """Build the index if it was built from another book list.
+
+        Args:
+            books (list[type[Book]]): Books.
+        """
+        if books is not self._source:
+            self.index.build(books or [])
+            self._source = books
+
+    def book_added(self, book: type[Book]) -> None:
+        """Add a book to the index if it has been built.
+
+        Args:
+            book (type[Book]): Added book.
+        """
+        if self._source is not None:
+            self.index.add(book)
+
+    def book_removed(self, book: type[Book]) -> None:
+        """Remove a book from the index if it has been built.
+
+        Args:
+            book (type[Book]): Removed book.
+        """
+        if self._source is not None:
+            self.index.remove(book)
+
+
+if __name__ == "__main__":
+    pass
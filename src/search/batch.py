@@ -0,0 +1,255 @@
+"""Batch search evaluating many queries over the catalog columns at once."""
+
+import re
+from collections import defaultdict
+from typing import Any, Callable, Iterable, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.data.catalog import NULL, CompactCatalog
+from src.search.year_index import parse_year_query
+
+Query = tuple[str, str]
+
+# Separates the titles so a match never spans two of them
+SEPARATOR = "\x00"
+
+
+class BatchSearcher:
+    """Answer many title, author, ISBN and year queries in one call.
+
+    Matches follow the single-query strategies: title and author queries
+    are case-insensitive substrings, ISBN queries are exact and year queries
+    take the forms of parse_year_query. Instead of walking the books once
+    per query, each field is answered from the catalog columns:
+
+    - ISBN queries are looked up together with one sorted search.
+    - Year queries become two sorted searches over the years, for all
+      queries at once.
+    - Author queries are matched against the distinct authors only and
+      expanded to their books.
+    - Title queries scan one lower-cased buffer of all titles, and the
+      match positions are mapped to books with a sorted search.
+
+    Books changed since the catalog was built are checked one by one.
+    """
+
+    FIELDS = ("title", "author", "isbn", "year")
+
+    def __init__(self, books: Any) -> None:
+        """Initialize class.
+
+        Args:
+            books (Any): CompactCatalog to search, or books to build one from.
+        """
+        if not isinstance(books, CompactCatalog):
+            books = CompactCatalog.from_books(books)
+        self.catalog = books
+        # Built on the first query of each field
+        self._titles: Optional[tuple[str, NDArray[Any]]] = None
+        self._authors: Optional[tuple[NDArray[Any], NDArray[Any], NDArray[Any]]] = None
+        self._years: Optional[tuple[NDArray[Any], NDArray[Any]]] = None
+
+    def search(self, queries: Iterable[Query]) -> dict[Query, list[int]]:
+        """Run many queries.
+
+        Args:
+            queries (Iterable[Query]): Field and query pairs, the field being
+                "title", "author", "isbn" or "year".
+
+        Raises:
+            ValueError: Unknown field.
+
+        Returns:
+            dict[Query, list[int]]: ISBNs found for each field and query, in
+                catalog order. Invalid year queries find nothing.
+        """
+        by_field: dict[str, list[str]] = defaultdict(list)
+        for field, query in dict.fromkeys(queries):
+            if field not in self.FIELDS:
+                raise ValueError(f"Unknown search field: {field}")
+            by_field[field].append(query)
+
+        live = self.catalog.column_rows()
+        overlay = list(self.catalog.overlay())
+        results: dict[Query, list[int]] = {}
+        for field, field_queries in by_field.items():
+            search: Callable[[list[str]], list[NDArray[Any]]] = getattr(
+                self, f"_search_{field}"
+            )
+            for query, rows in zip(field_queries, search(field_queries)):
+                rows = np.sort(rows[live[rows]])
+                isbns = self.catalog.isbns[rows].tolist()
+                isbns.extend(
+                    book.unique_ISBN
+                    for book in overlay
+                    if self.matches(field, query, book)
+                )
+                results[(field, query)] = isbns
+        return results
+
+    @staticmethod
+    def matches(field: str, query: str, book: Any) -> bool:
+        """Check one book the way the batch does, for books in the overlay.
+
+        Args:
+            field (str): Searched field.
+            query (str): Query.
+            book (Any): Book to check.
+
+        Returns:
+            bool: Does the book match.
+        """
+        if field == "isbn":
+            return str(book.unique_ISBN) == query
+        if field == "year":
+            try:
+                low, high = parse_year_query(query)
+            except ValueError:
+                return False
+            year = book.release_year
+            return (
+                year is not None
+                and (low is None or year >= low)
+                and (high is None or year <= high)
+            )
+        return query.lower() in (getattr(book, field) or "").lower()
+
+    def _search_isbn(self, queries: list[str]) -> list[NDArray[Any]]:
+        """Look up ISBN queries.
+
+        Args:
+            queries (list[str]): ISBN queries.
+
+        Returns:
+            list[NDArray[Any]]: Matching rows of each query.
+        """
+        # Match str(ISBN) == query as ISBNSearchStrategy does: ASCII digits
+        # without leading zeros, short enough for int64. str.isdigit alone
+        # also accepts digits such as "²", which int() rejects.
+        numbers = [
+            int(query)
+            if query.isascii()
+            and query.isdigit()
+            and len(query) <= 18
+            and (query[0] != "0" or query == "0")
+            else -1
+            for query in queries
+        ]
+        rows = self.catalog.rows_of(np.array(numbers, dtype=np.int64))
+        return [rows[i : i + 1] if row >= 0 else rows[:0] for i, row in enumerate(rows)]
+
+    def _search_year(self, queries: list[str]) -> list[NDArray[Any]]:
+        """Look up year queries.
+
+        Args:
+            queries (list[str]): Year queries.
+
+        Returns:
+            list[NDArray[Any]]: Matching rows of each query.
+        """
+        if self._years is None:
+            order = np.argsort(self.catalog.release_years, kind="stable")
+            self._years = (order, self.catalog.release_years[order])
+        year_rows, sorted_years = self._years
+
+        lows = np.empty(len(queries), dtype=np.int64)
+        highs = np.empty(len(queries), dtype=np.int64)
+        for i, query in enumerate(queries):
+            try:
+                low, high = parse_year_query(query)
+            except ValueError:
+                low, high = 1, 0
+            # Unknown years are stored as NULL, below every bound
+            lows[i] = NULL + 1 if low is None else low
+            highs[i] = np.iinfo(np.int64).max if high is None else high
+
+        starts = np.searchsorted(sorted_years, lows, side="left")
+        ends = np.searchsorted(sorted_years, highs, side="right")
+        return [
+            year_rows[start:end] for start, end in zip(starts, np.maximum(starts, ends))
+        ]
+
+    def _search_author(self, queries: list[str]) -> list[NDArray[Any]]:
+        """Look up author queries on the distinct authors.
+
+        Args:
+            queries (list[str]): Author queries.
+
+        Returns:
+            list[NDArray[Any]]: Matching rows of each query.
+        """
+        if self._authors is None:
+            codes = self.catalog.author_codes
+            authors = np.array(
+                [author.lower() for author in self.catalog.authors], dtype=str
+            )
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(authors) + 1))
+            self._authors = (authors, order, bounds)
+        authors, author_rows, bounds = self._authors
+
+        results = []
+        for query in queries:
+            matched = np.flatnonzero(np.char.find(authors, query.lower()) >= 0)
+            slices = [author_rows[bounds[c] : bounds[c + 1]] for c in matched]
+            results.append(np.concatenate(slices or [np.empty(0, dtype=np.int64)]))
+        return results
+
+    def _search_title(self, queries: list[str]) -> list[NDArray[Any]]:
+        """Look up title queries in the lower-cased title buffer.
+
+        Args:
+            queries (list[str]): Title queries.
+
+        Returns:
+            list[NDArray[Any]]: Matching rows of each query.
+        """
+        if self._titles is None:
+            buffer = self.catalog.titles
+            offsets = self.catalog.title_offsets.tolist()
+            titles = [
+                buffer[start:end].decode().lower()
+                for start, end in zip(offsets, offsets[1:])
+            ]
+            lengths = np.fromiter(map(len, titles), dtype=np.int64, count=len(titles))
+            starts = np.concatenate(
+                [np.zeros(1, dtype=np.int64), np.cumsum(lengths + 1)[:-1]]
+            )
+            self._titles = (SEPARATOR.join(titles), starts)
+        text, title_starts = self._titles
+
+        results = []
+        for query in queries:
+            query = query.lower()
+            if not query:
+                results.append(np.arange(len(self.catalog.isbns)))
+                continue
+            if SEPARATOR in query:
+                results.append(np.empty(0, dtype=np.int64))
+                continue
+            matches = re.finditer(re.escape(query), text)
+            positions = np.fromiter(
+                (match.start() for match in matches), dtype=np.int64
+            )
+            rows = np.searchsorted(title_starts, positions, side="right") - 1
+            results.append(np.unique(rows))
+        return results
+
+
+def batch_search(books: Any, queries: Iterable[Query]) -> dict[Query, list[int]]:
+    """Run many queries over a catalog.
+
+    Args:
+        books (Any): CompactCatalog or books to search.
+        queries (Iterable[Query]): Field and query pairs.
+
+    Returns:
+        dict[Query, list[int]]: ISBNs found for each field and query.
+    """
+    return BatchSearcher(books).search(queries)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,435 @@
+"""Fuzzy, ranked search on trigram similarity for titles and authors."""
+
+from array import array
+from typing import Any, Generator, Iterable, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from src.data.catalog import CompactCatalog
+from src.entities.books import Book
+from src.search.base import IndexBackedSearchStrategy, IndexedBooks
+from src.search.text_index import normalize, tokenize
+
+# Unicode code points fit in 21 bits, so three of them fit in one key
+CODE_BITS = 21
+
+
+def trigram_keys(words: list[str]) -> tuple[NDArray[Any], NDArray[Any]]:
+    """Extract the trigrams of many words at once.
+
+    Words are padded with two spaces in front and one behind, as in
+    PostgreSQL's pg_trgm, so short words and word starts get trigrams too.
+
+    Args:
+        words (list[str]): Normalized words.
+
+    Returns:
+        tuple[NDArray[Any], NDArray[Any]]: Trigram keys and the position of the
+            word each key came from.
+    """
+    if not words:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+
+    padded = [f"  {word} " for word in words]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32)
+    codes = codes.astype(np.uint64)
+
+    # A word of n padded characters has n - 2 trigrams, starting at its start
+    counts = lengths - 2
+    word_of = np.repeat(np.arange(len(words)), counts)
+    first_trigram = np.repeat(np.cumsum(counts) - counts, counts)
+    positions = (
+        np.arange(len(word_of))
+        - first_trigram
+        + np.repeat(np.cumsum(lengths) - lengths, counts)
+    )
+    keys = (
+        (codes[positions] << np.uint64(2 * CODE_BITS))
+        | (codes[positions + 1] << np.uint64(CODE_BITS))
+        | codes[positions + 2]
+    )
+    return keys, word_of
+
+
+class Segment:
+    """Immutable trigram postings of a group of values.
+
+    Keys are sorted and each points to a sorted run of value ids, so the
+    postings of a trigram are found with one binary search.
+    """
+
+    def __init__(self, keys: NDArray[Any], values: NDArray[Any]) -> None:
+        """Build the postings from (key, value) pairs.
+
+        Args:
+            keys (NDArray[Any]): Trigram keys.
+            values (NDArray[Any]): Value id of each key.
+        """
+        order = np.lexsort((values, keys))
+        keys, values = keys[order], values[order]
+        if len(keys):
+            # Drop trigrams repeated within a value
+            distinct = np.ones(len(keys), dtype=bool)
+            distinct[1:] = (keys[1:] != keys[:-1]) | (values[1:] != values[:-1])
+            keys, values = keys[distinct], values[distinct]
+
+        self.keys, starts = np.unique(keys, return_index=True)
+        self.offsets = np.append(starts, len(keys)).astype(np.int64)
+        self.values = values.astype(np.int32)
+
+    def __len__(self) -> int:
+        """Count the postings.
+
+        Returns:
+            int: Number of (trigram, value) pairs.
+        """
+        return len(self.values)
+
+    def postings(self, keys: NDArray[Any]) -> list[NDArray[Any]]:
+        """Look up the values containing each trigram.
+
+        Args:
+            keys (NDArray[Any]): Trigram keys.
+
+        Returns:
+            list[NDArray[Any]]: Sorted value ids of each trigram, empty for
+                trigrams not in the segment.
+        """
+        positions = np.searchsorted(self.keys, keys)
+        found = positions < len(self.keys)
+        found[found] = self.keys[positions[found]] == keys[found]
+        starts = np.where(found, self.offsets[np.minimum(positions, len(self.keys))], 0)
+        ends = np.where(
+            found, self.offsets[np.minimum(positions + 1, len(self.keys))], 0
+        )
+        return [self.values[start:end] for start, end in zip(starts, ends)]
+
+    def pairs(self) -> tuple[NDArray[Any], NDArray[Any]]:
+        """Expand the postings back to (key, value) pairs.
+
+        Returns:
+            tuple[NDArray[Any], NDArray[Any]]: Keys and value ids.
+        """
+        return np.repeat(self.keys, np.diff(self.offsets)), self.values
+
+
+class TrigramIndex:
+    """Index of the distinct values of one attribute by their trigrams.
+
+    Books with the same normalized text share a value, so an author is
+    indexed once however many books they wrote. Postings are kept in NumPy
+    segments: the books given to build form the first one and books added
+    later are collected and turned into a new segment on the next search.
+    Small segments are merged so their number stays low. A CompactCatalog is
+    indexed straight from its columns. Removed books leave
+    an empty slot, and the books are renumbered once there are more empty
+    slots than books, and at least COMPACT_MIN, as in TextIndex.
+    """
+
+    # Values indexed per segment when flushing, bounding the memory used
+    FLUSH_SIZE = 50_000
+    # Segments are not merged beyond this many (trigram, value) pairs
+    MAX_SEGMENT_POSTINGS = 4_000_000
+    COMPACT_MIN = 1024
+
+    def __init__(self, attribute: str) -> None:
+        """Initialize class.
+
+        Args:
+            attribute (str): Book attribute to index, e.g. "title".
+        """
+        self.attribute = attribute
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all books from the index."""
+        self._books = IndexedBooks()
+        self._doc_values = array("i")
+        self._value_ids: dict[str, int] = {}
+        self._value_sizes = array("i")
+        self._segments: list[Segment] = []
+        self._pending: list[tuple[int, str]] = []
+        self._removed = 0
+
+    def __len__(self) -> int:
+        """Count indexed books.
+
+        Returns:
+            int: Number of indexed books.
+        """
+        return self._books.size
+
+    def build(self, books: Iterable[Any]) -> None:
+        """Index all books, replacing the current content.
+
+        Args:
+            books (Iterable[Any]): Books, or a CompactCatalog.
+        """
+        self.clear()
+        if isinstance(books, CompactCatalog):
+            self._books = IndexedBooks(books)
+            rows = np.flatnonzero(books.column_rows())
+            self._books.extend_rows(rows)
+            for text in books.texts(self.attribute, rows):
+                self._doc_values.append(self._value_of(normalize(text)))
+            books = list(books.overlay())
+        for book in books:
+            self.add(book)
+        self.flush()
+
+    def add(self, book: type[Book]) -> None:
+        """Add a book, to be indexed by the next flush.
+
+        Args:
+            book (type[Book]): Book to add.
+        """
+        if book.unique_ISBN in self._books:
+            self.remove(book)
+
+        value = self._value_of(normalize(getattr(book, self.attribute) or ""))
+        self._books.append(book)
+        self._doc_values.append(value)
+
+    def _value_of(self, text: str) -> int:
+        """Find the value id of a normalized text, adding it if it is new.
+
+        Args:
+            text (str): Normalized text.
+
+        Returns:
+            int: Value id.
+        """
+        value = self._value_ids.get(text)
+        if value is None:
+            value = len(self._value_ids)
+            self._value_ids[text] = value
+            self._value_sizes.append(0)
+            self._pending.append((value, text))
+        return value
+
+    def remove(self, book: type[Book]) -> None:
+        """Remove a book from the index.
+
+        Args:
+            book (type[Book]): Book to remove.
+        """
+        doc_id = self._books.pop(book.unique_ISBN)
+        if doc_id is None:
+            return
+
+        self._doc_values[doc_id] = -1
+        self._removed += 1
+        if self._removed >= max(self.COMPACT_MIN, self._books.size):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop the empty slots of removed books and renumber the books.
+
+        Values and their segments are left as they are, only the books
+        pointing at them move.
+        """
+        self._books, kept = self._books.compacted()
+        self._doc_values = array("i", (self._doc_values[doc_id] for doc_id in kept))
+        self._removed = 0
+
+    def flush(self) -> None:
+        """Turn the values added since the last flush into segments."""
+        pending, self._pending = self._pending, []
+        for start in range(0, len(pending), self.FLUSH_SIZE):
+            self._add_segment(pending[start : start + self.FLUSH_SIZE])
+
+    def _add_segment(self, pending: list[tuple[int, str]]) -> None:
+        """Index values in a new segment, merging it into small neighbours.
+
+        Args:
+            pending (list[tuple[int, str]]): Value ids and their texts.
+        """
+        words: list[str] = []
+        word_values: list[int] = []
+        for value, text in pending:
+            tokens = tokenize(text) or [text]
+            words.extend(tokens)
+            word_values.extend([value] * len(tokens))
+
+        keys, word_of = trigram_keys(words)
+        segment = Segment(keys, np.asarray(word_values, dtype=np.int32)[word_of])
+        sizes = np.bincount(segment.values, minlength=len(self._value_sizes))
+        changed = np.flatnonzero(sizes)
+        for value, size in zip(changed.tolist(), sizes[changed].tolist()):
+            self._value_sizes[value] = size
+
+        self._segments.append(segment)
+        while len(self._segments) > 1:
+            last, previous = self._segments[-1], self._segments[-2]
+            if len(last) * 4 < len(previous):
+                break
+            if len(last) + len(previous) > self.MAX_SEGMENT_POSTINGS:
+                break
+            del self._segments[-2:]
+            (keys_a, values_a), (keys_b, values_b) = previous.pairs(), last.pairs()
+            self._segments.append(
+                Segment(
+                    np.concatenate([keys_a, keys_b]),
+                    np.concatenate([values_a, values_b]),
+                )
+            )
+
+    def query_keys(self, query: str) -> NDArray[Any]:
+        """Find the distinct trigrams of a query.
+
+        Args:
+            query (str): Query.
+
+        Returns:
+            NDArray[Any]: Trigram keys.
+        """
+        text = normalize(query)
+        keys, _ = trigram_keys(tokenize(text) or ([text] if text.strip() else []))
+        return np.unique(keys)
+
+    def scores(self, query: str) -> tuple[NDArray[Any], NDArray[Any]]:
+        """Score every value sharing a trigram with the query.
+
+        The score is the Jaccard similarity of the trigram sets, the shared
+        trigrams divided by the trigrams in either text. Shared trigrams are
+        counted with one bincount over the postings of all query trigrams.
+
+        Args:
+            query (str): Query.
+
+        Returns:
+            tuple[NDArray[Any], NDArray[Any]]: Value ids and their scores.
+        """
+        self.flush()
+        keys = self.query_keys(query)
+        if not len(keys) or not self._segments:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        postings = [
+            values for segment in self._segments for values in segment.postings(keys)
+        ]
+        shared = np.bincount(
+            np.concatenate(postings, dtype=np.intp), minlength=len(self._value_sizes)
+        )
+        values = np.flatnonzero(shared)
+        shared = shared[values]
+        sizes = np.frombuffer(self._value_sizes, dtype=np.int32)[values]
+        return values, shared / (len(keys) + sizes - shared)
+
+    def top(
+        self, query: str, k: int, min_score: float = 0.0
+    ) -> list[tuple[float, Any]]:
+        """Find the books whose text is most similar to a query.
+
+        Args:
+            query (str): Query.
+            k (int): Number of books.
+            min_score (float, optional): Lowest score returned.
+                Defaults to 0.0.
+
+        Returns:
+            list[tuple[float, Any]]: Score and book, best first.
+        """
+        values, scores = self.scores(query)
+        keep = scores >= min_score
+        values, scores = values[keep], scores[keep]
+        if not len(values):
+            return []
+        doc_values = np.frombuffer(self._doc_values, dtype=np.int32)
+
+        # Values can have several books or none left, so widen until k books.
+        # Removed books have value -1, which lands on the extra, unset slot.
+        wanted = k
+        while True:
+            count = min(wanted, len(values))
+            best = np.argpartition(-scores, count - 1)[:count]
+            selected = np.zeros(len(self._value_sizes) + 1, dtype=bool)
+            selected[values[best]] = True
+            docs = np.flatnonzero(selected[doc_values])
+            if len(docs) >= k or count == len(values):
+                break
+            wanted *= 4
+
+        score_of = dict(zip(values[best].tolist(), scores[best].tolist()))
+        books = self._books
+        results = [
+            (score_of[value], books.get(doc))
+            for doc, value in zip(docs.tolist(), doc_values[docs].tolist())
+        ]
+        results.sort(key=lambda result: -result[0])
+        return results[:k]
+
+
+class FuzzySearchStrategy(IndexBackedSearchStrategy):
+    """Rank books by how closely a text attribute resembles the query.
+
+    Tolerates misspellings such as "Herbret" for "Herbert". Only values
+    sharing at least one trigram with the query are scored, so the whole
+    catalog is never compared with the query.
+    """
+
+    attribute = ""
+    index: TrigramIndex
+
+    def __init__(self, top_k: int = 20, min_score: float = 0.2) -> None:
+        """Initialize class.
+
+        Args:
+            top_k (int, optional): Books returned per search. Defaults to 20.
+            min_score (float, optional): Lowest similarity, between 0 and 1,
+                of a returned book. Defaults to 0.2.
+        """
+        super().__init__(TrigramIndex(self.attribute))
+        self.top_k = top_k
+        self.min_score = min_score
+
+    def ranked(
+        self, books: list[type[Book]], query: str, k: Optional[int] = None
+    ) -> list[tuple[float, Any]]:
+        """Search and keep the scores.
+
+        Args:
+            books (list[type[Book]]): Books.
+            query (str): Query to find books.
+            k (Optional[int], optional): Books returned. Defaults to top_k.
+
+        Returns:
+            list[tuple[float, Any]]: Score and book, best first.
+        """
+        self.ensure_index(books)
+        return self.index.top(query, k or self.top_k, self.min_score)
+
+    def search(
+        self,
+        books: list[type[Book]],
+        query: str,
+    ) -> Generator[type[Book], None, None]:
+        """Search for the books most similar to the query.
+
+        Args:
+            books (list[type[Book]]): Books.
+            query (str): Query to find books.
+
+        Yields:
+            Generator[type[Book], None, None]: Found books, best first.
+        """
+        for _, book in self.ranked(books, query):
+            yield book
+
+
+class FuzzyTitleSearchStrategy(FuzzySearchStrategy):
+    """Fuzzy, ranked search by title."""
+
+    attribute = "title"
+
+
+class FuzzyAuthorSearchStrategy(FuzzySearchStrategy):
+    """Fuzzy, ranked search by author."""
+
+    attribute = "author"
+
+
+if __name__ == "__main__":
+    pass
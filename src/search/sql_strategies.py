@@ -0,0 +1,312 @@
+"""Search strategies that run their queries in the database."""
+
+from typing import Any, Callable, Generator, Optional
+
+from sqlalchemy import Select, and_, false, or_, select
+from sqlalchemy.orm import Session
+
+from src.entities.books import Book
+from src.lib_system import SearchStrategy
+from src.search.year_index import parse_year_query
+
+PageKey = tuple[Any, ...]
+
+
+def escape_like(query: str) -> str:
+    """Escape the LIKE wildcards in a query.
+
+    Args:
+        query (str): Query typed by the user.
+
+    Returns:
+        str: Query matching the wildcard characters literally.
+    """
+    return query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SQLSearchStrategy(SearchStrategy):
+    """Base class for strategies searching the books table directly.
+
+    The book list passed to search is ignored, so the catalog does not have
+    to be loaded into memory. Results are fetched in pages using keyset
+    paging on the sort columns followed by the unique ISBN, which lets the
+    database continue from an index position instead of skipping rows.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        page_size: int = 100,
+    ) -> None:
+        """Initialize class.
+
+        Args:
+            session_factory (Optional[Callable[[], Session]], optional): Creates
+                sessions, e.g. SQLConnection.Session. Strategies without one
+                only build statements, as used by AsyncSQLConnection.
+                Defaults to None.
+            page_size (int, optional): Books fetched per query. Defaults to 100.
+        """
+        self.session_factory = session_factory
+        self.page_size = page_size
+
+    def order_columns(self) -> list[Any]:
+        """Columns the results are sorted by, before the unique ISBN.
+
+        Returns:
+            list[Any]: Sort columns.
+        """
+        return []
+
+    def where_clause(self, query: str) -> Any:
+        """Build the filter for a query.
+
+        Args:
+            query (str): Query to find books.
+
+        Raises:
+            NotImplementedError: strategies not implimented.
+
+        Returns:
+            Any: SQL filter.
+        """
+        raise NotImplementedError()
+
+    def statement(
+        self,
+        query: str,
+        after: Optional[PageKey] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> Select[Any]:
+        """Build the SELECT for one page of results.
+
+        Args:
+            query (str): Query to find books.
+            after (Optional[PageKey], optional): Key of the last book on the
+                previous page. Defaults to None.
+            limit (Optional[int], optional): Page size. Defaults to page_size.
+            offset (Optional[int], optional): Rows to skip, for LIMIT/OFFSET
+                paging. Defaults to None.
+
+        Returns:
+            Select[Any]: SQL statement.
+        """
+        columns = self.order_columns() + [Book.unique_ISBN]
+        statement = select(Book).where(self.where_clause(query))
+
+        if after is not None:
+            # (a, b) > (x, y) written out so every database can use the index
+            conditions = []
+            for position, column in enumerate(columns):
+                equal = [columns[i] == after[i] for i in range(position)]
+                conditions.append(and_(*equal, column > after[position]))
+            statement = statement.where(or_(*conditions))
+
+        statement = statement.order_by(*columns)
+        statement = statement.limit(limit or self.page_size)
+        if offset:
+            statement = statement.offset(offset)
+        return statement
+
+    def page_key(self, book: type[Book]) -> PageKey:
+        """Build the keyset paging key of a book.
+
+        Args:
+            book (type[Book]): Last book of a page.
+
+        Returns:
+            PageKey: Values of the sort columns.
+        """
+        names = [column.key for column in self.order_columns()]
+        return tuple(getattr(book, name) for name in names + ["unique_ISBN"])
+
+    def fetch_page(
+        self,
+        query: str,
+        after: Optional[PageKey] = None,
+        limit: Optional[int] = None,
+    ) -> tuple[list[type[Book]], Optional[PageKey]]:
+        """Fetch one page of results.
+
+        Args:
+            query (str): Query to find books.
+            after (Optional[PageKey], optional): Key returned with the previous
+                page. Defaults to None.
+            limit (Optional[int], optional): Page size. Defaults to page_size.
+
+        Raises:
+            ValueError: The strategy has no session factory.
+
+        Returns:
+            tuple[list[type[Book]], Optional[PageKey]]: Books and the key of
+                the next page, None when there are no more results.
+        """
+        if self.session_factory is None:
+            raise ValueError("No session factory set")
+
+        limit = limit or self.page_size
+        with self.session_factory() as session:
+            books = list(session.scalars(self.statement(query, after, limit)))
+
+        return self.next_page(books, limit)
+
+    def next_page(
+        self, books: list[type[Book]], limit: int
+    ) -> tuple[list[type[Book]], Optional[PageKey]]:
+        """Pair a fetched page with the key of the following page.
+
+        Args:
+            books (list[type[Book]]): Books of the page.
+            limit (int): Page size the page was fetched with.
+
+        Returns:
+            tuple[list[type[Book]], Optional[PageKey]]: Books and the key of
+                the next page, None when there are no more results.
+        """
+        if len(books) < limit:
+            return books, None
+        return books, self.page_key(books[-1])
+
+    def search(
+        self,
+        books: list[type[Book]],
+        query: str,
+    ) -> Generator[type[Book], None, None]:
+        """Search the database page by page.
+
+        Args:
+            books (list[type[Book]]): Ignored, the database is searched.
+            query (str): Query to find books.
+
+        Yields:
+            Generator[type[Book], None, None]: Found books.
+        """
+        after = None
+        while True:
+            page, after = self.fetch_page(query, after)
+            yield from page
+            if after is None:
+                return
+
+
+class SQLTextSearchStrategy(SQLSearchStrategy):
+    """Search a text column with LIKE."""
+
+    attribute = ""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        page_size: int = 100,
+        match: str = "contains",
+    ) -> None:
+        """Initialize class.
+
+        Args:
+            session_factory (Optional[Callable[[], Session]], optional): Creates
+                sessions. Defaults to None.
+            page_size (int, optional): Books fetched per query. Defaults to 100.
+            match (str, optional): "contains" to match anywhere like the
+                in-memory strategies, or "prefix" to match the start of the
+                text, which the database can answer with an index range scan.
+                Defaults to "contains".
+
+        Raises:
+            ValueError: Unknown match type.
+        """
+        if match not in ("contains", "prefix"):
+            raise ValueError(f"Unknown match type: {match}")
+
+        super().__init__(session_factory, page_size)
+        self.match = match
+
+    def order_columns(self) -> list[Any]:
+        """Sort by the searched column so the index also serves the order.
+
+        Returns:
+            list[Any]: Sort columns.
+        """
+        return [getattr(Book, self.attribute)]
+
+    def where_clause(self, query: str) -> Any:
+        """Build a LIKE filter.
+
+        Args:
+            query (str): Query to find books.
+
+        Returns:
+            Any: SQL filter.
+        """
+        pattern = escape_like(query) + "%"
+        if self.match == "contains":
+            pattern = "%" + pattern
+        column = getattr(Book, self.attribute)
+        return column.like(pattern, escape="\\")
+
+
+class SQLTitleSearchStrategy(SQLTextSearchStrategy):
+    """Search by title in the database."""
+
+    attribute = "title"
+
+
+class SQLAuthorSearchStrategy(SQLTextSearchStrategy):
+    """Search by author in the database."""
+
+    attribute = "author"
+
+
+class SQLISBNSearchStrategy(SQLSearchStrategy):
+    """Search by ISBN in the database."""
+
+    def where_clause(self, query: str) -> Any:
+        """Look up the primary key.
+
+        Args:
+            query (str): Query to find books.
+
+        Returns:
+            Any: SQL filter.
+        """
+        try:
+            return Book.unique_ISBN == int(query)
+        except ValueError:
+            return false()
+
+
+class SQLYearSearchStrategy(SQLSearchStrategy):
+    """Search by year or year range in the database.
+
+    Accepts the same queries as YearRangeSearchStrategy.
+    """
+
+    def order_columns(self) -> list[Any]:
+        """Sort by release year.
+
+        Returns:
+            list[Any]: Sort columns.
+        """
+        return [Book.release_year]
+
+    def where_clause(self, query: str) -> Any:
+        """Build a range filter on the release year.
+
+        Args:
+            query (str): Year query.
+
+        Returns:
+            Any: SQL filter.
+        """
+        low, high = parse_year_query(query)
+        release_year = Book.__table__.c.release_year
+        conditions: list[Any] = [release_year.isnot(None)]
+        if low is not None:
+            conditions.append(release_year >= low)
+        if high is not None:
+            conditions.append(release_year <= high)
+        return and_(*conditions)
+
+
+if __name__ == "__main__":
+    pass
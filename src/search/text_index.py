@@ -0,0 +1,337 @@
+"""Inverted token and n-gram index for searching titles and authors."""
+
+import re
+from typing import Any, Generator, Iterable, Optional
+
+import numpy as np
+
+from src.data.catalog import CompactCatalog
+from src.entities.books import Book
+from src.search.base import IndexBackedSearchStrategy, IndexedBooks
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Normalize text the same way the plain search strategies do.
+
+    Args:
+        text (str): Text to normalize.
+
+    Returns:
+        str: Normalized text.
+    """
+    return text.lower()
+
+
+def tokenize(text: str) -> list[str]:
+    """Split normalized text into word tokens.
+
+    Args:
+        text (str): Normalized text.
+
+    Returns:
+        list[str]: Tokens.
+    """
+    return TOKEN_PATTERN.findall(text)
+
+
+def ngrams(text: str, size: int) -> set[str]:
+    """Find all distinct n-grams in a text.
+
+    Args:
+        text (str): Normalized text.
+        size (int): Length of the n-grams.
+
+    Returns:
+        set[str]: N-grams.
+    """
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+class TextIndex:
+    """Inverted index over one text attribute of the books.
+
+    Every book gets a document id. Tokens and n-grams of the normalized text
+    map to the set of document ids containing them, so a query only touches
+    the postings of its own tokens or n-grams. A CompactCatalog is indexed
+    straight from its columns.
+
+    Removing or replacing a book leaves an empty slot behind. Once there are
+    more empty slots than books, and at least COMPACT_MIN, the index is
+    compacted and the document ids renumbered, so a catalog that is updated
+    all day does not keep growing.
+    """
+
+    COMPACT_MIN = 1024
+
+    def __init__(self, attribute: str, ngram_size: int = 3) -> None:
+        """Initialize class.
+
+        Args:
+            attribute (str): Book attribute to index, e.g. "title".
+            ngram_size (int, optional): Length of the n-grams. Defaults to 3.
+        """
+        self.attribute = attribute
+        self.ngram_size = ngram_size
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all books from the index."""
+        self._books = IndexedBooks()
+        self._texts: list[Optional[str]] = []
+        self._tokens: dict[str, set[int]] = {}
+        self._ngrams: dict[str, set[int]] = {}
+        self._removed = 0
+
+    def __len__(self) -> int:
+        """Count indexed books.
+
+        Returns:
+            int: Number of indexed books.
+        """
+        return self._books.size
+
+    def build(self, books: Iterable[Any]) -> None:
+        """Index all books, replacing the current content.
+
+        Args:
+            books (Iterable[Any]): Books, or a CompactCatalog.
+        """
+        self.clear()
+        if isinstance(books, CompactCatalog):
+            self._books = IndexedBooks(books)
+            rows = np.flatnonzero(books.column_rows())
+            first = self._books.extend_rows(rows)
+            texts = books.texts(self.attribute, rows)
+            for doc_id, text in enumerate(texts, start=first):
+                self._index(doc_id, normalize(text))
+            books = list(books.overlay())
+        for book in books:
+            self.add(book)
+
+    def add(self, book: type[Book]) -> None:
+        """Add a book to the index.
+
+        Args:
+            book (type[Book]): Book to add.
+        """
+        if book.unique_ISBN in self._books:
+            self.remove(book)
+
+        text = normalize(getattr(book, self.attribute) or "")
+        self._index(self._books.append(book), text)
+
+    def _index(self, doc_id: int, text: str) -> None:
+        """Add the normalized text of the next document to the index.
+
+        Args:
+            doc_id (int): Document id, following the last one.
+            text (str): Normalized text.
+        """
+        self._texts.append(text)
+        for token in set(tokenize(text)):
+            self._tokens.setdefault(token, set()).add(doc_id)
+        for gram in ngrams(text, self.ngram_size):
+            self._ngrams.setdefault(gram, set()).add(doc_id)
+
+    def remove(self, book: type[Book]) -> None:
+        """Remove a book from the index.
+
+        Args:
+            book (type[Book]): Book to remove.
+        """
+        doc_id = self._books.pop(book.unique_ISBN)
+        if doc_id is None:
+            return
+
+        text = self._texts[doc_id] or ""
+        self._texts[doc_id] = None
+
+        for token in set(tokenize(text)):
+            self._discard(self._tokens, token, doc_id)
+        for gram in ngrams(text, self.ngram_size):
+            self._discard(self._ngrams, gram, doc_id)
+
+        self._removed += 1
+        if self._removed >= max(self.COMPACT_MIN, self._books.size):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop the empty slots of removed books and renumber the documents.
+
+        New lists replace the old ones, so searches already running keep
+        the document ids they started with.
+        """
+        books, old_ids = self._books.compacted()
+        renumbered = {old_id: doc_id for doc_id, old_id in enumerate(old_ids)}
+        self._texts = [self._texts[old_id] for old_id in old_ids]
+        self._books = books
+        for postings in (self._tokens, self._ngrams):
+            for key, documents in postings.items():
+                postings[key] = {renumbered[doc_id] for doc_id in documents}
+        self._removed = 0
+
+    @staticmethod
+    def _discard(postings: dict[str, set[int]], key: str, doc_id: int) -> None:
+        """Remove a document from a posting list, dropping empty lists.
+
+        Args:
+            postings (dict[str, set[int]]): Posting lists.
+            key (str): Token or n-gram.
+            doc_id (int): Document to remove.
+        """
+        documents = postings.get(key)
+        if documents is not None:
+            documents.discard(doc_id)
+            if not documents:
+                del postings[key]
+
+    @staticmethod
+    def _intersect(postings: list[set[int]]) -> set[int]:
+        """Intersect posting lists, starting from the shortest.
+
+        Args:
+            postings (list[set[int]]): Posting lists.
+
+        Returns:
+            set[int]: Documents present in all posting lists.
+        """
+        postings = sorted(postings, key=len)
+        documents = set(postings[0])
+        for other in postings[1:]:
+            documents.intersection_update(other)
+            if not documents:
+                break
+        return documents
+
+    def _yield_documents(self, doc_ids: set[int]) -> Generator[type[Book], None, None]:
+        """Yield books in the order they were indexed.
+
+        Args:
+            doc_ids (set[int]): Documents.
+
+        Yields:
+            Generator[type[Book], None, None]: Books.
+        """
+        books = self._books
+        for doc_id in sorted(doc_ids):
+            book = books.get(doc_id)
+            if book is not None:
+                yield book
+
+    def search_substring(self, query: str) -> Generator[type[Book], None, None]:
+        """Find books whose text contains the query.
+
+        Queries shorter than the n-gram size cannot use the n-gram index and
+        fall back to a scan over the pre-normalized texts.
+
+        Args:
+            query (str): Query to find books.
+
+        Yields:
+            Generator[type[Book], None, None]: Found books.
+        """
+        query = normalize(query)
+
+        if len(query) < self.ngram_size:
+            books = self._books
+            for doc_id, text in enumerate(self._texts):
+                if text is not None and query in text:
+                    yield books.get(doc_id)
+            return
+
+        postings = []
+        for gram in ngrams(query, self.ngram_size):
+            documents = self._ngrams.get(gram)
+            if documents is None:
+                return
+            postings.append(documents)
+
+        # N-grams only narrow down the candidates, the order is not checked.
+        candidates = {
+            doc_id
+            for doc_id in self._intersect(postings)
+            if query in self._texts[doc_id]  # type: ignore
+        }
+        yield from self._yield_documents(candidates)
+
+    def search_tokens(self, query: str) -> Generator[type[Book], None, None]:
+        """Find books containing every word of the query.
+
+        Args:
+            query (str): Query to find books.
+
+        Yields:
+            Generator[type[Book], None, None]: Found books.
+        """
+        postings = []
+        for token in set(tokenize(normalize(query))):
+            documents = self._tokens.get(token)
+            if documents is None:
+                return
+            postings.append(documents)
+
+        if postings:
+            yield from self._yield_documents(self._intersect(postings))
+
+
+class IndexedSearchStrategy(IndexBackedSearchStrategy):
+    """Search one text attribute through an inverted index."""
+
+    attribute = ""
+
+    def __init__(self, match: str = "substring", ngram_size: int = 3) -> None:
+        """Initialize class.
+
+        Args:
+            match (str, optional): "substring" to match anywhere in the text
+                like the plain strategies, or "tokens" to match whole words.
+                Defaults to "substring".
+            ngram_size (int, optional): Length of the n-grams. Defaults to 3.
+
+        Raises:
+            ValueError: Unknown match type.
+        """
+        if match not in ("substring", "tokens"):
+            raise ValueError(f"Unknown match type: {match}")
+
+        super().__init__(TextIndex(self.attribute, ngram_size))
+        self.match = match
+
+    def search(
+        self,
+        books: list[type[Book]],
+        query: str,
+    ) -> Generator[type[Book], None, None]:
+        """Search through the index.
+
+        Args:
+            books (list[type[Book]]): Books.
+            query (str): Query to find books.
+
+        Yields:
+            Generator[type[Book], None, None]: Found books.
+        """
+        self.ensure_index(books)
+
+        if self.match == "tokens":
+            yield from self.index.search_tokens(query)
+        else:
+            yield from self.index.search_substring(query)
+
+
+class IndexedTitleSearchStrategy(IndexedSearchStrategy):
+    """Search by title through an inverted index."""
+
+    attribute = "title"
+
+
+class IndexedAuthorSearchStrategy(IndexedSearchStrategy):
+    """Search by author through an inverted index."""
+
+    attribute = "author"
+
+
+if __name__ == "__main__":
+    pass
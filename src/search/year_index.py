@@ -0,0 +1,269 @@
+"""Sorted release year index answering exact, range and open-ended queries."""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Generator, Iterable, Optional
+
+import numpy as np
+
+from src.data.catalog import NULL, CompactCatalog
+from src.entities.books import Book
+from src.search.base import IndexBackedSearchStrategy, IndexedBooks
+
+RANGE_PATTERN = re.compile(r"^(\d+)\s*-\s*(\d+)$")
+COMPARISON_PATTERN = re.compile(r"^(>=|<=|>|<|=)\s*(\d+)$")
+DECADE_PATTERN = re.compile(r"^(\d*0)s$")
+
+
+def parse_year_query(query: str) -> tuple[Optional[int], Optional[int]]:
+    """Turn a year query into inclusive bounds.
+
+    Supported forms are "1999", "1990-1999", "1990s", ">=2010", ">2010",
+    "<=1950" and "<1950". Open ends are returned as None.
+
+    Args:
+        query (str): Year query.
+
+    Raises:
+        ValueError: Query is not a valid year query.
+
+    Returns:
+        tuple[Optional[int], Optional[int]]: Lowest and highest year.
+    """
+    query = query.strip()
+
+    match = RANGE_PATTERN.match(query)
+    if match:
+        low, high = int(match.group(1)), int(match.group(2))
+        return min(low, high), max(low, high)
+
+    match = COMPARISON_PATTERN.match(query)
+    if match:
+        operator, year = match.group(1), int(match.group(2))
+        if operator == ">=":
+            return year, None
+        if operator == ">":
+            return year + 1, None
+        if operator == "<=":
+            return None, year
+        if operator == "<":
+            return None, year - 1
+        return year, year
+
+    match = DECADE_PATTERN.match(query)
+    if match:
+        decade = int(match.group(1))
+        return decade, decade + 9
+
+    year = int(query)
+    return year, year
+
+
+class YearIndex:
+    """Books sorted by release year.
+
+    Release years and document ids are kept in two parallel arrays sorted by
+    year, so a range is found with two binary searches and read as a slice.
+    A CompactCatalog is indexed straight from its columns. Removed books
+    leave an empty slot, compacted as in TextIndex.
+    """
+
+    COMPACT_MIN = 1024
+
+    def __init__(self) -> None:
+        """Initialize class."""
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all books from the index."""
+        self._years = array("q")
+        self._docs = array("q")
+        self._books = IndexedBooks()
+        self._removed = 0
+
+    def __len__(self) -> int:
+        """Count indexed books.
+
+        Returns:
+            int: Number of indexed books.
+        """
+        return len(self._docs)
+
+    def build(self, books: Iterable[Any]) -> None:
+        """Index all books, replacing the current content.
+
+        Args:
+            books (Iterable[Any]): Books, or a CompactCatalog.
+        """
+        self.clear()
+        if isinstance(books, CompactCatalog):
+            self._books = IndexedBooks(books)
+            years = books.release_years
+            rows = np.flatnonzero(books.column_rows() & (years != NULL))
+            rows = rows[np.argsort(years[rows], kind="stable")]
+            first = self._books.extend_rows(rows)
+            self._years.frombytes(years[rows].astype(np.int64).tobytes())
+            docs = np.arange(first, first + len(rows), dtype=np.int64)
+            self._docs.frombytes(docs.tobytes())
+            for book in books.overlay():
+                self.add(book)
+            return
+
+        ordered = sorted(
+            (book for book in books if book.release_year is not None),
+            key=lambda book: book.release_year,
+        )
+        for book in ordered:
+            self._years.append(book.release_year)
+            self._docs.append(self._books.append(book))
+
+    def add(self, book: Any) -> None:
+        """Add a book to the index after the books of the same year.
+
+        Args:
+            book (Any): Book or catalog view to add.
+        """
+        if book.release_year is None:
+            return
+
+        position = bisect_right(self._years, book.release_year)
+        self._years.insert(position, book.release_year)
+        self._docs.insert(position, self._books.append(book))
+
+    def remove(self, book: Any) -> None:
+        """Remove a book from the index.
+
+        Args:
+            book (Any): Book or catalog view to remove.
+        """
+        year = book.release_year
+        if year is None:
+            return
+
+        doc_id = self._books.pop(book.unique_ISBN)
+        if doc_id is None:
+            return
+
+        start, end = self._bounds(year, year)
+        for position in range(start, end):
+            if self._docs[position] == doc_id:
+                del self._years[position]
+                del self._docs[position]
+                break
+
+        self._removed += 1
+        if self._removed >= max(self.COMPACT_MIN, self._books.size):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop the empty slots of removed books and renumber the documents.
+
+        New arrays replace the old ones, so searches already running keep
+        the document ids they started with.
+        """
+        books, old_ids = self._books.compacted()
+        renumbered = np.full(len(self._books), -1, dtype=np.int64)
+        renumbered[old_ids] = np.arange(len(old_ids))
+        docs = renumbered[np.frombuffer(self._docs, dtype=np.int64)]
+        self._docs = array("q", docs.tobytes())
+        self._books = books
+        self._removed = 0
+
+    def _bounds(self, low: Optional[int], high: Optional[int]) -> tuple[int, int]:
+        """Find the slice of books released between two years.
+
+        Args:
+            low (Optional[int]): Lowest year, None for no lower bound.
+            high (Optional[int]): Highest year, None for no upper bound.
+
+        Returns:
+            tuple[int, int]: Start and end of the slice.
+        """
+        start = 0 if low is None else bisect_left(self._years, low)
+        end = len(self._years) if high is None else bisect_right(self._years, high)
+        return start, max(start, end)
+
+    def range(
+        self, low: Optional[int], high: Optional[int]
+    ) -> Generator[type[Book], None, None]:
+        """Find books released between two years, both included.
+
+        Args:
+            low (Optional[int]): Lowest year, None for no lower bound.
+            high (Optional[int]): Highest year, None for no upper bound.
+
+        Yields:
+            Generator[type[Book], None, None]: Found books ordered by year.
+        """
+        start, end = self._bounds(low, high)
+        books, docs = self._books, self._docs
+        for position in range(start, end):
+            book = books.get(docs[position])
+            if book is not None:
+                yield book
+
+    def counts(self, low: Optional[int], high: Optional[int]) -> dict[int, int]:
+        """Count books per year without touching the books.
+
+        Args:
+            low (Optional[int]): Lowest year, None for no lower bound.
+            high (Optional[int]): Highest year, None for no upper bound.
+
+        Returns:
+            dict[int, int]: Number of books per release year.
+        """
+        start, end = self._bounds(low, high)
+        counts = {}
+        while start < end:
+            year = self._years[start]
+            next_start = bisect_right(self._years, year, start, end)
+            counts[year] = next_start - start
+            start = next_start
+        return counts
+
+
+class YearRangeSearchStrategy(IndexBackedSearchStrategy):
+    """Search by exact year, year range or open-ended year bound."""
+
+    index: YearIndex
+
+    def __init__(self) -> None:
+        """Initialize class."""
+        super().__init__(YearIndex())
+
+    def search(
+        self,
+        books: list[type[Book]],
+        query: str,
+    ) -> Generator[type[Book], None, None]:
+        """Search by year, e.g. "1999", "1990-1999", "1990s" or ">=2010".
+
+        Args:
+            books (list[type[Book]]): Books.
+            query (str): Query to find books.
+
+        Yields:
+            Generator[type[Book], None, None]: Found books ordered by year.
+        """
+        low, high = parse_year_query(query)
+        self.ensure_index(books)
+        yield from self.index.range(low, high)
+
+    def counts(self, books: list[type[Book]], query: str) -> dict[int, int]:
+        """Count books per year matching a year query.
+
+        Args:
+            books (list[type[Book]]): Books.
+            query (str): Year query.
+
+        Returns:
+            dict[int, int]: Number of books per release year.
+        """
+        low, high = parse_year_query(query)
+        self.ensure_index(books)
+        return self.index.counts(low, high)
+
+
+if __name__ == "__main__":
+    pass
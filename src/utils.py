@@ -1,9 +1,14 @@
 """Utilities to be used thoughout the code."""
 
 import json
-import random
+import multiprocessing
+import os
+import threading
 import time
-from typing import Any
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
 
 
 class ConfigManager:
@@ -43,6 +48,214 @@ class ConfigManager:
         """
         return self.config["password"]
 
+    def worker_id(self) -> Optional[int]:
+        """Fetch the worker id of the generated ids from the config.
+
+        Returns:
+            Optional[int]: Worker id, None to take it from LIBRARY_WORKER_ID.
+        """
+        worker_id = self.get("worker_id")
+        return None if worker_id is None else int(worker_id)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Fetch an optional setting from the config.
+
+        Args:
+            key (str): Name of the setting.
+            default (Any, optional): Value if the setting is missing.
+                Defaults to None.
+
+        Returns:
+            Any: Setting.
+        """
+        return self.config.get(key, default)
+
+
+class IdGenerator:
+    """Snowflake-style generator of unique, increasing 63-bit ids.
+
+    An id is made of the milliseconds since EPOCH_MS (41 bits, about 69
+    years), a worker id (10 bits) and a sequence number within the
+    millisecond (12 bits). Ids from one generator always increase, so new
+    rows are appended at the end of the primary key index. Processes using
+    different worker ids never produce the same id, so every process writing
+    to the same database needs a worker id of its own, given explicitly or
+    through the LIBRARY_WORKER_ID environment variable. Without one, no id
+    is generated rather than risking duplicates.
+
+    When the 4096 ids of a millisecond are used up, the generator moves on
+    to the next millisecond instead of waiting for it, and it never goes
+    back when the system clock does. Large batches therefore run slightly
+    ahead of the clock rather than blocking.
+    """
+
+    EPOCH_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+    WORKER_BITS = 10
+    SEQUENCE_BITS = 12
+    MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+    MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+    def __init__(self, worker_id: Optional[int] = None) -> None:
+        """Initialize class.
+
+        Args:
+            worker_id (Optional[int], optional): Id between 0 and 1023 that
+                is unique among the processes generating ids. Defaults to
+                the LIBRARY_WORKER_ID environment variable.
+
+        Raises:
+            ValueError: Worker id out of range.
+            RuntimeError: No worker id given and LIBRARY_WORKER_ID not set.
+        """
+        self._lock = threading.Lock()
+        self._fixed_worker_id = worker_id
+        self.worker_id: Optional[int] = self._pick_worker_id()
+        self.reset()
+
+    def reset(self) -> None:
+        """Start over, e.g. in a forked process.
+
+        A worker id taken from the environment is picked again before the
+        next id, which fails in a child process as it would share the id of
+        its parent.
+        """
+        self.worker_id = self._fixed_worker_id
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _pick_worker_id(self) -> int:
+        """Find the worker id.
+
+        Raises:
+            ValueError: Worker id out of range.
+            RuntimeError: No worker id given and LIBRARY_WORKER_ID not set,
+                or set but inherited from a parent process.
+
+        Returns:
+            int: Worker id.
+        """
+        worker_id = self._fixed_worker_id
+        if worker_id is None:
+            value = os.environ.get("LIBRARY_WORKER_ID")
+            if value is None:
+                raise RuntimeError(
+                    "Set LIBRARY_WORKER_ID to a worker id between 0 and "
+                    f"{self.MAX_WORKER_ID} that no other process writing to the "
+                    "library uses"
+                )
+            if multiprocessing.parent_process() is not None:
+                raise RuntimeError(
+                    "LIBRARY_WORKER_ID is shared with the parent process, "
+                    "generate the ids there or give this process its own worker id"
+                )
+            worker_id = int(value)
+
+        if not 0 <= worker_id <= self.MAX_WORKER_ID:
+            raise ValueError(f"Worker id must be between 0 and {self.MAX_WORKER_ID}")
+        return worker_id
+
+    def _now_ms(self) -> int:
+        """Milliseconds since the epoch of the ids.
+
+        Returns:
+            int: Current timestamp.
+        """
+        return time.time_ns() // 1_000_000 - self.EPOCH_MS
+
+    def _reserve(self, count: int) -> tuple[int, int]:
+        """Reserve ids from the current millisecond, holding the lock.
+
+        Args:
+            count (int): Ids wanted.
+
+        Returns:
+            tuple[int, int]: First id and number of ids reserved, at most
+                count and at most what is left of the millisecond.
+        """
+        if self.worker_id is None:
+            self.worker_id = self._pick_worker_id()
+        now = self._now_ms()
+        if now > self._last_ms:
+            self._last_ms = now
+            self._sequence = 0
+        elif self._sequence > self.MAX_SEQUENCE:
+            self._last_ms += 1
+            self._sequence = 0
+
+        take = min(count, self.MAX_SEQUENCE + 1 - self._sequence)
+        timestamp = self._last_ms << (self.WORKER_BITS + self.SEQUENCE_BITS)
+        first = timestamp | (self.worker_id << self.SEQUENCE_BITS) | self._sequence
+        self._sequence += take
+        return first, take
+
+    def generate_id(self) -> int:
+        """Generate a single id.
+
+        Returns:
+            int: Unique id.
+        """
+        with self._lock:
+            return self._reserve(1)[0]
+
+    def generate_ids(self, count: int) -> list[int]:
+        """Reserve a batch of ids.
+
+        Args:
+            count (int): Number of ids.
+
+        Returns:
+            list[int]: Increasing, unique ids.
+        """
+        ids: list[int] = []
+        with self._lock:
+            while len(ids) < count:
+                first, take = self._reserve(count - len(ids))
+                ids.extend(range(first, first + take))
+        return ids
+
+
+_id_generator: Optional[IdGenerator] = None
+_id_generator_lock = threading.Lock()
+
+
+def _reset_id_generator() -> None:
+    """Make a forked child pick its worker id again instead of repeating ids."""
+    if _id_generator is not None:
+        _id_generator.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_id_generator)
+
+
+def set_worker_id(worker_id: Optional[int]) -> None:
+    """Set the worker id of the ids made by generate_id and generate_ids.
+
+    Args:
+        worker_id (Optional[int]): Id between 0 and 1023 that is unique
+            among the processes writing to the library, None to take it from
+            LIBRARY_WORKER_ID.
+    """
+    global _id_generator
+    with _id_generator_lock:
+        _id_generator = IdGenerator(worker_id) if worker_id is not None else None
+
+
+def _generator() -> IdGenerator:
+    """Shared generator, made the first time ids are needed.
+
+    Returns:
+        IdGenerator: Generator of this process.
+    """
+    global _id_generator
+    generator = _id_generator
+    if generator is None:
+        with _id_generator_lock:
+            if _id_generator is None:
+                _id_generator = IdGenerator()
+            generator = _id_generator
+    return generator
+
 
 def generate_id() -> int:
     """Generate unique id.
@@ -50,7 +263,51 @@ def generate_id() -> int:
     Returns:
         int: Unique id.
     """
-    return int(str(random.randint(1000, 9999)) + str(time.perf_counter_ns()))
+    return (_id_generator or _generator()).generate_id()
+
+
+def generate_ids(count: int) -> list[int]:
+    """Generate a batch of unique ids at once.
+
+    Args:
+        count (int): Number of ids.
+
+    Returns:
+        list[int]: Unique, increasing ids.
+    """
+    return (_id_generator or _generator()).generate_ids(count)
+
+
+def iter_ids(count: int, block_size: int = 4096) -> Iterator[int]:
+    """Generate ids lazily, reserving them in blocks.
+
+    Args:
+        count (int): Number of ids.
+        block_size (int, optional): Ids reserved at a time. Defaults to 4096.
+
+    Yields:
+        Iterator[int]: Unique, increasing ids.
+    """
+    for start in range(0, count, block_size):
+        yield from generate_ids(min(block_size, count - start))
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Split items into lists of at most size items.
+
+    Args:
+        items (Iterable[T]): Items to split.
+        size (int): Maximum length of each list.
+
+    Yields:
+        Iterator[list[T]]: Lists of items.
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
 if __name__ == "__main__":
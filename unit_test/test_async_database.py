@@ -0,0 +1,140 @@
+"""Unittest for the AsyncSQLConnection class."""
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import NoResultFound
+
+from src.data.async_database import AsyncSQLConnection
+from src.entities.book_changes import BookChange
+from src.entities.books import Book
+from src.entities.reservations import Reservation
+from src.entities.users import BorrowedBooks, User
+from src.utils import set_worker_id
+
+
+def setUpModule() -> None:
+    """Give the tests a worker id, as they write to throwaway databases."""
+    set_worker_id(0)
+
+
+def tearDownModule() -> None:
+    """Take the worker id from LIBRARY_WORKER_ID again."""
+    set_worker_id(None)
+
+
+class TestAsyncSQLConnection(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the AsyncSQLConnection class on SQLite."""
+
+    async def asyncSetUp(self) -> None:
+        """Set up the test."""
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "library.db")
+        self.connection = AsyncSQLConnection(
+            "user", "password", url=f"sqlite+aiosqlite:///{path}"
+        )
+        await self.connection.create_database()
+
+    async def asyncTearDown(self) -> None:
+        """Close the database."""
+        await self.connection.close()
+        self.directory.cleanup()
+
+    async def test_add_load_and_remove_book(self) -> None:
+        """Test adding, loading and removing a book."""
+        self.assertTrue(await self.connection.is_table_empty(Book))  # type: ignore
+        await self.connection.add_book("Dune", "Frank Herbert", 1965)
+
+        books = await self.connection.load_books_from_database()
+        self.assertEqual([book.title for book in books], ["Dune"])
+
+        book = await self.connection.get_book(books[0].unique_ISBN)  # type: ignore
+        self.assertEqual(book.author, "Frank Herbert")  # type: ignore
+
+        unique_ISBN = book.unique_ISBN  # type: ignore
+        self.assertTrue(await self.connection.remove_book_by_id(unique_ISBN))
+        with self.assertRaises(NoResultFound):
+            await self.connection.remove_book_by_id(404)
+
+    async def test_writes_are_logged_and_notified(self) -> None:
+        """Test changelog entries and listener events of added books."""
+        events = []
+        self.connection.add_listener(lambda *event: events.append(event))
+        await self.connection.add_book("Dune", "Frank Herbert", 1965)
+        (book,) = await self.connection.load_books_from_database()
+        unique_ISBN = book.unique_ISBN
+        self.assertEqual(
+            [(event, added.title) for event, added in events], [("book_added", "Dune")]
+        )
+
+        self.assertTrue(await self.connection.remove_book_by_id(unique_ISBN))
+        self.assertEqual(events[1], ("book_removed", unique_ISBN))
+        async with self.connection.session_scope() as session:
+            changes = await session.scalars(select(BookChange.unique_ISBN))
+            self.assertEqual(list(changes), [unique_ISBN, unique_ISBN])
+
+    async def test_remove_book_with_loans_and_reservations(self) -> None:
+        """Test that the loans and reservations of a removed book go too."""
+        await self.connection.add_book("Dune", "Frank Herbert", 1965)
+        await self.connection.add_user("Jane Doe", "1 Main St")
+        async with self.connection.session_scope() as session:
+            unique_ISBN = await session.scalar(select(Book.unique_ISBN))
+            user_id = await session.scalar(select(User.user_id))
+            await session.execute(
+                insert(BorrowedBooks).values(user_id=user_id, book_id=unique_ISBN)
+            )
+            session.add(Reservation(unique_ISBN, user_id))
+
+        self.assertTrue(await self.connection.remove_book_by_id(unique_ISBN))
+        async with self.connection.session_scope() as session:
+            for table in (Book, BorrowedBooks, Reservation):
+                count = await session.scalar(select(func.count()).select_from(table))
+                self.assertEqual(count, 0)
+
+    async def test_add_and_remove_user(self) -> None:
+        """Test that a removed user takes their loans along."""
+        await self.connection.add_book("Dune", "Frank Herbert", 1965)
+        await self.connection.add_user("Jane Doe", "1 Main St")
+        async with self.connection.session_scope() as session:
+            unique_ISBN = await session.scalar(select(Book.unique_ISBN))
+            user_id = await session.scalar(select(User.user_id))
+            await session.execute(
+                insert(BorrowedBooks).values(user_id=user_id, book_id=unique_ISBN)
+            )
+
+        self.assertTrue(await self.connection.remove_user_by_id(user_id))
+        async with self.connection.session_scope() as session:
+            for table in (User, BorrowedBooks):
+                count = await session.scalar(select(func.count()).select_from(table))
+                self.assertEqual(count, 0)
+        with self.assertRaises(NoResultFound):
+            await self.connection.remove_user_by_id(user_id)
+
+    async def test_concurrent_search(self) -> None:
+        """Test paged searches running concurrently."""
+        await asyncio.gather(
+            *[
+                self.connection.add_book(f"Book {i}", "Author", 1990 + i % 3)
+                for i in range(30)
+            ]
+        )
+
+        pages = await asyncio.gather(
+            self.connection.search("title", "book 1", limit=5),
+            self.connection.search("year", "1990-1991", limit=100),
+        )
+        (title_page, next_key), (year_page, year_key) = pages
+        self.assertEqual(len(title_page), 5)
+        self.assertIsNotNone(next_key)
+        self.assertEqual(len(year_page), 20)
+        self.assertIsNone(year_key)
+
+        rest, _ = await self.connection.search("title", "book 1", after=next_key)
+        self.assertEqual(len(title_page) + len(rest), 11)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,99 @@
+"""Unittest for the prefix autocomplete."""
+
+import random
+import unittest
+
+from src.data.catalog import CompactCatalog
+from src.entities.books import Book
+from src.entities.users import User
+from src.search.autocomplete import Autocomplete
+
+
+class SmallScanAutocomplete(Autocomplete):
+    """Autocomplete precomputing most prefixes, to test that path."""
+
+    SCAN_LIMIT = 2
+
+
+class TestAutocomplete(unittest.TestCase):
+    """Test cases for Autocomplete."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        titles = [
+            ("Dune", "Frank Herbert"),
+            ("Dune", "Frank Herbert"),
+            ("Dune Messiah", "Frank Herbert"),
+            ("The Hobbit", "J. R. R. Tolkien"),
+            ("The Lord of the Rings", "J. R. R. Tolkien"),
+            ("Emma", "Jane Austen"),
+        ]
+        self.books = [
+            Book(title=title, author=author, release_year=2000, unique_ISBN=i)
+            for i, (title, author) in enumerate(titles, start=1)
+        ]
+
+    def test_ranked_by_popularity(self) -> None:
+        """Test that more popular texts come first, ties alphabetically."""
+        titles = Autocomplete.from_books(self.books, "title")
+        self.assertEqual(titles.complete("du"), ["Dune", "Dune Messiah"])
+        self.assertEqual(
+            titles.complete("THE "), ["The Hobbit", "The Lord of the Rings"]
+        )
+        self.assertEqual(titles.complete("x"), [])
+        self.assertEqual(titles.complete(""), [])
+        self.assertEqual(len(titles), 5)
+
+        # Loans outweigh the extra copy of Dune
+        titles = Autocomplete.from_books(self.books, "title", loans={3: 2})
+        self.assertEqual(titles.complete("dune", 1), ["Dune Messiah"])
+
+        authors = Autocomplete.from_books(self.books, "author")
+        self.assertEqual(authors.complete("j"), ["J. R. R. Tolkien", "Jane Austen"])
+
+    def test_precomputed_prefixes(self) -> None:
+        """Test that precomputed and scanned ranges rank the same way."""
+        generator = random.Random(0)
+        entries = [
+            ("".join(generator.choices("abc", k=generator.randint(1, 6))), w)
+            for w in [generator.randint(1, 5) for _ in range(300)]
+        ]
+        scanned = Autocomplete(entries, max_results=5)
+        precomputed = SmallScanAutocomplete(entries, max_results=5)
+        self.assertTrue(precomputed._top)
+        for prefix in ["a", "b", "ab", "abc", "cab", "ccccc", "d"]:
+            self.assertEqual(
+                precomputed.complete(prefix), scanned.complete(prefix), msg=prefix
+            )
+
+    def test_add(self) -> None:
+        """Test that texts added later are completed."""
+        titles = SmallScanAutocomplete.from_books(self.books, "title")
+        titles.add("Dune Chronicles", 5)
+        titles.add("Dune")
+        self.assertEqual(titles.complete("dune")[:2], ["Dune Chronicles", "Dune"])
+
+    def test_compact_catalog(self) -> None:
+        """Test that reading the columns gives the same completions."""
+        catalog = CompactCatalog.from_books(self.books)
+        catalog.remove(5)
+        catalog.add(
+            Book(  # type: ignore
+                title="The Silmarillion",
+                author="J. R. R. Tolkien",
+                release_year=1977,
+                unique_ISBN=7,
+            )
+        )
+        loans = {1: 1, 7: 3}
+        for attribute in ["title", "author"]:
+            books = list(catalog)
+            expected = Autocomplete.from_books(books, attribute, loans)
+            found = Autocomplete.from_books(catalog, attribute, loans)
+            for prefix in ["d", "the", "j", "f"]:
+                self.assertEqual(found.complete(prefix), expected.complete(prefix))
+        self.assertEqual(found.complete("j")[0], "J. R. R. Tolkien")
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,113 @@
+"""Unittest for the batch search."""
+
+import unittest
+
+from src.data.catalog import CompactCatalog
+from src.entities.books import Book
+from src.lib_system import (
+    AuthorSearchStrategy,
+    ISBNSearchStrategy,
+    LibrarySystem,
+    TitleSearchStrategy,
+)
+from src.search.batch import BatchSearcher
+from src.search.year_index import YearRangeSearchStrategy
+
+
+class TestBatchSearch(unittest.TestCase):
+    """Test cases for BatchSearcher and LibrarySystem.search_batch."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        titles = ["Dune", "Dune Messiah", "Emma", "The Hobbit", "Ulysses", "Ødipus"]
+        authors = ["Frank Herbert", "Frank Herbert", "Jane Austen", "J. R. R. Tolkien"]
+        self.books = [
+            Book(
+                title=title,
+                author=authors[i % len(authors)],
+                release_year=1960 + 5 * i,
+                unique_ISBN=100 + i,
+            )
+            for i, title in enumerate(titles)
+        ]
+        self.books[2].release_year = None
+        self.strategies = {
+            "title": TitleSearchStrategy(),
+            "author": AuthorSearchStrategy(),
+            "isbn": ISBNSearchStrategy(),
+            "year": YearRangeSearchStrategy(),
+        }
+        self.queries = [
+            ("title", "dune"),
+            ("title", "E"),
+            ("title", "ødi"),
+            ("title", "s\x00"),
+            ("title", ""),
+            ("author", "frank"),
+            ("author", "TOLKIEN"),
+            ("author", "nobody"),
+            ("isbn", "103"),
+            ("isbn", "42"),
+            ("isbn", "abc"),
+            ("isbn", "²"),
+            ("isbn", "0103"),
+            ("isbn", "9" * 30),
+            ("year", "1960s"),
+            ("year", ">=1975"),
+            ("year", "1965"),
+        ]
+
+    def expected(self, books: list[Book]) -> dict[tuple[str, str], list[int]]:
+        """Run the queries through the single-query strategies.
+
+        Args:
+            books (list[Book]): Books to search.
+
+        Returns:
+            dict[tuple[str, str], list[int]]: Sorted ISBNs per query.
+        """
+        return {
+            (field, query): sorted(
+                book.unique_ISBN for book in self.strategies[field].search(books, query)
+            )
+            for field, query in self.queries
+        }
+
+    def test_matches_strategies(self) -> None:
+        """Test that the batch finds what the strategies find."""
+        results = BatchSearcher(self.books).search(self.queries)
+        found = {query: sorted(isbns) for query, isbns in results.items()}
+        self.assertEqual(found, self.expected(self.books))
+        self.assertEqual(results[("title", "dune")], [100, 101])
+
+    def test_invalid_queries(self) -> None:
+        """Test unknown fields and invalid year queries."""
+        searcher = BatchSearcher(self.books)
+        self.assertEqual(searcher.search([("year", "soon")]), {("year", "soon"): []})
+        with self.assertRaises(ValueError):
+            searcher.search([("publisher", "Penguin")])
+
+    def test_library_changes(self) -> None:
+        """Test that books changed after building the catalog are searched."""
+        library = LibrarySystem(CompactCatalog.from_books(self.books))  # type: ignore
+        library.search_batch(self.queries)
+
+        library.remove_book(100)
+        library.add_book(
+            Book(title="Dune", author="Brian Herbert", release_year=1999, unique_ISBN=7)
+        )
+        library.add_book(
+            Book(title="Emma", author="Jane Austen", release_year=1815, unique_ISBN=102)
+        )
+        library.loan_book(user_id=1, book_id=104)
+
+        current = list(library.books)  # type: ignore
+        found = {
+            query: sorted(isbns)
+            for query, isbns in library.search_batch(self.queries).items()
+        }
+        self.assertEqual(found, self.expected(current))
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,175 @@
+"""Unittest for the catalog cache."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.data.cache import CachedSearchStrategy, CatalogCache, LRUCache
+from src.data.database import SQLConnection
+from src.entities.books import Book
+from src.search.sql_strategies import SQLTitleSearchStrategy
+from src.utils import set_worker_id
+
+
+def setUpModule() -> None:
+    """Give the tests a worker id, as they write to throwaway databases."""
+    set_worker_id(0)
+
+
+def tearDownModule() -> None:
+    """Take the worker id from LIBRARY_WORKER_ID again."""
+    set_worker_id(None)
+
+
+class TestCatalogCache(unittest.TestCase):
+    """Test cases for LRUCache and CatalogCache."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "library.db")
+        self.connection = SQLConnection(
+            "user", "password", url=f"sqlite:///{path}", echo=False
+        )
+        self.now = 0.0
+        self.cache = CatalogCache(self.connection, ttl=10, clock=lambda: self.now)
+
+    def tearDown(self) -> None:
+        """Close the database."""
+        self.cache.close()
+        self.connection.engine.dispose()
+        self.directory.cleanup()
+
+    def test_lru_eviction_and_expiry(self) -> None:
+        """Test that the least recently used and expired entries go."""
+        cache = LRUCache(max_size=2, ttl=5, clock=lambda: self.now)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+        self.now = 6.0
+        self.assertIsNone(cache.get("a"))
+        stats = cache.stats()
+        self.assertEqual(
+            (stats["hits"], stats["misses"], stats["evictions"]), (2, 2, 1)
+        )
+        self.assertEqual(stats["expirations"], 1)
+
+    def test_get_book_reads_through(self) -> None:
+        """Test that a book is only fetched from the database once."""
+        self.connection.bulk_insert(
+            [{"title": "Dune", "author": "Frank Herbert", "release_year": 1965}],
+            Book,
+        )
+        unique_ISBN = self.connection.load_books_from_database()[0].unique_ISBN
+        self.cache.books.clear()
+
+        self.assertEqual(self.cache.get_book(unique_ISBN).title, "Dune")
+        self.assertEqual(self.cache.get_book(unique_ISBN).title, "Dune")
+        self.assertIsNone(self.cache.get_book(404))
+        stats = self.cache.stats()["books"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_writes_patch_the_cache(self) -> None:
+        """Test that added and removed books show up without a reload."""
+        self.connection.add_book("Dune", "Frank Herbert", 1965)
+        self.assertEqual(len(self.cache.load_books_from_database()), 1)
+
+        self.connection.add_book("Emma", "Jane Austen", 1815)
+        books = self.cache.load_books_from_database()
+        self.assertEqual(sorted(book.title for book in books), ["Dune", "Emma"])
+        self.assertEqual(self.cache.stats()["catalog"]["misses"], 1)
+
+        emma = [book for book in books if book.title == "Emma"][0]
+        self.assertTrue(self.connection.remove_book_by_id(emma.unique_ISBN))
+        self.assertEqual(len(self.cache.load_books_from_database()), 1)
+        self.assertIsNone(self.cache.get_book(emma.unique_ISBN))
+
+    def test_changes_patch_the_catalog_once(self) -> None:
+        """Test that a batch of changes rebuilds the cached catalog once."""
+        for title in ("Dune", "Emma", "Ulysses"):
+            self.connection.add_book(title, "A", 2000)
+        books = {book.title: book for book in self.cache.load_books_from_database()}
+        books["Dune"].title = "Dune Messiah"
+
+        with mock.patch.object(
+            self.cache.catalog, "put", wraps=self.cache.catalog.put
+        ) as put:
+            self.cache.apply_changes([books["Dune"]], [books["Emma"].unique_ISBN])
+        self.assertEqual(put.call_count, 1)
+        self.assertEqual(
+            sorted(book.title for book in self.cache.load_books_from_database()),
+            ["Dune Messiah", "Ulysses"],
+        )
+        self.assertIsNone(self.cache.books.get(books["Emma"].unique_ISBN))
+        self.assertEqual(self.cache.stats()["catalog"]["misses"], 1)
+
+    def test_uploads_invalidate_the_cache(self) -> None:
+        """Test that books uploaded in ORM mode show up without a reload."""
+        strategy = CachedSearchStrategy(
+            SQLTitleSearchStrategy(self.connection.Session), self.cache
+        )
+        self.connection.add_book("Dune", "Frank Herbert", 1965)
+        self.assertEqual(len(self.cache.load_books_from_database()), 1)
+        self.assertEqual(len(list(strategy.search([], "dune"))), 1)
+
+        records = [
+            {
+                "title": f"Dune {i}",
+                "author": "Brian Herbert",
+                "release_year": 2000,
+                "unique_ISBN": i,
+            }
+            for i in range(1, 4)
+        ]
+        self.connection.upload_data_in_chunks(records, 2, Book)
+        self.assertEqual(len(self.cache.load_books_from_database()), 4)
+        self.assertEqual(len(list(strategy.search([], "dune"))), 4)
+
+    def test_search_results_are_cached_and_invalidated(self) -> None:
+        """Test that search pages are reused until a book is written."""
+        strategy = CachedSearchStrategy(
+            SQLTitleSearchStrategy(self.connection.Session, page_size=1), self.cache
+        )
+        self.connection.add_book("Dune", "Frank Herbert", 1965)
+
+        self.assertEqual(len(list(strategy.search([], "dune"))), 1)
+        self.assertEqual(len(list(strategy.search([], "dune"))), 1)
+        self.assertEqual(self.cache.stats()["searches"]["hits"], 2)
+
+        self.connection.add_book("Dune Messiah", "Frank Herbert", 1969)
+        self.assertEqual(len(list(strategy.search([], "dune"))), 2)
+
+        self.now = 11.0
+        self.assertEqual(len(list(strategy.search([], "dune"))), 2)
+        # Both pages and the empty last page had expired
+        self.assertEqual(self.cache.stats()["searches"]["expirations"], 3)
+
+    def test_page_read_before_a_write_is_not_cached(self) -> None:
+        """Test that a page fetched while a book is written is dropped."""
+        strategy = SQLTitleSearchStrategy(self.connection.Session, page_size=5)
+        self.connection.add_book("Dune", "Frank Herbert", 1965)
+        fetch_page = strategy.fetch_page
+
+        def fetch_then_write(*args: object) -> tuple:
+            page = fetch_page(*args)  # type: ignore
+            # Another thread writes before the stale page is stored
+            self.connection.add_book("Dune Messiah", "Frank Herbert", 1969)
+            return page
+
+        with mock.patch.object(strategy, "fetch_page", fetch_then_write):
+            books, _ = self.cache.fetch_page(strategy, "dune")
+        self.assertEqual(len(books), 1)
+        self.assertEqual(len(self.cache.searches), 0)
+
+        books, _ = self.cache.fetch_page(strategy, "dune")
+        self.assertEqual(len(books), 2)
+        self.assertEqual(len(self.cache.searches), 1)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,116 @@
+"""Unittest for the compact catalog."""
+
+import unittest
+from unittest import mock
+
+from src.data.catalog import BookView, CompactCatalog
+from src.entities.books import Book
+from src.lib_system import LibrarySystem
+from src.search.fuzzy import FuzzyAuthorSearchStrategy
+from src.search.text_index import IndexedTitleSearchStrategy
+from src.search.year_index import YearRangeSearchStrategy
+
+
+class TestCompactCatalog(unittest.TestCase):
+    """Test cases for CompactCatalog and LibrarySystem on top of it."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        self.books = [
+            Book(
+                title=f"Bøg {i}",
+                author=f"Author {i % 2}",
+                release_year=2000 + i,
+                unique_ISBN=10 - i,
+            )
+            for i in range(1, 6)
+        ]
+        self.books[4].release_year = None
+        self.catalog = CompactCatalog.from_books(self.books)
+
+    def test_views(self) -> None:
+        """Test that views read the same values as the books."""
+        views = list(self.catalog)
+        self.assertEqual(len(self.catalog), 5)
+        self.assertTrue(all(isinstance(view, BookView) for view in views))
+        for book, view in zip(self.books, views):
+            self.assertEqual(view.title, book.title)
+            self.assertEqual(view.author, book.author)
+            self.assertEqual(view.release_year, book.release_year)
+            self.assertEqual(view.unique_ISBN, book.unique_ISBN)
+            self.assertIsNone(view.reserved_by)
+        self.assertEqual(self.catalog.authors, ["Author 1", "Author 0"])
+
+    def test_get_add_and_remove(self) -> None:
+        """Test the overlay of materialized, added and removed books."""
+        book = self.catalog.get(8)
+        self.assertIsInstance(book, Book)
+        book.reserve_book(1)  # type: ignore
+        self.assertIs(self.catalog.get(8), book)
+        self.assertFalse(list(self.catalog)[1].available)
+        self.assertIsNone(self.catalog.get(42))
+
+        new_book = Book("New", "Jane Doe", 2024, 42)
+        self.catalog.add(new_book)
+        self.assertIs(self.catalog.get(42), new_book)
+        self.assertEqual(len(self.catalog), 6)
+
+        self.assertEqual(self.catalog.remove(9).title, "Bøg 1")  # type: ignore
+        self.assertIsNone(self.catalog.get(9))
+        self.assertIs(self.catalog.remove(42), new_book)
+        self.assertEqual([book.unique_ISBN for book in self.catalog], [8, 7, 6, 5])
+
+    def test_library_system(self) -> None:
+        """Test that LibrarySystem searches and changes a compact catalog."""
+        library = LibrarySystem(self.catalog)  # type: ignore
+        library.search_strategy = IndexedTitleSearchStrategy()
+        self.assertEqual(len(list(library.search_books("bøg"))), 5)
+
+        library.loan_book(user_id=3, book_id=7)
+        self.assertEqual(library.get_book(7).reserved_by, 3)  # type: ignore
+
+        library.add_book(Book("Bøg 6", "Author 0", 2006, 4))  # type: ignore
+        library.remove_book(6)
+        titles = [book.title for book in library.search_books("bøg")]
+        self.assertEqual(sorted(titles), ["Bøg 1", "Bøg 2", "Bøg 3", "Bøg 5", "Bøg 6"])
+
+    def test_indexes_read_the_columns(self) -> None:
+        """Test that the indexes are built without a view per book."""
+        self.catalog.get(8).reserve_book(1)  # type: ignore
+        self.catalog.add(Book("Bøg 6", "Author 0", 2001, 4))
+        strategies = [
+            IndexedTitleSearchStrategy(),
+            YearRangeSearchStrategy(),
+            FuzzyAuthorSearchStrategy(),
+        ]
+        with mock.patch("src.data.catalog.BookView", wraps=BookView) as views:
+            for strategy in strategies:
+                strategy.ensure_index(self.catalog)  # type: ignore
+        self.assertEqual(views.call_count, 0)
+
+        titles, years, fuzzy = strategies
+        found = [book.unique_ISBN for book in titles.search(self.catalog, "bøg")]
+        self.assertEqual(sorted(found), [4, 5, 6, 7, 8, 9])
+        found = [book.unique_ISBN for book in years.search(self.catalog, "2001-2003")]
+        self.assertEqual(found, [9, 4, 8, 7])
+        self.assertFalse(self.catalog.get(8).available)  # type: ignore
+        self.assertEqual(len(fuzzy.index), 6)
+
+        library = LibrarySystem(self.catalog)  # type: ignore
+        for strategy in strategies:
+            library.search_strategy = strategy
+        library.remove_book(9)
+        library.add_book(Book("Bøg 7", "Author 1", 2003, 3))  # type: ignore
+        library.remove_book(7)
+        for strategy in strategies:
+            strategy.index.compact()
+        found = [book.unique_ISBN for book in titles.search(self.catalog, "bøg")]
+        self.assertEqual(sorted(found), [3, 4, 5, 6, 8])
+        found = [book.unique_ISBN for book in years.search(self.catalog, "2001-2003")]
+        self.assertEqual(found, [4, 8, 3])
+        found = [book.unique_ISBN for _, book in fuzzy.ranked(self.catalog, "Author")]
+        self.assertEqual(sorted(found), [3, 4, 5, 6, 8])
+
+
+if __name__ == "__main__":
+    pass
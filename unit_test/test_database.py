@@ -0,0 +1,377 @@
+"""Unittest for the SQLConnection class."""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from sqlalchemy import event
+from sqlalchemy.exc import NoResultFound
+
+from src.data.database import CONFLICT, DONE, NOT_FOUND, QUEUED, SQLConnection
+from src.entities.book_changes import BookChange
+from src.entities.books import Book
+from src.entities.users import BorrowedBooks, User
+from src.utils import set_worker_id
+
+
+def setUpModule() -> None:
+    """Give the tests a worker id, as they write to throwaway databases."""
+    set_worker_id(0)
+
+
+def tearDownModule() -> None:
+    """Take the worker id from LIBRARY_WORKER_ID again."""
+    set_worker_id(None)
+
+
+class TestSQLConnection(unittest.TestCase):
+    """Test cases for the SQLConnection class on SQLite."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "library.db")
+        self.connection = SQLConnection(
+            "user", "password", url=f"sqlite:///{path}", echo=False
+        )
+
+    def tearDown(self) -> None:
+        """Close the database."""
+        self.connection.engine.dispose()
+        self.directory.cleanup()
+
+    def test_add_and_remove_book(self) -> None:
+        """Test adding, loading and removing a book."""
+        self.connection.add_book("Dune", "Frank Herbert", 1965)
+        books = self.connection.load_books_from_database()
+        self.assertEqual([book.title for book in books], ["Dune"])
+
+        # Books stay readable after their session is closed
+        book = self.connection.get_book(books[0].unique_ISBN)  # type: ignore
+        self.assertEqual(book.author, "Frank Herbert")  # type: ignore
+
+        unique_ISBN = book.unique_ISBN  # type: ignore
+        self.assertTrue(self.connection.remove_book_by_id(unique_ISBN))
+        self.assertTrue(self.connection.is_table_empty(Book))  # type: ignore
+
+    def test_failed_operation_does_not_poison_later_ones(self) -> None:
+        """Test that every operation gets a fresh session."""
+        with self.assertRaises(NoResultFound):
+            self.connection.remove_user_by_id(404)
+
+        self.connection.add_user("Jane Doe", "1 Main St")
+        with self.connection.session_scope() as session:
+            self.assertEqual(session.query(User).count(), 1)
+
+    def test_bulk_insert(self) -> None:
+        """Test the Core insert path in all its modes."""
+        records = [
+            {
+                "title": f"Book {i}",
+                "author": "Author",
+                "release_year": 2000,
+                "unique_ISBN": i,
+            }
+            for i in range(1, 101)
+        ]
+        inserted = self.connection.bulk_insert(records[:40], Book, batch_size=7)
+        self.assertEqual(inserted, 40)
+        self.connection.bulk_insert(
+            records[40:70], Book, batch_size=7, commit_every=2, multi_row=True
+        )
+        self.connection.upload_data_in_chunks(records[70:], 8, Book, mode="core")
+
+        books = self.connection.load_books_from_database()
+        self.assertEqual(len(books), 100)
+        self.assertTrue(all(book.available for book in books))
+
+    def test_bulk_insert_single_transaction_rolls_back(self) -> None:
+        """Test that a failing batch undoes the whole single-transaction load."""
+        records = [
+            {"title": "Book", "author": "A", "release_year": 2000, "unique_ISBN": i}
+            for i in [1, 2, 3, 3]
+        ]
+        events: list[str] = []
+        self.connection.add_listener(lambda event, payload: events.append(event))
+        with self.assertRaises(Exception):
+            self.connection.bulk_insert(records, Book, batch_size=2)
+        self.assertTrue(self.connection.is_table_empty(Book))  # type: ignore
+        self.assertEqual(events, [])
+
+        # Batches committed before the failure are reported
+        with self.assertRaises(Exception):
+            self.connection.bulk_insert(records, Book, batch_size=2, commit_every=1)
+        self.assertEqual(events, ["books_inserted"])
+
+    def test_bulk_insert_skip_existing_logs_new_books(self) -> None:
+        """Test that only the books actually inserted are logged as changes."""
+        records = [
+            {"title": "Book", "author": "A", "release_year": 2000, "unique_ISBN": i}
+            for i in [1, 2, 3, 3, 4]
+        ]
+        self.connection.bulk_insert(records[:2], Book)
+        inserted = self.connection.bulk_insert(
+            records, Book, batch_size=3, skip_existing=True
+        )
+        self.assertEqual(inserted, 2)
+        with self.connection.session_scope() as session:
+            logged = [change.unique_ISBN for change in session.query(BookChange)]
+        self.assertEqual(logged, [1, 2, 3, 4])
+
+    def test_concurrent_writes(self) -> None:
+        """Test adding books from several threads at once."""
+
+        def add_books(worker: int) -> None:
+            for i in range(10):
+                self.connection.add_book(f"Book {worker}-{i}", "Author", 2000)
+
+        threads = [threading.Thread(target=add_books, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.connection.load_books_from_database()), 40)
+
+    def test_load_changes(self) -> None:
+        """Test that only books changed after the watermark are fetched."""
+        self.connection.bulk_insert(
+            [
+                {"title": "Dune", "author": "A", "release_year": 1965},
+                {"title": "Emma", "author": "B", "release_year": 1815},
+            ],
+            Book,
+        )
+        loaded = self.connection.load_books_from_database()
+        books = {book.title: book for book in loaded}
+        watermark = self.connection.change_watermark()
+        self.assertEqual(self.connection.load_changes(watermark), ([], [], watermark))
+
+        self.connection.add_book("Ulysses", "C", 1922)
+        self.connection.remove_book_by_id(books["Emma"].unique_ISBN)  # type: ignore
+        changed, removed, new_watermark = self.connection.load_changes(watermark)
+        self.assertEqual([book.title for book in changed], ["Ulysses"])
+        self.assertEqual(removed, [books["Emma"].unique_ISBN])
+        self.assertEqual(new_watermark.position, watermark.position + 2)
+
+        self.assertEqual(self.connection.prune_changes(new_watermark), 4)
+        self.assertEqual(self.connection.load_changes(new_watermark)[0], [])
+
+    def test_orm_upload_is_logged(self) -> None:
+        """Test that books uploaded through the ORM are fetched as changes."""
+        watermark = self.connection.change_watermark()
+        records = [
+            {
+                "title": f"Book {i}",
+                "author": "A",
+                "release_year": 2000,
+                "unique_ISBN": i,
+            }
+            for i in range(1, 6)
+        ]
+        self.connection.upload_data_in_chunks(records, 2, Book)
+        changed, removed, _ = self.connection.load_changes(watermark)
+        self.assertEqual(sorted(book.unique_ISBN for book in changed), [1, 2, 3, 4, 5])
+        self.assertEqual(removed, [])
+
+    def test_changes_committed_out_of_order(self) -> None:
+        """Test that a change committed after a higher change id is fetched."""
+        self.connection.add_book("Dune", "A", 1965)
+        watermark = self.connection.change_watermark()
+        low = watermark.position + 1
+
+        def commit(unique_ISBN: int, change_id: int) -> None:
+            with self.connection.session_scope() as session:
+                session.add(Book("Book", "B", 2000, unique_ISBN))
+                change = BookChange(unique_ISBN)
+                change.change_id = change_id  # type: ignore
+                session.add(change)
+
+        # MySQL hands out ids on insert, so the transaction given the lower
+        # id can commit after the one given the higher id
+        commit(12, low + 1)
+        changed, _, watermark = self.connection.load_changes(watermark)
+        self.assertEqual([book.unique_ISBN for book in changed], [12])
+        self.assertEqual(watermark.position, low + 1)
+        self.assertEqual([gap[:2] for gap in watermark.gaps], [(low, low)])
+        # Entries in the gap are kept when pruning
+        self.assertEqual(self.connection.prune_changes(watermark), 1)
+
+        commit(11, low)
+        changed, _, watermark = self.connection.load_changes(watermark)
+        self.assertEqual([book.unique_ISBN for book in changed], [11])
+        self.assertEqual(watermark.gaps, ())
+        self.assertEqual(self.connection.load_changes(watermark)[0], [])
+
+        # Ids that never commit are given up after the timeout
+        self.connection.gap_timeout = 0
+        commit(14, low + 3)
+        _, _, watermark = self.connection.load_changes(watermark)
+        self.assertEqual(len(watermark.gaps), 1)
+        _, _, watermark = self.connection.load_changes(watermark)
+        self.assertEqual(watermark.gaps, ())
+
+    def test_loan_counts(self) -> None:
+        """Test counting the borrowers of each book."""
+        self.connection.bulk_insert(
+            [
+                {"title": title, "author": "A", "release_year": 2000, "unique_ISBN": i}
+                for i, title in enumerate(["Dune", "Emma"], start=1)
+            ],
+            Book,
+        )
+        with self.connection.session_scope() as session:
+            session.add_all([User("Ann", 10, "A St"), User("Bob", 11, "B St")])
+            session.flush()
+            session.add_all(
+                [
+                    BorrowedBooks(user_id=10, book_id=1),
+                    BorrowedBooks(user_id=11, book_id=1),
+                ]
+            )
+        self.assertEqual(self.connection.loan_counts(), {1: 2})
+
+    def test_users_with_loans_query_count(self) -> None:
+        """Test that 10k users and their loans load in a few queries."""
+        self.connection.bulk_insert(
+            (
+                {"title": f"T{i}", "author": "A", "release_year": 1, "unique_ISBN": i}
+                for i in range(1, 1001)
+            ),
+            Book,  # type: ignore
+        )
+        self.connection.bulk_insert(
+            (
+                {"user_id": i, "name": f"User {i}", "address": "Main St"}
+                for i in range(1, 10_001)
+            ),
+            User,  # type: ignore
+        )
+        self.connection.bulk_insert(
+            (
+                {"user_id": i, "book_id": 1 + (i + j) % 1000}
+                for i in range(1, 10_001)
+                for j in range(i % 3)
+            ),
+            BorrowedBooks,  # type: ignore
+        )
+        statements: list[str] = []
+
+        def count(*args: object) -> None:
+            statements.append(str(args[2]))
+
+        event.listen(self.connection.engine, "before_cursor_execute", count)
+        expected = {"joined": 1, "subquery": 2, "selectin": 1 + 10_000 // 500}
+        for strategy, queries in expected.items():
+            statements.clear()
+            users = self.connection.users_with_loans(strategy)
+            self.assertEqual(len(statements), queries, strategy)
+            self.assertEqual(len(users), 10_000)
+            # The loans are loaded, walking them sends no more queries
+            loans = sum(len(user.borrowed_books) for user in users)
+            self.assertEqual(loans, 10_000)
+            self.assertEqual(len(statements), queries, strategy)
+
+        statements.clear()
+        books = self.connection.books_with_borrowers("subquery")
+        self.assertEqual(len(statements), 2)
+        self.assertEqual(sum(len(book.borrowers) for book in books), loans)
+        borrowers = self.connection.users_with_loans(borrowers_only=True)
+        self.assertEqual(len(borrowers), 6_667)
+        event.remove(self.connection.engine, "before_cursor_execute", count)
+
+        with self.assertRaises(ValueError):
+            self.connection.users_with_loans("lazy")
+
+    def test_loan_return_reserve(self) -> None:
+        """Test the outcomes of the transactional loans and reservations."""
+        self.connection.bulk_insert(
+            [
+                {"title": title, "author": "A", "release_year": 2000, "unique_ISBN": i}
+                for i, title in enumerate(["Dune", "Emma"], start=1)
+            ],
+            Book,
+        )
+        events = []
+        self.connection.add_listener(lambda event, book: events.append(event))
+
+        status, book = self.connection.loan_book(10, 1)
+        self.assertEqual((status, book.available, book.reserved_by), (DONE, False, 10))
+        self.assertEqual(self.connection.loan_book(11, 1)[0], CONFLICT)
+        self.assertEqual(self.connection.loan_book(10, 1)[0], CONFLICT)
+        self.assertEqual(self.connection.loan_book(10, 404), (NOT_FOUND, None))
+        self.assertEqual(self.connection.return_book(11, 1)[0], CONFLICT)
+        self.assertEqual(self.connection.loan_counts(), {1: 1})
+
+        status, book = self.connection.return_book(10, 1)
+        self.assertEqual((status, book.available, book.reserved_by), (DONE, True, None))
+        self.assertEqual(self.connection.loan_counts(), {})
+
+        # A reserved book can only be loaned by the user holding it
+        self.assertEqual(self.connection.reserve_book(11, 2)[0], DONE)
+        self.assertEqual(self.connection.reserve_book(11, 2)[0], CONFLICT)
+        self.assertEqual(self.connection.loan_book(10, 2)[0], CONFLICT)
+        self.assertEqual(self.connection.loan_book(11, 2)[0], DONE)
+
+        self.assertEqual(events, ["book_updated"] * 4)
+        changed, _, _ = self.connection.load_changes(0)
+        self.assertEqual(sorted(book.unique_ISBN for book in changed), [1, 2])
+
+    def test_concurrent_loans(self) -> None:
+        """Test that exactly one of many desks loaning a book at once wins."""
+        self.connection.add_book("Dune", "Frank Herbert", 1965)
+        unique_ISBN = self.connection.load_books_from_database()[0].unique_ISBN
+        barrier = threading.Barrier(8)
+        outcomes = []
+
+        def loan(user_id: int) -> None:
+            barrier.wait()
+            outcomes.append(self.connection.loan_book(user_id, unique_ISBN)[0])
+
+        threads = [threading.Thread(target=loan, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), [CONFLICT] * 7 + [DONE])
+        self.assertEqual(self.connection.loan_counts(), {unique_ISBN: 1})
+
+    def test_reservation_queue(self) -> None:
+        """Test that returns hand the book to the waiting users in order."""
+        self.connection.add_book("Dune", "Frank Herbert", 1965)
+        unique_ISBN = self.connection.load_books_from_database()[0].unique_ISBN
+        ready = []
+        self.connection.add_listener(
+            lambda event, book: event == "reservation_ready"
+            and ready.append(book.reserved_by)
+        )
+
+        self.assertEqual(self.connection.loan_book(1, unique_ISBN)[0], DONE)
+        for user_id in [2, 3, 4]:
+            status, _ = self.connection.reserve_book(user_id, unique_ISBN)
+            self.assertEqual(status, QUEUED)
+        self.assertEqual(self.connection.reserve_book(3, unique_ISBN)[0], CONFLICT)
+        self.assertEqual(self.connection.reserve_book(1, unique_ISBN)[0], CONFLICT)
+        self.assertTrue(self.connection.cancel_reservation(3, unique_ISBN))
+        self.assertFalse(self.connection.cancel_reservation(3, unique_ISBN))
+        self.assertEqual(self.connection.reservation_queue(unique_ISBN), [2, 4])
+
+        # The book is held for user 2, who can loan it, and nobody else
+        status, book = self.connection.return_book(1, unique_ISBN)
+        self.assertEqual((status, book.available, book.reserved_by), (DONE, False, 2))
+        self.assertEqual(ready, [2])
+        self.assertEqual(self.connection.loan_book(4, unique_ISBN)[0], CONFLICT)
+        self.assertEqual(self.connection.loan_book(2, unique_ISBN)[0], DONE)
+
+        self.connection.return_book(2, unique_ISBN)
+        self.assertEqual(ready, [2, 4])
+        self.assertEqual(self.connection.reservation_queue(unique_ISBN), [])
+        self.assertEqual(self.connection.reserve_book(5, unique_ISBN)[0], QUEUED)
+        self.assertTrue(self.connection.remove_book_by_id(unique_ISBN))
+        self.assertEqual(self.connection.reservation_queue(unique_ISBN), [])
+
+
+if __name__ == "__main__":
+    pass
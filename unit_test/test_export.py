@@ -0,0 +1,142 @@
+"""Unittest for the streaming export."""
+
+import csv
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import event, select
+
+from src.data import export
+from src.data.database import SQLConnection
+from src.data.export import export_all, export_table
+from src.entities.books import Book
+from src.entities.users import BorrowedBooks, User
+
+
+class TestExport(unittest.TestCase):
+    """Test cases for export_table and export_all."""
+
+    def setUp(self) -> None:
+        """Set up a database with books, users and a few loans."""
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "library.db")
+        self.connection = SQLConnection("user", "password", url=f"sqlite:///{path}")
+        self.connection.bulk_insert(
+            (
+                {
+                    "title": f"Title, {i}",
+                    "author": f"Author {i % 3}",
+                    "release_year": 2000 + i,
+                    "unique_ISBN": i,
+                }
+                for i in range(1, 26)
+            ),
+            Book,  # type: ignore
+        )
+        self.connection.bulk_insert(
+            (
+                {"user_id": i, "name": f"User {i}", "address": "Main St"}
+                for i in range(1, 4)
+            ),
+            User,  # type: ignore
+        )
+        for unique_ISBN in (2, 4, 6):
+            self.connection.loan_book(1, unique_ISBN)
+        self.connection.return_book(1, 4)
+
+    def tearDown(self) -> None:
+        """Close the database."""
+        self.connection.engine.dispose()
+        self.directory.cleanup()
+
+    def path(self, name: str) -> str:
+        """Path of an exported file.
+
+        Args:
+            name (str): File name.
+
+        Returns:
+            str: Path in the temporary directory.
+        """
+        return os.path.join(self.directory.name, name)
+
+    def test_csv_in_chunks(self) -> None:
+        """Test that a table is written to CSV a chunk at a time."""
+        stats = export_table(
+            self.connection, "books", self.path("books.csv"), batch_size=10
+        )
+        self.assertEqual((stats.rows, stats.chunks), (25, 3))
+        self.assertGreater(stats.bytes, 0)
+        with open(stats.path, newline="", encoding="utf-8") as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0][:3], ["unique_ISBN", "title", "author"])
+        self.assertEqual(rows[1][:4], ["1", "Title, 1", "Author 1", "2001"])
+        self.assertEqual(len(rows), 26)
+
+    def test_all_tables(self) -> None:
+        """Test that every table is exported to a file of its own."""
+        output = self.path("export")
+        stats = {item.table: item.rows for item in export_all(self.connection, output)}
+        self.assertEqual(
+            stats, {"books": 25, "users": 3, "loans": 2, "loan_history": 4}
+        )
+        with open(os.path.join(output, "loans.csv"), encoding="utf-8") as file:
+            self.assertEqual(file.read().split(), ["user_id,book_id", "1,2", "1,6"])
+
+    def test_pages_by_key(self) -> None:
+        """Test that chunks are limited queries starting after the last key."""
+        self.connection.loan_book(2, 8)
+        statements = []
+        event.listen(
+            self.connection.engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        chunks = list(
+            self.connection.stream_rows(
+                select(BorrowedBooks.book_id, BorrowedBooks.user_id),
+                [BorrowedBooks.user_id, BorrowedBooks.book_id],
+                batch_size=2,
+            )
+        )
+        self.assertEqual(
+            [[tuple(row) for row in chunk] for chunk in chunks],
+            [[(2, 1), (6, 1)], [(8, 2)]],
+        )
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(all("LIMIT" in statement for statement in statements))
+        self.assertEqual(len(list(self.connection.load_book_rows(batch_size=5))), 25)
+
+    @unittest.skipIf(export.pa is None, "pyarrow is not installed")
+    def test_parquet(self) -> None:
+        """Test that each chunk becomes a row group with the column types."""
+        stats = export_table(
+            self.connection,
+            "loan_history",
+            self.path("history.parquet"),
+            batch_size=3,
+        )
+        table = export.pq.read_table(stats.path)
+        self.assertEqual(export.pq.ParquetFile(stats.path).num_row_groups, 2)
+        self.assertEqual(table.column("action").to_pylist(), ["loan"] * 3 + ["return"])
+        self.assertEqual(str(table.schema.field("created_at").type), "timestamp[us]")
+
+        # Chunks of books all without a reserving user keep the column type
+        stats = export_table(
+            self.connection, "books", self.path("books.parquet"), batch_size=5
+        )
+        table = export.pq.read_table(stats.path)
+        self.assertEqual(table.column("reserved_by").null_count, 23)
+        self.assertEqual(str(table.schema.field("reserved_by").type), "int64")
+
+    def test_unknown(self) -> None:
+        """Test that unknown tables and formats are refused."""
+        with self.assertRaises(ValueError):
+            export_table(self.connection, "fines", self.path("fines.csv"))
+        with self.assertRaises(ValueError):
+            export_table(self.connection, "books", self.path("books.xlsx"))
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,146 @@
+"""Unittest for the fuzzy, ranked search."""
+
+import unittest
+
+import numpy as np
+
+from src.data.catalog import CompactCatalog
+from src.entities.books import Book
+from src.entities.users import User
+from src.lib_system import LibrarySystem
+from src.search.fuzzy import (
+    FuzzyAuthorSearchStrategy,
+    FuzzyTitleSearchStrategy,
+    TrigramIndex,
+    trigram_keys,
+)
+
+
+class TestFuzzySearch(unittest.TestCase):
+    """Test cases for the trigram index and the fuzzy search strategies."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        titles = [
+            ("The Hobbit", "J. R. R. Tolkien"),
+            ("The Lord of the Rings", "J. R. R. Tolkien"),
+            ("Dune", "Frank Herbert"),
+            ("Children of Dune", "Frank Herbert"),
+            ("Dune", "Brian Herbert"),
+            ("Emma", "Jane Austen"),
+        ]
+        self.books = [
+            Book(title=title, author=author, release_year=2000, unique_ISBN=i)
+            for i, (title, author) in enumerate(titles, start=1)
+        ]
+        self.library = LibrarySystem(self.books)  # type: ignore
+
+    def isbns(self, books: list) -> list[int]:
+        """List the ISBNs of books.
+
+        Args:
+            books (list): Books.
+
+        Returns:
+            list[int]: ISBNs, in order.
+        """
+        return [book.unique_ISBN for book in books]
+
+    def test_trigram_keys(self) -> None:
+        """Test that words are padded and split into trigrams."""
+        keys, word_of = trigram_keys(["ab", "c"])
+        # "  ab " gives "  a", " ab", "ab " and "  c " gives "  c", " c "
+        self.assertEqual(len(keys), 5)
+        self.assertEqual(word_of.tolist(), [0, 0, 0, 1, 1])
+        self.assertEqual(len(np.unique(keys)), 5)
+        self.assertEqual(len(trigram_keys([])[0]), 0)
+
+    def test_misspelled_title(self) -> None:
+        """Test that misspelled queries find the book, best match first."""
+        strategy = FuzzyTitleSearchStrategy()
+        found = list(strategy.search(self.books, "The Hobbti"))  # type: ignore
+        self.assertEqual(found[0].unique_ISBN, 1)
+
+        ranked = strategy.ranked(self.books, "Lord of the Rigns")  # type: ignore
+        self.assertEqual(ranked[0][1].unique_ISBN, 2)
+        scores = [score for score, _ in ranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(0 < score <= 1 for score in scores))
+
+    def test_exact_match_scores_one(self) -> None:
+        """Test that books with the same text share the top score."""
+        ranked = FuzzyTitleSearchStrategy().ranked(self.books, "dune")  # type: ignore
+        self.assertEqual(sorted(self.isbns([book for _, book in ranked[:2]])), [3, 5])
+        self.assertEqual([score for score, _ in ranked[:2]], [1.0, 1.0])
+
+    def test_author_top_k_and_min_score(self) -> None:
+        """Test the number of results and the score threshold."""
+        strategy = FuzzyAuthorSearchStrategy(top_k=1)
+        found = list(strategy.search(self.books, "Frnak Herbert"))  # type: ignore
+        self.assertEqual(self.isbns(found), [3])
+
+        strategy = FuzzyAuthorSearchStrategy(min_score=0.9)
+        for query in ["Herbret", ""]:
+            found = list(strategy.search(self.books, query))  # type: ignore
+            self.assertEqual(found, [], msg=query)
+
+    def test_index_follows_library_changes(self) -> None:
+        """Test that added and removed books are reflected in the index."""
+        self.library.search_strategy = FuzzyTitleSearchStrategy()
+        self.assertEqual(
+            sorted(self.isbns(self.library.search_books("Dunne"))[:2]), [3, 5]
+        )
+
+        self.library.add_book(
+            Book(  # type: ignore
+                title="Dune Messiah",
+                author="Frank Herbert",
+                release_year=1969,
+                unique_ISBN=7,
+            )
+        )
+        self.library.remove_book(3)
+
+        found = self.isbns(self.library.search_books("Dune Mesiah"))
+        self.assertEqual(found[0], 7)
+        self.assertNotIn(3, found)
+
+    def test_segments_are_merged(self) -> None:
+        """Test that many small flushes keep the same results."""
+        index = TrigramIndex("title")
+        index.build([])
+        for book in self.books:
+            index.add(book)
+            index.flush()
+        self.assertLess(len(index._segments), len(self.books))
+        self.assertEqual(index.top("The Hobit", 1)[0][1].unique_ISBN, 1)
+
+    def test_updates_do_not_grow_the_index(self) -> None:
+        """Test that replaced books are compacted away."""
+        index = TrigramIndex("title")
+        index.COMPACT_MIN = 8
+        index.build(self.books)  # type: ignore
+        for _ in range(100):
+            for book in self.books:
+                index.add(book)  # type: ignore
+        self.assertLessEqual(len(index._books), 2 * 8 + len(self.books))
+        self.assertEqual(len(index._doc_values), len(index._books))
+        self.assertEqual(len(index), len(self.books))
+        found = [book.unique_ISBN for _, book in index.top("Dune", 3)]
+        self.assertEqual(sorted(found[:2]), [3, 5])
+
+        index.compact()
+        self.assertEqual(len(index._books), len(self.books))
+        self.assertEqual(index.top("The Hobit", 1)[0][1].unique_ISBN, 1)
+
+    def test_compact_catalog(self) -> None:
+        """Test searching a CompactCatalog."""
+        catalog = CompactCatalog.from_books(self.books)
+        found = list(
+            FuzzyAuthorSearchStrategy().search(catalog, "Tolkein")  # type: ignore
+        )
+        self.assertEqual(sorted(self.isbns(found[:2])), [1, 2])
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,82 @@
+"""Unittest for the fake data generator."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.data.generator import generate_fake_data_parallel, main
+from src.utils import generate_id, set_worker_id
+
+
+def setUpModule() -> None:
+    """Give the tests a worker id, as they write to throwaway databases."""
+    set_worker_id(0)
+
+
+def tearDownModule() -> None:
+    """Take the worker id from LIBRARY_WORKER_ID again."""
+    set_worker_id(None)
+
+
+class TestGenerator(unittest.TestCase):
+    """Test cases for the parallel fake data generator."""
+
+    def test_same_seed_same_output(self) -> None:
+        """Test that a seed reproduces the data whatever the worker count."""
+        serial = list(generate_fake_data_parallel("book", 25, seed=7, shard_size=10))
+        parallel = list(
+            generate_fake_data_parallel("book", 25, workers=2, seed=7, shard_size=10)
+        )
+        self.assertEqual(serial, parallel)
+        self.assertEqual([len(shard) for shard in serial], [10, 10, 5])
+
+        other = list(generate_fake_data_parallel("book", 25, seed=8, shard_size=10))
+        self.assertNotEqual(serial, other)
+
+    def test_seeded_ids_are_sequential(self) -> None:
+        """Test that seeded records are numbered without gaps or duplicates."""
+        shards = generate_fake_data_parallel("user", 30, seed=1, shard_size=7)
+        ids = [record["user_id"] for shard in shards for record in shard]
+        self.assertEqual(ids, list(range(1, 31)))
+
+    def test_generated_ids_in_worker_processes(self) -> None:
+        """Test that worker processes get their ids from this process."""
+        shards = generate_fake_data_parallel("book", 25, workers=2, shard_size=10)
+        ids = [record["unique_ISBN"] for shard in shards for record in shard]
+        self.assertEqual(len(set(ids)), 25)
+        self.assertEqual(ids, sorted(ids))
+
+    def test_main_takes_the_worker_id_from_the_config(self) -> None:
+        """Test that the command line tool runs with the worker id of the config."""
+        with tempfile.TemporaryDirectory() as directory:
+            config = os.path.join(directory, "config.json")
+            with open(config, "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "username": "user",
+                        "password": "password",
+                        "database_url": f"sqlite:///{directory}/library.db",
+                        "worker_id": 9,
+                    },
+                    file,
+                )
+            argv = ["generator", "--books", "5", "--users", "2", "--config", config]
+            set_worker_id(None)
+            try:
+                with mock.patch.dict(os.environ), mock.patch("sys.argv", argv):
+                    os.environ.pop("LIBRARY_WORKER_ID", None)
+                    main()
+                self.assertEqual((generate_id() >> 12) & 1023, 9)
+            finally:
+                set_worker_id(0)
+
+    def test_unknown_kind(self) -> None:
+        """Test that unknown record kinds are rejected."""
+        with self.assertRaises(ValueError):
+            list(generate_fake_data_parallel("magazine", 1))
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,178 @@
+"""Unittest for the catalog import."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy import func, select
+
+from src.data.database import SQLConnection
+from src.data.importer import CatalogImporter, parse_isbn, split_file
+from src.entities.books import Book
+
+# Valid ISBN-13s, the first also written as an ISBN-10
+ISBNS = ["9780306406157", "9781861972712", "9780141439518", "9780262033848"]
+
+
+class TestCatalogImporter(unittest.TestCase):
+    """Test cases for CatalogImporter."""
+
+    def setUp(self) -> None:
+        """Set up an empty database."""
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "library.db")
+        self.connection = SQLConnection("user", "password", url=f"sqlite:///{path}")
+
+    def tearDown(self) -> None:
+        """Close the database."""
+        self.connection.engine.dispose()
+        self.directory.cleanup()
+
+    def write(self, name: str, text: str) -> str:
+        """Write a catalog file.
+
+        Args:
+            name (str): File name.
+            text (str): Content.
+
+        Returns:
+            str: Path of the file.
+        """
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        return path
+
+    def books(self) -> dict[int, tuple[str, str, int]]:
+        """Read the imported books.
+
+        Returns:
+            dict[int, tuple[str, str, int]]: Title, author and year by ISBN.
+        """
+        statement = select(Book.unique_ISBN, Book.title, Book.author, Book.release_year)
+        with self.connection.session_scope() as session:
+            return {row[0]: tuple(row[1:]) for row in session.execute(statement)}
+
+    def test_parse_isbn(self) -> None:
+        """Test that ISBNs are validated and converted to ISBN-13."""
+        self.assertEqual(parse_isbn("0-306-40615-2"), 9780306406157)
+        self.assertEqual(parse_isbn("978-0-306-40615-7"), 9780306406157)
+        self.assertEqual(parse_isbn("080442957X"), 9780804429573)
+        self.assertIsNone(parse_isbn("0-306-40615-3"))
+        self.assertIsNone(parse_isbn("9780306406158"))
+        self.assertIsNone(parse_isbn("1234567890123"))
+        self.assertIsNone(parse_isbn("not an isbn"))
+
+    def test_csv(self) -> None:
+        """Test that valid rows are imported once and others rejected."""
+        path = self.write(
+            "catalog.csv",
+            "ISBN,Title,Author,Date\n"
+            f"{ISBNS[0]},Dune,Herbert,c1965.\n"
+            "0-306-40615-2,Dune again,Herbert,1966\n"
+            f'{ISBNS[1]},"Emma, a novel",Austen,[1815?]\n'
+            "12345,Bad ISBN,Nobody,2000\n"
+            f"{ISBNS[2]},,No title,2000\n",
+        )
+        stats = CatalogImporter(self.connection).run(path)
+        self.assertEqual(
+            (stats.read, stats.inserted, stats.duplicates, stats.rejected),
+            (5, 2, 1, 2),
+        )
+        self.assertEqual(
+            self.books(),
+            {
+                int(ISBNS[0]): ("Dune", "Herbert", 1965),
+                int(ISBNS[1]): ("Emma, a novel", "Austen", 1815),
+            },
+        )
+        self.assertFalse(os.path.exists(CatalogImporter.checkpoint_path(path)))
+
+        # Importing again leaves the library as it is
+        stats = CatalogImporter(self.connection).run(path)
+        self.assertEqual((stats.inserted, stats.duplicates), (0, 3))
+
+    def test_json(self) -> None:
+        """Test JSON lines and JSON array files."""
+        records = [
+            {"isbn13": isbn, "title": f"Title {i}", "Year": 2000 + i}
+            for i, isbn in enumerate(ISBNS)
+        ]
+        lines = self.write(
+            "catalog.jsonl",
+            "\n".join(json.dumps(record) for record in records[:2]) + "\n{oops\n",
+        )
+        stats = CatalogImporter(self.connection).run(lines)
+        self.assertEqual((stats.inserted, stats.rejected), (2, 1))
+
+        array = self.write("catalog.json", json.dumps(records))
+        stats = CatalogImporter(self.connection, batch_size=3).run(array)
+        self.assertEqual((stats.inserted, stats.duplicates), (2, 2))
+        self.assertEqual(self.books()[int(ISBNS[3])], ("Title 3", None, 2003))
+
+    def test_line_separators_in_values(self) -> None:
+        """Test that only newlines end a line, not U+2028 and the like."""
+        path = self.write(
+            "catalog.csv",
+            "isbn,title,author\n"
+            f"{ISBNS[0]},Dune\u2028Messiah,Herbert\u0085Frank\r\n"
+            f"{ISBNS[1]},Emma\x1c,Austen\n",
+        )
+        stats = CatalogImporter(self.connection).run(path)
+        self.assertEqual((stats.read, stats.inserted, stats.rejected), (2, 2, 0))
+        self.assertEqual(
+            self.books()[int(ISBNS[0])][:2], ("Dune\u2028Messiah", "Herbert\u0085Frank")
+        )
+
+        lines = self.write(
+            "catalog.jsonl",
+            json.dumps({"isbn": ISBNS[2], "title": "A\u2028B"}, ensure_ascii=False),
+        )
+        stats = CatalogImporter(self.connection).run(lines)
+        self.assertEqual((stats.read, stats.inserted), (1, 1))
+        self.assertEqual(self.books()[int(ISBNS[2])][0], "A\u2028B")
+
+    def test_parallel_chunks(self) -> None:
+        """Test that chunks parsed by worker processes cover every line."""
+        lines = [f"{isbn},Title {isbn}\n" for isbn in ISBNS] * 50
+        path = self.write("catalog.csv", "isbn,title\n" + "".join(lines))
+        ranges = split_file(path, 11, 100)
+        self.assertEqual(ranges[0][0], 11)
+        self.assertEqual(ranges[-1][1], os.path.getsize(path))
+
+        importer = CatalogImporter(self.connection, workers=2, chunk_bytes=100)
+        stats = importer.run(path)
+        self.assertEqual((stats.read, stats.inserted), (200, 4))
+
+    def test_resume_after_crash(self) -> None:
+        """Test that an interrupted import continues from its checkpoint."""
+        path = self.write(
+            "catalog.csv",
+            "isbn,title\n" + "".join(f"{isbn},Title\n" for isbn in ISBNS),
+        )
+        importer = CatalogImporter(self.connection, chunk_bytes=10)
+        bulk_insert = self.connection.bulk_insert
+        calls = []
+
+        def crash(*args: object, **kwargs: object) -> int:
+            calls.append(args)
+            if len(calls) == 3:
+                raise RuntimeError("Power cut")
+            return bulk_insert(*args, **kwargs)  # type: ignore
+
+        with mock.patch.object(self.connection, "bulk_insert", crash):
+            with self.assertRaises(RuntimeError):
+                importer.run(path)
+        self.assertEqual(len(self.books()), 2)
+        self.assertTrue(os.path.exists(CatalogImporter.checkpoint_path(path)))
+
+        stats = importer.run(path)
+        self.assertEqual((stats.read, stats.inserted), (2, 2))
+        with self.connection.session_scope() as session:
+            self.assertEqual(session.scalar(select(func.count()).select_from(Book)), 4)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,202 @@
+"""Unittest for the LibrarySystem class."""
+
+import threading
+import unittest
+from itertools import islice
+
+from src.entities.books import Book
+from src.entities.users import User
+from src.lib_system import LibrarySystem
+from src.search.text_index import IndexedTitleSearchStrategy
+from src.search.year_index import YearRangeSearchStrategy
+
+
+class TestLibrarySystem(unittest.TestCase):
+    """Test cases for the LibrarySystem class."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        self.books = [
+            Book(
+                title=f"Book {i}",
+                author="John Doe",
+                release_year=2000 + i,
+                unique_ISBN=i,
+            )
+            for i in range(1, 6)
+        ]
+        self.library = LibrarySystem(self.books)  # type: ignore
+
+    def test_get_book(self) -> None:
+        """Test lookup of books by ISBN."""
+        self.assertIs(self.library.get_book(3), self.books[2])
+        self.assertIsNone(self.library.get_book(42))
+
+    def test_add_and_remove_book(self) -> None:
+        """Test that the ISBN index follows added and removed books."""
+        new_book = Book(
+            title="New Book", author="Jane Doe", release_year=2024, unique_ISBN=42
+        )
+        self.library.add_book(new_book)  # type: ignore
+        self.assertIs(self.library.get_book(42), new_book)
+        self.assertIn(new_book, self.library.books)  # type: ignore
+
+        removed = self.library.remove_book(42)
+        self.assertIs(removed, new_book)
+        self.assertIsNone(self.library.get_book(42))
+        self.assertNotIn(new_book, self.library.books)  # type: ignore
+
+    def test_replace_books(self) -> None:
+        """Test that assigning a new book list rebuilds the index."""
+        self.library.books = self.books[:2]  # type: ignore
+        self.assertIsNotNone(self.library.get_book(2))
+        self.assertIsNone(self.library.get_book(3))
+
+    def test_loan_and_reserve_book(self) -> None:
+        """Test loaning and reserving books through the index."""
+        result = self.library.loan_book(user_id=1, book_id=1)
+        self.assertIn("Book 1", result)
+
+        self.library.reserve_book(user_id=1, book_id=2)
+        self.assertFalse(self.books[1].is_available())
+
+        result = self.library.reserve_book(user_id=1, book_id=42)
+        self.assertEqual(result, "Bogen med det angivne ID blev ikke fundet.")
+
+    def test_transcript(self) -> None:
+        """Test that transactions are written to the transcript."""
+        self.library.reserve_book(user_id=7, book_id=4)
+        self.assertEqual(len(self.library.transcript), 1)
+        self.assertIn("Book 4", self.library.transcript[0])
+
+    def test_activity_log(self) -> None:
+        """Test that transactions are logged with their fields."""
+        with self.assertLogs("library.activity", level="INFO") as logs:
+            result = self.library.loan_book(3, 2)
+        (record,) = logs.records
+        self.assertEqual(record.getMessage(), result)
+        self.assertEqual((record.action, record.user_id), ("loan_book", 3))
+        self.assertEqual(len(self.library.transcript), 1)
+
+    def test_refresh(self) -> None:
+        """Test that pulled changes patch the books and the index."""
+        updated = Book(
+            title="Book 2, second edition",
+            author="John Doe",
+            release_year=2024,
+            unique_ISBN=2,
+        )
+        added = Book(
+            title="Book 6", author="Jane Doe", release_year=2024, unique_ISBN=6
+        )
+        calls = []
+
+        def change_loader(after: int) -> tuple[list[Book], list[int], int]:
+            calls.append(after)
+            return [updated, added], [1], 9
+
+        self.library.change_loader = change_loader  # type: ignore
+        self.assertEqual(self.library.refresh(), 3)
+        self.assertEqual((calls, self.library.watermark), ([0], 9))
+        self.assertIs(self.library.get_book(2), updated)
+        self.assertIs(self.library.get_book(6), added)
+        self.assertIsNone(self.library.get_book(1))
+        self.assertEqual(
+            sorted(book.unique_ISBN for book in self.library.books),  # type: ignore
+            [2, 3, 4, 5, 6],
+        )
+
+        self.library.refresh()
+        self.assertEqual(calls, [0, 9])
+
+    def test_transactions(self) -> None:
+        """Test that loans go through the transactions and patch the books."""
+        committed = {}
+
+        class Transactions:
+            def loan_book(self, user_id: int, book_id: int) -> tuple:
+                if book_id == 42:
+                    return "not_found", None
+                book = Book(
+                    title="Book 1", author="John Doe", release_year=2001, unique_ISBN=1
+                )
+                book.available = False
+                book.reserved_by = user_id
+                committed[book_id] = book
+                return "done", book
+
+            def reserve_book(self, user_id: int, book_id: int) -> tuple:
+                return "conflict", committed[1]
+
+        original = self.books[0]
+        self.library.transactions = Transactions()
+        result = self.library.loan_book(user_id=7, book_id=1)
+        self.assertIn("udlånt", result)
+        self.assertIs(self.library.get_book(1), committed[1])
+        self.assertTrue(original.is_available())
+
+        result = self.library.reserve_book(user_id=8, book_id=1)
+        self.assertEqual(result, "Bogen 'Book 1' er allerede reserveret.")
+
+        self.library.add_book(
+            Book(title="Gone", author="A", release_year=2000, unique_ISBN=42)
+        )
+        result = self.library.loan_book(user_id=7, book_id=42)
+        self.assertEqual(result, "Bogen med det angivne ID blev ikke fundet.")
+        self.assertIsNone(self.library.get_book(42))
+
+    def test_search_while_books_change(self) -> None:
+        """Test that searches are safe while another thread patches books."""
+        library = LibrarySystem(
+            [
+                Book(title=f"Book {i}", author="A", release_year=i, unique_ISBN=i)
+                for i in range(1, 501)
+            ]
+        )  # type: ignore
+        strategies = [IndexedTitleSearchStrategy(), YearRangeSearchStrategy()]
+        stop = threading.Event()
+        errors = []
+
+        def patch() -> None:
+            try:
+                isbn = 1000
+                while not stop.is_set():
+                    isbn += 1
+                    library.add_book(
+                        Book(
+                            title=f"Book {isbn}",
+                            author="A",
+                            release_year=isbn % 500,
+                            unique_ISBN=isbn,
+                        )
+                    )  # type: ignore
+                    library.remove_book(isbn - 1 if isbn > 1001 else 1)
+            except Exception as error:
+                errors.append(error)
+
+        worker = threading.Thread(target=patch)
+        worker.start()
+        try:
+            for _ in range(200):
+                for strategy, query in zip(strategies, ("book", "100-400")):
+                    library.search_strategy = strategy
+                    results = library.search_books(query)
+                    while list(islice(results, 20)):
+                        pass
+        finally:
+            stop.set()
+            worker.join()
+        self.assertEqual(errors, [])
+
+    def test_search_ends_when_books_change(self) -> None:
+        """Test that results found before a change are not mixed with later."""
+        self.library.search_strategy = IndexedTitleSearchStrategy()
+        results = self.library.search_books("book")
+        self.assertEqual(next(results).unique_ISBN, 1)
+        self.library.remove_book(5)
+        self.assertEqual(list(results), [])
+        self.assertEqual(len(list(self.library.search_books("book"))), 4)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,91 @@
+"""Unittest for the logging setup."""
+
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+
+from src.loggers import JsonFormatter, Loggers, RotatingLogFileHandler, Transcript
+
+
+class TestLoggers(unittest.TestCase):
+    """Test cases for the loggers."""
+
+    def setUp(self) -> None:
+        """Set up a directory for log files."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "library.log")
+
+    def tearDown(self) -> None:
+        """Remove the log files."""
+        self.directory.cleanup()
+
+    def test_json_formatter(self) -> None:
+        """Test that extra values become fields of the JSON line."""
+        record = logging.makeLogRecord(
+            {"name": "library.activity", "msg": "Lent %s", "args": ("Dune",)}
+        )
+        record.user_id = 7
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry["message"], "Lent Dune")
+        self.assertEqual(entry["logger"], "library.activity")
+        self.assertEqual(entry["user_id"], 7)
+        self.assertNotIn("args", entry)
+
+    def test_rotate_by_size(self) -> None:
+        """Test that the file is rotated once it is full."""
+        handler = RotatingLogFileHandler(
+            self.path, max_bytes=100, interval=None, backup_count=2
+        )
+        for i in range(20):
+            handler.emit(logging.makeLogRecord({"msg": f"Line {i:02} " + "x" * 20}))
+        handler.close()
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertTrue(os.path.exists(self.path + ".2"))
+        self.assertFalse(os.path.exists(self.path + ".3"))
+        with open(self.path, encoding="utf-8") as file:
+            self.assertIn("Line 19", file.read())
+
+    def test_rotate_by_time(self) -> None:
+        """Test that the file is rotated once it is old."""
+        handler = RotatingLogFileHandler(self.path, max_bytes=0, interval=60)
+        handler.emit(logging.makeLogRecord({"msg": "Old"}))
+        handler.rollover_at = time.time() - 1
+        handler.emit(logging.makeLogRecord({"msg": "New"}))
+        handler.close()
+        with open(self.path + ".1", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "Old\n")
+        with open(self.path, encoding="utf-8") as file:
+            self.assertEqual(file.read(), "New\n")
+        self.assertGreater(handler.rollover_at, time.time() + 50)
+
+    def test_transcript_ring_buffer(self) -> None:
+        """Test that the transcript keeps only the latest entries."""
+        transcript = Transcript(max_entries=3)
+        for book_id in range(5):
+            transcript.append(user_id=1, book_id=book_id)
+        self.assertEqual(len(transcript), 3)
+        self.assertEqual([r["book_id"] for r in transcript.records()], [2, 3, 4])
+        self.assertEqual(transcript[0], "User id: 1, Book id: 2")
+        self.assertEqual(list(transcript)[-1], "User id: 1, Book id: 4")
+
+    def test_queued_file_logging(self) -> None:
+        """Test that records reach the file once the loggers are closed."""
+        loggers = Loggers(name="test_loggers", path=self.path)
+        logger = logging.getLogger("test_loggers.activity")
+        for user_id in range(100):
+            logger.info("Loan", extra={"user_id": user_id})
+        loggers.close()
+        loggers.close()
+
+        with open(self.path, encoding="utf-8") as file:
+            entries = [json.loads(line) for line in file]
+        self.assertEqual([entry["user_id"] for entry in entries], list(range(100)))
+        self.assertEqual(entries[0]["logger"], "test_loggers.activity")
+        self.assertFalse(logging.getLogger("test_loggers").handlers)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,100 @@
+"""Unittest for the notification dispatcher."""
+
+import threading
+import time
+import unittest
+
+from src.entities.books import Book
+from src.entities.users import User
+from src.notifications import (
+    MemorySink,
+    Notification,
+    NotificationDispatcher,
+    NotificationSink,
+)
+
+
+class FailingSink(NotificationSink):
+    """Sink raising on every batch."""
+
+    def send_batch(self, notifications: list[Notification]) -> None:
+        """Fail.
+
+        Args:
+            notifications (list[Notification]): Ignored.
+
+        Raises:
+            ConnectionError: Always.
+        """
+        raise ConnectionError("Mail server down")
+
+
+class BlockingSink(MemorySink):
+    """Sink waiting for an event before storing a batch."""
+
+    def __init__(self) -> None:
+        """Initialize class."""
+        super().__init__()
+        self.release = threading.Event()
+
+    def send_batch(self, notifications: list[Notification]) -> None:
+        """Wait, then store notifications.
+
+        Args:
+            notifications (list[Notification]): Notifications to store.
+        """
+        self.release.wait(5)
+        super().send_batch(notifications)
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+    """Test cases for NotificationDispatcher."""
+
+    def test_batches(self) -> None:
+        """Test that queued notifications are sent in order, in batches."""
+        sink = MemorySink()
+        dispatcher = NotificationDispatcher(
+            [FailingSink(), sink], batch_size=4, flush_interval=0.05
+        )
+        for user_id in range(10):
+            dispatcher.dispatch(Notification(user_id, 1, "Ready"))
+        dispatcher.close()
+
+        self.assertEqual([n.user_id for n in sink.notifications], list(range(10)))
+        self.assertTrue(all(len(batch) <= 4 for batch in sink.batches))
+        self.assertLess(len(sink.batches), 10)
+        self.assertEqual(dispatcher.sent, 10)
+        self.assertEqual(dispatcher.failures, len(sink.batches))
+        self.assertFalse(dispatcher.dispatch(Notification(1, 1, "Late")))
+
+    def test_dispatch_does_not_wait_for_sinks(self) -> None:
+        """Test that a slow sink never holds up dispatch."""
+        sink = BlockingSink()
+        dispatcher = NotificationDispatcher([sink], flush_interval=0)
+        start = time.monotonic()
+        for user_id in range(100):
+            dispatcher.dispatch(Notification(user_id, 1, "Ready"))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(sink.batches, [])
+
+        sink.release.set()
+        dispatcher.close()
+        self.assertEqual(len(sink.notifications), 100)
+
+    def test_reservation_ready(self) -> None:
+        """Test turning a reservation_ready event into a notification."""
+        sink = MemorySink()
+        dispatcher = NotificationDispatcher([sink])
+        book = Book(title="Dune", author="A", release_year=1965, unique_ISBN=3)
+        book.reserved_by = 7
+        dispatcher.on_change("book_updated", book)
+        dispatcher.on_change("reservation_ready", book)
+        dispatcher.close()
+
+        (notification,) = sink.notifications
+        self.assertEqual((notification.user_id, notification.unique_ISBN), (7, 3))
+        self.assertIn("Dune", notification.message)
+
+
+if __name__ == "__main__":
+    pass
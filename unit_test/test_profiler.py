@@ -0,0 +1,139 @@
+"""Unittest for the query profiler."""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from src.data.database import SQLConnection
+from src.data.profiler import StatementStats, format_report
+from src.entities.books import Book
+from src.entities.users import User
+
+
+class TestQueryProfiler(unittest.TestCase):
+    """Test cases for QueryProfiler on a profiled SQLConnection."""
+
+    def setUp(self) -> None:
+        """Set up a profiled database with some books."""
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "library.db")
+        self.connection = SQLConnection(
+            "user", "password", url=f"sqlite:///{path}", profile=True
+        )
+        self.connection.bulk_insert(
+            (
+                {
+                    "title": f"Title {i}",
+                    "author": "Author",
+                    "release_year": 2000,
+                    "unique_ISBN": i,
+                }
+                for i in range(1, 21)
+            ),
+            Book,  # type: ignore
+        )
+        self.connection.profiler.reset()  # type: ignore
+
+    def tearDown(self) -> None:
+        """Close the database."""
+        self.connection.engine.dispose()
+        self.directory.cleanup()
+
+    def test_counts_and_rows(self) -> None:
+        """Test that executions and changed rows are counted per statement."""
+        self.connection.load_books_from_database()
+        self.connection.load_books_from_database()
+        self.connection.loan_book(1, 3)
+
+        stats = self.connection.stats()
+        select = next(
+            report
+            for statement, report in stats["by_statement"].items()
+            if statement.startswith("SELECT") and "WHERE" not in statement
+        )
+        self.assertEqual(select["count"], 2)
+        self.assertEqual(select["rows"], 0)
+        self.assertEqual(sum(select["histogram"].values()), 2)
+        self.assertLessEqual(select["p50_ms"], select["p95_ms"])
+        updates = [
+            report
+            for statement, report in stats["by_statement"].items()
+            if statement.startswith("UPDATE books")
+        ]
+        self.assertEqual([report["rows"] for report in updates], [1])
+        self.assertEqual(
+            stats["executions"],
+            sum(report["count"] for report in stats["by_statement"].values()),
+        )
+
+    def test_n_plus_one(self) -> None:
+        """Test that a SELECT repeated in one transaction is reported."""
+        with self.assertLogs("library.sql", level="WARNING") as logs:
+            with self.connection.session_scope() as session:
+                for unique_ISBN in range(1, 16):
+                    session.get(Book, unique_ISBN)
+        self.assertIn("10 times", logs.output[0])
+        self.assertEqual(self.connection.stats()["n_plus_one"], 1)
+
+        # A new transaction starts counting again
+        for unique_ISBN in range(1, 16):
+            self.connection.get_book(unique_ISBN)
+        self.assertEqual(self.connection.stats()["n_plus_one"], 1)
+
+    def test_slow_queries(self) -> None:
+        """Test that statements above the threshold are logged."""
+        self.connection.profiler.slow_threshold = 0  # type: ignore
+        with self.assertLogs("library.sql", level="WARNING") as logs:
+            self.connection.get_book(1)
+        self.assertIn("Slow statement", logs.output[0])
+        self.assertEqual(self.connection.stats()["slow_queries"], 1)
+
+    def test_dump(self) -> None:
+        """Test that dumped counters can be read back as a report."""
+        self.connection.get_book(1)
+        path = os.path.join(self.directory.name, "profile.json")
+        self.assertTrue(self.connection.dump_stats(path))
+        with open(path, encoding="utf-8") as file:
+            stats = json.load(file)
+        self.assertEqual(stats["executions"], 1)
+        self.assertIn("SELECT books", format_report(stats))
+
+    def test_not_profiled(self) -> None:
+        """Test that an unprofiled connection reports nothing."""
+        connection = SQLConnection("user", "password", url="sqlite://")
+        self.assertEqual(connection.stats(), {})
+        self.assertFalse(connection.dump_stats("unused.json"))
+
+    def test_threads(self) -> None:
+        """Test that no count is lost when pooled connections run at once."""
+        self.connection.profiler.slow_threshold = 0  # type: ignore
+
+        def read() -> None:
+            for unique_ISBN in range(1, 21):
+                self.connection.get_book(unique_ISBN)
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        with self.assertLogs("library.sql", level="WARNING"):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        stats = self.connection.stats()
+        self.assertEqual(stats["executions"], 80)
+        self.assertEqual(stats["slow_queries"], 80)
+
+    def test_percentile(self) -> None:
+        """Test percentiles estimated from the histogram buckets."""
+        stats = StatementStats()
+        stats.count = 10
+        stats.histogram[3] = 9
+        stats.histogram[-1] = 1
+        stats.max_ms = 4000.0
+        self.assertEqual(stats.percentile(0.5), 1.0)
+        self.assertEqual(stats.percentile(0.95), 4000.0)
+
+
+if __name__ == "__main__":
+    pass
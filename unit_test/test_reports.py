@@ -0,0 +1,226 @@
+"""Unittest for the loan reports."""
+
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from unittest import mock
+
+from src.data.database import DONE, SQLConnection
+from src.data.reports import LoanReports, split_range, utc_today
+from src.entities.books import Book
+from src.entities.loan_events import LOAN, RETURN, LoanEvent
+from src.entities.users import User
+
+
+class TestLoanReports(unittest.TestCase):
+    """Test cases for LoanReports."""
+
+    def setUp(self) -> None:
+        """Set up a database with books by two authors and some users."""
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "library.db")
+        self.connection = SQLConnection("user", "password", url=f"sqlite:///{path}")
+        self.connection.bulk_insert(
+            (
+                {
+                    "title": f"Title {i}",
+                    "author": "Herbert" if i % 2 else "Austen",
+                    "release_year": 2000,
+                    "unique_ISBN": i,
+                }
+                for i in range(1, 6)
+            ),
+            Book,  # type: ignore
+        )
+        self.connection.bulk_insert(
+            (
+                {"user_id": i, "name": f"User {i}", "address": "Main St"}
+                for i in range(1, 4)
+            ),
+            User,  # type: ignore
+        )
+        self.reports = LoanReports(self.connection, batch_size=7)
+
+    def tearDown(self) -> None:
+        """Close the database."""
+        self.connection.engine.dispose()
+        self.directory.cleanup()
+
+    def add_history(self, loans: list[tuple[int, date]]) -> None:
+        """Write past loans straight into the history.
+
+        Args:
+            loans (list[tuple[int, date]]): ISBNs and days of the loans.
+        """
+        self.connection.bulk_insert(
+            (
+                {
+                    "event_id": number,
+                    "book_id": unique_ISBN,
+                    "user_id": 1,
+                    "action": LOAN,
+                    "created_at": datetime.combine(day, datetime.min.time()),
+                }
+                for number, (unique_ISBN, day) in enumerate(loans, start=1)
+            ),
+            LoanEvent,  # type: ignore
+        )
+
+    def test_loans_and_returns_are_recorded(self) -> None:
+        """Test that transactions append to the loan history."""
+        self.assertEqual(self.connection.loan_book(1, 3)[0], DONE)
+        self.assertEqual(self.connection.return_book(1, 3)[0], DONE)
+        self.connection.loan_book(2, 3)
+
+        history = self.reports.loan_history(unique_ISBN=3)
+        self.assertEqual(
+            [(event.user_id, event.action) for event in history],
+            [(2, LOAN), (1, RETURN), (1, LOAN)],
+        )
+        self.assertEqual(len(self.reports.loan_history(user_id=1)), 2)
+
+        self.assertEqual(self.reports.refresh(), 2)
+        self.assertEqual(self.reports.top_books(), [(3, 2)])
+        self.assertEqual(self.reports.top_authors(), [("Herbert", 2)])
+        self.assertEqual(self.reports.total_loans(), 2)
+
+    def test_incremental_refresh(self) -> None:
+        """Test that each event is counted once over many refreshes."""
+        day = date(2024, 5, 17)
+        self.add_history([(1 + i % 5, day) for i in range(20)])
+        self.assertEqual(self.reports.refresh(), 20)
+        self.assertEqual(self.reports.refresh(), 0)
+        self.connection.loan_book(1, 2)
+        self.assertEqual(self.reports.refresh(), 1)
+
+        self.assertEqual(self.reports.total_loans(), 21)
+        self.assertEqual(self.reports.loans_per_day(day, day), [(day, 20)])
+        self.assertEqual(
+            self.reports.loans_per_day(day, day, unique_ISBN=2), [(day, 4)]
+        )
+        self.assertEqual(self.reports.top_books(1), [(2, 5)])
+        self.assertEqual(
+            self.reports.top_authors(),
+            [("Herbert", 12), ("Austen", 9)],
+        )
+
+    def test_events_committed_out_of_order(self) -> None:
+        """Test that a loan committed after a higher event id is counted."""
+        day = date(2024, 5, 17)
+
+        def commit(event_id: int, action: str = LOAN) -> None:
+            self.connection.bulk_insert(
+                [
+                    {
+                        "event_id": event_id,
+                        "book_id": 1,
+                        "user_id": 1,
+                        "action": action,
+                        "created_at": datetime.combine(day, datetime.min.time()),
+                    }
+                ],
+                LoanEvent,  # type: ignore
+            )
+
+        # MySQL hands out ids on insert, so the transaction given the lower
+        # id can commit after the ones given the higher ids
+        commit(2)
+        commit(3, RETURN)
+        self.assertEqual(self.reports.refresh(), 1)
+        commit(1)
+        # Loans not yet counted are left out of ranges read from events too
+        self.assertEqual(self.reports.total_loans(day, day), 1)
+
+        self.assertEqual(self.reports.refresh(), 1)
+        self.assertEqual(self.reports.refresh(), 0)
+        self.assertEqual(self.reports.total_loans(), 2)
+        self.assertEqual(self.reports.total_loans(day, day), 2)
+        self.assertEqual(self.reports.loans_per_day(day, day), [(day, 2)])
+
+    def test_ranges_match_the_events(self) -> None:
+        """Test that ranged reports equal counting the raw events."""
+        first = date(2022, 1, 1)
+        loans = [(1 + i % 5, first + timedelta(days=i * 7 % 900)) for i in range(300)]
+        self.add_history(loans)
+        self.reports.refresh()
+
+        ranges = [
+            (date(2022, 1, 1), date(2024, 12, 31)),
+            (date(2022, 3, 15), date(2023, 2, 3)),
+            (date(2022, 6, 1), date(2022, 6, 30)),
+            (date(2022, 6, 10), date(2022, 6, 12)),
+            (date(2022, 6, 20), date(2022, 7, 10)),
+        ]
+        for start, end in ranges:
+            expected = sum(1 for _, day in loans if start <= day <= end)
+            self.assertEqual(self.reports.total_loans(start, end), expected)
+            by_book = self.reports.top_books(5, start, end)
+            self.assertEqual(sum(count for _, count in by_book), expected)
+            by_author = self.reports.top_authors(5, start, end)
+            self.assertEqual(sum(count for _, count in by_author), expected)
+
+        # Whole years are read from year rollups, the remaining whole months
+        # from month rollups and the partial months from events
+        self.assertEqual(
+            split_range(date(2022, 1, 2), date(2024, 6, 29)),
+            {
+                "year": [(date(2023, 1, 1), date(2024, 1, 1))],
+                "month": [
+                    (date(2022, 2, 1), date(2023, 1, 1)),
+                    (date(2024, 1, 1), date(2024, 6, 1)),
+                ],
+                "day": [
+                    (date(2022, 1, 2), date(2022, 2, 1)),
+                    (date(2024, 6, 1), date(2024, 6, 30)),
+                ],
+            },
+        )
+        self.assertEqual(
+            split_range(date(2022, 3, 1), date(2022, 5, 31)),
+            {"year": [], "month": [(date(2022, 3, 1), date(2022, 6, 1))], "day": []},
+        )
+
+        # Loans not yet counted are left out of every part of a range
+        self.connection.loan_book(1, 1)
+        today = utc_today()
+        self.assertEqual(self.reports.total_loans(today, today), 0)
+        self.reports.refresh()
+        self.assertEqual(self.reports.total_loans(today, today), 1)
+
+    def test_days_are_utc_days(self) -> None:
+        """Test that ranges ending today end on the current day in UTC."""
+        # Half past midnight in UTC is still the day before west of it
+        now = datetime(2024, 5, 18, 0, 30, tzinfo=timezone.utc)
+
+        class Clock(datetime):
+            @classmethod
+            def now(cls, tz: Optional[timezone] = None) -> datetime:  # type: ignore
+                return now.astimezone(tz)
+
+        class Calendar(date):
+            @classmethod
+            def today(cls) -> date:
+                return date(2024, 5, 17)
+
+        self.add_history([(1, date(2024, 5, 17)), (2, date(2024, 5, 18))])
+        self.reports.refresh()
+        with mock.patch("src.data.reports.datetime", Clock), mock.patch(
+            "src.data.reports.date", Calendar
+        ):
+            self.assertEqual(self.reports.total_loans(date(2024, 5, 18)), 1)
+            self.assertEqual(self.reports.total_loans(date(2024, 5, 1)), 2)
+
+    def test_removed_books(self) -> None:
+        """Test that loans of removed books keep being reported."""
+        self.connection.loan_book(1, 4)
+        self.connection.return_book(1, 4)
+        self.connection.remove_book_by_id(4)
+        self.reports.refresh()
+        self.assertEqual(self.reports.top_books(), [(4, 1)])
+        self.assertEqual(self.reports.top_authors(), [("Unknown", 1)])
+
+
+if __name__ == "__main__":
+    pass
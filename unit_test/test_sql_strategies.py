@@ -0,0 +1,89 @@
+"""Unittest for the database search strategies."""
+
+import unittest
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from src.constants import Base
+from src.entities.books import Book
+from src.entities.users import User
+from src.search.sql_strategies import (
+    SQLAuthorSearchStrategy,
+    SQLISBNSearchStrategy,
+    SQLTitleSearchStrategy,
+    SQLYearSearchStrategy,
+)
+
+
+class TestSQLStrategies(unittest.TestCase):
+    """Test cases for the database search strategies on SQLite."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+
+        with self.Session() as session:
+            session.add_all(
+                [
+                    Book(
+                        title=f"Book {i % 7} 100%",
+                        author="Jane Doe" if i % 2 else "John Smith",
+                        release_year=1980 + i % 40,
+                        unique_ISBN=i,
+                    )
+                    for i in range(1, 251)
+                ]
+            )
+            session.commit()
+
+    def tearDown(self) -> None:
+        """Close the database."""
+        self.engine.dispose()
+
+    def test_indexes_created(self) -> None:
+        """Test that the searched columns are indexed."""
+        indexes = inspect(self.engine).get_indexes("books")
+        indexed = {column for index in indexes for column in index["column_names"]}
+        self.assertTrue({"title", "author", "release_year"} <= indexed)
+
+    def test_title_search_pages_through_all_results(self) -> None:
+        """Test that keyset paging returns every match exactly once."""
+        strategy = SQLTitleSearchStrategy(self.Session, page_size=7)
+        found = [book.unique_ISBN for book in strategy.search([], "book 3")]
+        expected = [i for i in range(1, 251) if i % 7 == 3]
+        self.assertEqual(sorted(found), expected)
+        self.assertEqual(len(set(found)), len(found))
+
+    def test_like_wildcards_are_escaped(self) -> None:
+        """Test that % and _ in a query are matched literally."""
+        strategy = SQLTitleSearchStrategy(self.Session)
+        self.assertEqual(len(list(strategy.search([], "100%"))), 250)
+        self.assertEqual(list(strategy.search([], "1_0")), [])
+
+    def test_prefix_match(self) -> None:
+        """Test matching the start of the author."""
+        strategy = SQLAuthorSearchStrategy(self.Session, match="prefix")
+        self.assertEqual(len(list(strategy.search([], "Jane"))), 125)
+        self.assertEqual(list(strategy.search([], "Doe")), [])
+
+    def test_isbn_search(self) -> None:
+        """Test lookup by ISBN."""
+        strategy = SQLISBNSearchStrategy(self.Session)
+        found = list(strategy.search([], "42"))
+        self.assertEqual([book.unique_ISBN for book in found], [42])
+        self.assertEqual(list(strategy.search([], "not a number")), [])
+
+    def test_year_search(self) -> None:
+        """Test exact and range queries on the release year."""
+        strategy = SQLYearSearchStrategy(self.Session, page_size=10)
+        years = [book.release_year for book in strategy.search([], "1990-1991")]
+        self.assertEqual(years, sorted(years))
+        self.assertEqual(len(years), 13)
+        self.assertEqual(len(list(strategy.search([], ">=2015"))), 30)
+
+
+if __name__ == "__main__":
+    pass
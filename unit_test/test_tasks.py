@@ -0,0 +1,117 @@
+"""Unittest for the GUI task runner."""
+
+import threading
+import time
+import unittest
+from typing import Any, Callable
+
+from src.GUI.tasks import TaskRunner
+
+
+class FakeWidget:
+    """Stand-in for a Tk widget running after() callbacks on demand."""
+
+    def __init__(self) -> None:
+        """Initialize class."""
+        self.scheduled: dict[str, tuple[Callable[..., Any], tuple[Any, ...]]] = {}
+        self.counter = 0
+
+    def after(self, delay_ms: int, func: Callable[..., Any], *args: Any) -> str:
+        """Schedule a callback.
+
+        Args:
+            delay_ms (int): Ignored.
+            func (Callable[..., Any]): Callback.
+            *args (Any): Arguments for the callback.
+
+        Returns:
+            str: Id of the callback.
+        """
+        self.counter += 1
+        after_id = f"after#{self.counter}"
+        self.scheduled[after_id] = (func, args)
+        return after_id
+
+    def after_cancel(self, after_id: str) -> None:
+        """Cancel a callback.
+
+        Args:
+            after_id (str): Id of the callback.
+        """
+        self.scheduled.pop(after_id, None)
+
+    def run_pending(self) -> None:
+        """Run the callbacks scheduled so far."""
+        scheduled, self.scheduled = self.scheduled, {}
+        for func, args in scheduled.values():
+            func(*args)
+
+
+class TestTaskRunner(unittest.TestCase):
+    """Test cases for the TaskRunner class."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        self.widget = FakeWidget()
+        self.runner = TaskRunner(self.widget, max_workers=2)
+
+    def tearDown(self) -> None:
+        """Stop the workers."""
+        self.runner.shutdown()
+
+    def pump(self, future: Any) -> None:
+        """Wait for a task and run the main thread callbacks.
+
+        Args:
+            future (Any): Task to wait for.
+        """
+        try:
+            future.result(timeout=5)
+        except Exception:
+            pass
+        for _ in range(5):
+            self.widget.run_pending()
+
+    def test_result_delivered_on_main_thread(self) -> None:
+        """Test that callbacks run on the thread polling the widget."""
+        results = []
+        future = self.runner.submit(
+            lambda: threading.get_ident(),
+            on_done=lambda worker: results.append((worker, threading.get_ident())),
+        )
+        self.pump(future)
+
+        self.assertEqual(len(results), 1)
+        worker, caller = results[0]
+        self.assertNotEqual(worker, caller)
+        self.assertEqual(caller, threading.get_ident())
+
+    def test_errors_are_reported(self) -> None:
+        """Test that exceptions reach the error callback."""
+        errors: list[BaseException] = []
+        future = self.runner.submit(lambda: 1 / 0, on_error=errors.append)
+        self.pump(future)
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+    def test_stale_results_are_dropped(self) -> None:
+        """Test that a task replaced by a newer one with its key is ignored."""
+        results = []
+        slow = self.runner.submit(
+            lambda: time.sleep(0.05) or "old", on_done=results.append, key="search"
+        )
+        fast = self.runner.submit(lambda: "new", on_done=results.append, key="search")
+        self.pump(slow)
+        self.pump(fast)
+        self.assertEqual(results, ["new"])
+
+    def test_debounce(self) -> None:
+        """Test that only the last of quick successive calls runs."""
+        calls = []
+        for query in ["h", "ho", "hob"]:
+            self.runner.debounce("search", 250, calls.append, query)
+        self.widget.run_pending()
+        self.assertEqual(calls, ["hob"])
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,97 @@
+"""Unittest for the indexed title and author search."""
+
+import unittest
+
+from src.entities.books import Book
+from src.entities.users import User
+from src.lib_system import AuthorSearchStrategy, LibrarySystem, TitleSearchStrategy
+from src.search.text_index import (
+    IndexedAuthorSearchStrategy,
+    IndexedTitleSearchStrategy,
+)
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test cases for the indexed search strategies."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        titles = [
+            ("The Hobbit", "J. R. R. Tolkien"),
+            ("The Lord of the Rings", "J. R. R. Tolkien"),
+            ("Hobbies for Everyone", "Jane Doe"),
+            ("Dune", "Frank Herbert"),
+            ("Children of Dune", "Frank Herbert"),
+        ]
+        self.books = [
+            Book(title=title, author=author, release_year=2000, unique_ISBN=i)
+            for i, (title, author) in enumerate(titles, start=1)
+        ]
+        self.library = LibrarySystem(self.books)  # type: ignore
+
+    def test_same_results_as_plain_search(self) -> None:
+        """Test that the index finds the same books as a full scan."""
+        pairs = [
+            (TitleSearchStrategy(), IndexedTitleSearchStrategy()),
+            (AuthorSearchStrategy(), IndexedAuthorSearchStrategy()),
+        ]
+        queries = ["hobb", "THE", "dune", "e", "", "tolkien", "xyz", "f the"]
+        for plain, indexed in pairs:
+            for query in queries:
+                self.assertEqual(
+                    list(indexed.search(self.books, query)),  # type: ignore
+                    list(plain.search(self.books, query)),  # type: ignore
+                    msg=query,
+                )
+
+    def test_token_match(self) -> None:
+        """Test matching whole words."""
+        strategy = IndexedTitleSearchStrategy(match="tokens")
+        found = list(strategy.search(self.books, "dune"))  # type: ignore
+        self.assertEqual([book.unique_ISBN for book in found], [4, 5])
+        self.assertEqual(list(strategy.search(self.books, "hobb")), [])  # type: ignore
+
+    def test_index_follows_library_changes(self) -> None:
+        """Test that added and removed books are reflected in the index."""
+        self.library.search_strategy = IndexedTitleSearchStrategy()
+        self.assertEqual(len(list(self.library.search_books("dune"))), 2)
+
+        self.library.add_book(
+            Book(  # type: ignore
+                title="Dune Messiah",
+                author="Frank Herbert",
+                release_year=1969,
+                unique_ISBN=6,
+            )
+        )
+        self.library.remove_book(4)
+
+        found = list(self.library.search_books("dune"))
+        self.assertEqual([book.unique_ISBN for book in found], [5, 6])
+
+    def test_updates_do_not_grow_the_index(self) -> None:
+        """Test that replaced books are compacted away."""
+        strategy = IndexedTitleSearchStrategy()
+        strategy.index.COMPACT_MIN = 8
+        self.library.search_strategy = strategy
+        self.assertEqual(len(list(self.library.search_books("dune"))), 2)
+
+        for _ in range(100):
+            for book in self.books:
+                self.library.add_book(book)
+        index = strategy.index
+        self.assertLessEqual(len(index._books), 2 * 8 + len(self.books))
+        self.assertEqual(len(index), len(self.books))
+        found = self.library.search_books("dune")
+        self.assertEqual([book.unique_ISBN for book in found], [4, 5])
+        self.assertEqual(len(list(self.library.search_books("e"))), 5)
+
+        # Documents keep their order and the compacted ids stay consistent
+        index.compact()
+        self.assertEqual(len(index._books), len(self.books))
+        found = self.library.search_books("hobb")
+        self.assertEqual([book.unique_ISBN for book in found], [1, 3])
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,98 @@
+"""Unittest for the utilities."""
+
+import os
+import threading
+import unittest
+from unittest import mock
+
+from src.utils import IdGenerator, chunked, generate_id, generate_ids, set_worker_id
+
+
+def setUpModule() -> None:
+    """Give the tests a worker id, as they write to throwaway databases."""
+    set_worker_id(0)
+
+
+def tearDownModule() -> None:
+    """Take the worker id from LIBRARY_WORKER_ID again."""
+    set_worker_id(None)
+
+
+class TestIdGenerator(unittest.TestCase):
+    """Test cases for the IdGenerator class."""
+
+    def test_ids_increase_and_fit_in_bigint(self) -> None:
+        """Test that ids are monotonic and positive signed 64-bit integers."""
+        ids = [generate_id() for _ in range(10_000)] + generate_ids(10_000)
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue(all(0 < new_id < 2**63 for new_id in ids))
+
+    def test_batch_larger_than_a_millisecond(self) -> None:
+        """Test batches spanning several sequence ranges."""
+        generator = IdGenerator(worker_id=1023)
+        ids = generator.generate_ids(3 * 4096 + 5)
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+        self.assertTrue(all((new_id >> 12) & 1023 == 1023 for new_id in ids))
+
+    def test_threads_get_distinct_ids(self) -> None:
+        """Test that concurrent callers never receive the same id."""
+        generator = IdGenerator(worker_id=5)
+        results: list[list[int]] = []
+
+        def work() -> None:
+            results.append(
+                [new_id for _ in range(200) for new_id in generator.generate_ids(50)]
+            )
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ids = [new_id for result in results for new_id in result]
+        self.assertEqual(len(set(ids)), 8 * 200 * 50)
+
+    def test_workers_do_not_collide(self) -> None:
+        """Test that generators with different worker ids never overlap."""
+        first = IdGenerator(worker_id=1).generate_ids(5000)
+        second = IdGenerator(worker_id=2).generate_ids(5000)
+        self.assertFalse(set(first) & set(second))
+
+    def test_invalid_worker_id(self) -> None:
+        """Test that worker ids must fit in 10 bits."""
+        with self.assertRaises(ValueError):
+            IdGenerator(worker_id=1024)
+
+    def test_worker_id_is_required(self) -> None:
+        """Test that ids are refused without a worker id of this process."""
+        with mock.patch.dict(os.environ):
+            os.environ.pop("LIBRARY_WORKER_ID", None)
+            with self.assertRaises(RuntimeError):
+                IdGenerator()
+            os.environ["LIBRARY_WORKER_ID"] = "1024"
+            with self.assertRaises(ValueError):
+                IdGenerator()
+
+            os.environ["LIBRARY_WORKER_ID"] = "7"
+            generator = IdGenerator()
+            self.assertEqual((generator.generate_id() >> 12) & 1023, 7)
+
+            # A child process inherits the variable along with the worker id
+            generator.reset()
+            with mock.patch("multiprocessing.parent_process", return_value=object()):
+                with self.assertRaises(RuntimeError):
+                    generator.generate_id()
+                fixed = IdGenerator(worker_id=8)
+                fixed.reset()
+                self.assertEqual((fixed.generate_id() >> 12) & 1023, 8)
+
+    def test_chunked(self) -> None:
+        """Test splitting items into chunks."""
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,74 @@
+"""Unittest for the release year index."""
+
+import unittest
+
+from src.entities.books import Book
+from src.entities.users import User
+from src.lib_system import LibrarySystem
+from src.search.year_index import YearRangeSearchStrategy, parse_year_query
+
+
+class TestYearIndex(unittest.TestCase):
+    """Test cases for the year range search strategy."""
+
+    def setUp(self) -> None:
+        """Set up the test."""
+        years = [2012, 1995, 1989, 1999, 2010, 1995, 1990]
+        self.books = [
+            Book(title=f"Book {i}", author="John Doe", release_year=year, unique_ISBN=i)
+            for i, year in enumerate(years)
+        ]
+        self.strategy = YearRangeSearchStrategy()
+
+    def search_years(self, query: str) -> list[int]:
+        """Search and return the years of the found books.
+
+        Args:
+            query (str): Year query.
+
+        Returns:
+            list[int]: Release years of found books.
+        """
+        found = self.strategy.search(self.books, query)  # type: ignore
+        return [book.release_year for book in found]  # type: ignore
+
+    def test_parse_year_query(self) -> None:
+        """Test parsing of the supported query forms."""
+        self.assertEqual(parse_year_query("1999"), (1999, 1999))
+        self.assertEqual(parse_year_query("1990 - 1999"), (1990, 1999))
+        self.assertEqual(parse_year_query("1990s"), (1990, 1999))
+        self.assertEqual(parse_year_query(">=2010"), (2010, None))
+        self.assertEqual(parse_year_query("<1990"), (None, 1989))
+        with self.assertRaises(ValueError):
+            parse_year_query("nineties")
+
+    def test_search(self) -> None:
+        """Test exact, range and open-ended queries."""
+        self.assertEqual(self.search_years("1995"), [1995, 1995])
+        self.assertEqual(self.search_years("1990-1999"), [1990, 1995, 1995, 1999])
+        self.assertEqual(self.search_years(">=2010"), [2010, 2012])
+        self.assertEqual(self.search_years("<=1989"), [1989])
+        self.assertEqual(self.search_years("1970s"), [])
+
+    def test_counts(self) -> None:
+        """Test counting books per year."""
+        counts = self.strategy.counts(self.books, "1990s")  # type: ignore
+        self.assertEqual(counts, {1990: 1, 1995: 2, 1999: 1})
+
+    def test_index_follows_library_changes(self) -> None:
+        """Test that added and removed books are reflected in the index."""
+        library = LibrarySystem(self.books)  # type: ignore
+        library.search_strategy = self.strategy
+        self.assertEqual(len(list(library.search_books(">2000"))), 2)
+
+        library.add_book(
+            Book(  # type: ignore
+                title="New", author="Jane Doe", release_year=2011, unique_ISBN=99
+            )
+        )
+        library.remove_book(0)
+        self.assertEqual(self.search_years(">2000"), [2010, 2011])
+
+
+if __name__ == "__main__":
+    pass